@@ -0,0 +1,42 @@
+import os
+from neo4j_driver import get_session
+
+# rows per UNWIND statement / write transaction
+BATCH_SIZE  = int(os.getenv("NEO4J_BATCH_SIZE", 1000))
+
+def chunked(rows, size):
+    """
+    Yield lists of at most `size` rows from any iterable.
+    """
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _write_chunk(tx, cypher, rows):
+    tx.run(cypher, rows=rows).consume()
+
+def bulk_write(cypher, rows, batch_size=None, label="rows"):
+    """
+    Write `rows` using `cypher`, which must start with `UNWIND $rows AS row`.
+    Every chunk is sent as a single statement in its own write transaction;
+    execute_write already retries transient errors (max_transaction_retry_time).
+    A chunk that still fails raises, so the pipeline step fails instead of
+    succeeding with rows missing. Returns the number of rows written.
+    """
+    batch_size = batch_size or BATCH_SIZE
+    written = 0
+    with get_session() as session:
+        for chunk in chunked(rows, batch_size):
+            try:
+                session.execute_write(_write_chunk, cypher, chunk)
+            except Exception as e:
+                print(f"    ✗ chunk of {len(chunk)} {label} failed after {written} written: {e}")
+                raise RuntimeError(f"bulk write of {label} failed after {written} rows: {e}") from e
+            written += len(chunk)
+            print(f"    … wrote {written} {label}")
+    return written
@@ -0,0 +1,61 @@
+import os
+from neo4j_driver import get_session
+
+# satellites re-linked per inner transaction
+HUB_BATCH_SIZE = int(os.getenv("HUB_BATCH_SIZE", 1000))
+
+# s.hub_constellation records which hub the satellite's HAS_SATELLITE edge
+# points at, so only satellites whose constellation changed since the last
+# build are touched. Their old edges go and the new one is merged.
+# The importers never write hub_constellation, so any import that changes
+# s.constellation makes the satellite show up here.
+RELINK_CYPHER = """
+MATCH (s:Satellite)
+WHERE coalesce(s.constellation, "") <> coalesce(s.hub_constellation, "")
+CALL {{
+  WITH s
+  OPTIONAL MATCH (:Constellation)-[old:HAS_SATELLITE]->(s)
+  DELETE old
+  WITH DISTINCT s
+  CALL {{
+    WITH s
+    WITH s WHERE s.constellation IS NOT NULL AND s.constellation <> ""
+    MERGE (c:Constellation {{name: s.constellation}})
+    MERGE (c)-[:HAS_SATELLITE]->(s)
+  }}
+  SET s.hub_constellation = CASE WHEN s.constellation = "" THEN null ELSE s.constellation END
+}} IN TRANSACTIONS OF {batch} ROWS
+"""
+
+# hubs left without satellites after a move
+PRUNE_CYPHER = """
+MATCH (c:Constellation)
+WHERE NOT (c)-[:HAS_SATELLITE]->()
+CALL {{
+  WITH c
+  DELETE c
+}} IN TRANSACTIONS OF {batch} ROWS
+"""
+
+def build_constellation_hubs():
+    """
+    Bring Constellation hubs and HAS_SATELLITE edges in line with
+    s.constellation, in batched transactions. Returns a small report.
+    """
+    # CALL { } IN TRANSACTIONS only runs in auto-commit transactions, hence session.run
+    with get_session() as session:
+        relink = session.run(RELINK_CYPHER.format(batch=HUB_BATCH_SIZE)).consume().counters
+        prune  = session.run(PRUNE_CYPHER.format(batch=HUB_BATCH_SIZE)).consume().counters
+
+    report = {
+        "edges_created": relink.relationships_created,
+        "edges_removed": relink.relationships_deleted,
+        "hubs_created":  relink.nodes_created,
+        "hubs_removed":  prune.nodes_deleted,
+    }
+    print(
+        f"Constellation hubs: {report['edges_created']} edges created, "
+        f"{report['edges_removed']} removed, {report['hubs_created']} hubs created, "
+        f"{report['hubs_removed']} empty hubs removed"
+    )
+    return report
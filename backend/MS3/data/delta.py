@@ -0,0 +1,90 @@
+import hashlib
+import json
+from data.bulk import chunked
+from neo4j_driver import get_session
+
+# The sources write overlapping properties (constellation, manufacturer, *_key)
+# in pipeline order UCS → Celestrak → Space-Track, and each skips satellites
+# whose own fingerprint is unchanged. So that the result still matches a full
+# rewrite in that order, an earlier source's upsert removes the fingerprints
+# of every later source (ucs → tle_fingerprint, spacetrack_fingerprint;
+# celestrak → spacetrack_fingerprint), which makes them rewrite that satellite.
+# Space-Track also removes tle_fingerprint, since it replaces Celestrak's TLE:
+# the next run restores Celestrak's copy first, so a satellite dropping off
+# Space-Track's rolling list keeps a TLE instead of having it cleared.
+
+# names per lookup statement when reading stored fingerprints
+LOOKUP_BATCH = 5000
+
+def tle_fingerprint(tle1: str, tle2: str, group: str = "") -> str:
+    """
+    Epoch plus a short hash of both lines and the source group, e.g.
+    "24300.50000000:3f9a…". The epoch keeps it readable in the browser; the
+    hash catches re-issued sets and satellites that moved to another group
+    (the group sets constellation and manufacturer too).
+    """
+    digest = hashlib.blake2b(f"{group}\n{tle1}\n{tle2}".encode(), digest_size=8).hexdigest()
+    return f"{tle1[18:32].strip()}:{digest}"
+
+def row_fingerprint(row: dict) -> str:
+    """
+    Stable hash of a row's values, for sources without an epoch (UCS).
+    """
+    body = json.dumps(row, sort_keys=True, default=str).encode()
+    return hashlib.blake2b(body, digest_size=8).hexdigest()
+
+def stored_fingerprints(prop: str, names) -> dict:
+    """
+    name → stored `prop` for the given satellite names. Missing nodes are left
+    out; None means the node exists but has no fingerprint yet.
+    """
+    found = {}
+    with get_session() as session:
+        for chunk in chunked(names, LOOKUP_BATCH):
+            for rec in session.run(
+                f"UNWIND $names AS name "
+                f"MATCH (s:Satellite {{name: name}}) "
+                f"RETURN s.name AS name, s.{prop} AS fingerprint",
+                names=chunk,
+            ):
+                found[rec["name"]] = rec["fingerprint"]
+    return found
+
+def tracked_names(prop: str, value=None) -> set:
+    """
+    Names of satellites whose `prop` equals `value`, or is set at all when value is None.
+    """
+    where = f"s.{prop} = $value" if value is not None else f"s.{prop} IS NOT NULL"
+    with get_session() as session:
+        return {
+            rec["name"]
+            for rec in session.run(f"MATCH (s:Satellite) WHERE {where} RETURN s.name AS name", value=value)
+        }
+
+def split_changed(rows, stored: dict, key="fingerprint"):
+    """
+    Keep only rows whose fingerprint differs from what Neo4j has.
+    Returns (changed_rows, report) where report counts inserted / updated / unchanged;
+    a node without a stored fingerprint counts as updated, not inserted.
+    """
+    changed = []
+    report = {"inserted": 0, "updated": 0, "unchanged": 0, "removed": 0}
+    for row in rows:
+        if row["name"] not in stored:
+            report["inserted"] += 1
+            changed.append(row)
+        elif stored[row["name"]] != row[key]:
+            report["updated"] += 1
+            changed.append(row)
+        else:
+            report["unchanged"] += 1
+    return changed, report
+
+def format_report(label: str, report: dict) -> str:
+    total = report["inserted"] + report["updated"] + report["unchanged"]
+    skipped = 100.0 * report["unchanged"] / total if total else 0.0
+    return (
+        f"{label}: {report['inserted']} inserted, {report['updated']} updated, "
+        f"{report['unchanged']} unchanged, {report['removed']} removed "
+        f"({skipped:.1f}% of writes skipped)"
+    )
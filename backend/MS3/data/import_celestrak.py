@@ -1,13 +1,54 @@
+import asyncio
 import os
+import random
 import httpx
 from skyfield.api import EarthSatellite, load
-from neo4j_driver import get_session
-from data.utils import wait_for_neo4j
+from data.utils import wait_for_neo4j, normalize_key
+from data.bulk import bulk_write
+from data import tle_catalog
+from data.delta import tle_fingerprint, stored_fingerprints, tracked_names, split_changed, format_report
+import tle_cache
 
 # Prepare Skyfield
 ts  = load.timescale()
 now = ts.now()
 
+# Fetch stage tuning; point CELESTRAK_BASE_URL at a local stand-in for testing
+CELESTRAK_BASE_URL   = os.getenv("CELESTRAK_BASE_URL", "https://celestrak.org").rstrip("/")
+MAX_CONNECTIONS      = int(os.getenv("CELESTRAK_MAX_CONNECTIONS", 4))
+MIN_REQUEST_INTERVAL = float(os.getenv("CELESTRAK_MIN_INTERVAL_SEC", 0.5))
+# attempts per group, at least one
+FETCH_RETRIES        = max(1, int(os.getenv("CELESTRAK_FETCH_RETRIES", 3)))
+FETCH_TIMEOUT        = 30.0
+
+UPSERT_CYPHER = """
+UNWIND $rows AS row
+MERGE (s:Satellite {name: row.name})
+ON CREATE SET s.source = "Celestrak"
+SET
+  s.constellation      = row.constellation,
+  s.tle1               = row.tle1,
+  s.tle2               = row.tle2,
+  s.manufacturer       = row.manuf,
+  s.latitude           = row.lat,
+  s.longitude          = row.lon,
+  s.altitude           = row.alt,
+  s.constellation_key  = row.constellation_key,
+  s.manufacturer_key   = row.manufacturer_key,
+  s.tle_fingerprint    = row.fingerprint,
+  s.tle_group          = row.group
+// Space-Track runs later and overwrites constellation / TLEs: make it rewrite this one
+REMOVE s.spacetrack_fingerprint
+"""
+
+# satellites that dropped out of the group they were imported from lose their TLEs
+CLEAR_TLE_CYPHER = """
+UNWIND $rows AS row
+MATCH (s:Satellite {name: row.name})
+WHERE s.tle_group = row.group
+REMOVE s.tle1, s.tle2, s.tle_fingerprint, s.tle_group
+"""
+
 def parse_tle(text: str):
     """
     Split raw TLE text into 3-line records.
@@ -21,6 +62,172 @@ def parse_tle(text: str):
         sats.append({"name": lines[i], "tle1": lines[i+1], "tle2": lines[i+2]})
     return sats
 
+class HostRateLimiter:
+    """
+    Spaces request starts to the same host at least `interval` seconds apart.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._next = {}
+        self._lock = asyncio.Lock()
+
+    async def wait(self, host: str):
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            now_ = loop.time()
+            start = max(now_, self._next.get(host, now_))
+            self._next[host] = start + self.interval
+        await asyncio.sleep(start - now_)
+
+async def fetch_group(client, limiter, constellation, url):
+    """
+    Fetch one group's TLE text through the disk cache. Skips the network
+    inside the refresh interval, otherwise sends a conditional GET, retrying
+    transport errors, 429s and 5xx with exponential backoff plus jitter.
+    Falls back to the cached copy if every attempt fails.
+    Returns (constellation, text, error).
+    """
+    key   = f"celestrak-{constellation}"
+    entry = tle_catalog.load(key)
+    if entry is not None and entry.is_fresh():
+        print(f"  📦 {constellation}: cached copy is {entry.age():.0f}s old, not refetching")
+        return constellation, entry.text, None
+
+    headers = tle_catalog.conditional_headers(entry)
+    for attempt in range(1, FETCH_RETRIES + 1):
+        await limiter.wait(httpx.URL(url).host)
+        try:
+            resp = await client.get(url, headers=headers)
+            return constellation, tle_catalog.resolve(key, entry, resp).text, None
+        except httpx.HTTPStatusError as e:
+            status = e.response.status_code
+            error = e
+            if (status != 429 and status < 500) or attempt == FETCH_RETRIES:
+                break
+        except httpx.TransportError as e:
+            error = e
+            if attempt == FETCH_RETRIES:
+                break
+        delay = 0.5 * 2 ** attempt + random.uniform(0, 0.5)
+        print(f"  🔁 {constellation}: {error}, retrying in {delay:.1f}s")
+        await asyncio.sleep(delay)
+
+    if entry is not None:
+        print(f"  ⚠️ {constellation}: {error}, serving cached copy from {entry.age():.0f}s ago")
+        return constellation, entry.text, None
+    return constellation, None, error
+
+def tle_group(constellation):
+    return f"celestrak:{constellation}"
+
+def write_group(constellation, text, claimed=frozenset()):
+    """
+    Parse one group's TLE text and push new or changed satellites through
+    the bulk write stage, leaving out the `claimed` names an earlier group
+    already wrote this run. Returns (report, names seen) or None on a parse error.
+    """
+    try:
+        sats = parse_tle(text)
+    except ValueError as e:
+        print(f"  → TLE parse error for {constellation}: {e}")
+        return None
+
+    print(f"  → Parsed {len(sats)} {constellation} sats")
+    names = {sat["name"] for sat in sats}
+    # the first configured group listing a satellite owns it
+    sats = [sat for sat in sats if sat["name"] not in claimed]
+    for sat in sats:
+        sat["fingerprint"] = tle_fingerprint(sat["tle1"], sat["tle2"], tle_group(constellation))
+
+    # only element sets (or group moves) Neo4j doesn't already have go any further
+    stored = stored_fingerprints("tle_fingerprint", [sat["name"] for sat in sats])
+    changed, report = split_changed(sats, stored)
+
+    manuf = 'SpaceX' if constellation.upper() == 'STARLINK' else None
+    rows = []
+    for sat in changed:
+        try:
+            sf_sat = EarthSatellite(sat["tle1"], sat["tle2"], sat["name"], ts)
+            geo    = sf_sat.at(now).subpoint()
+            rows.append({
+                "name":          sat["name"],
+                "tle1":          sat["tle1"],
+                "tle2":          sat["tle2"],
+                "lat":           geo.latitude.degrees,
+                "lon":           geo.longitude.degrees,
+                "alt":           geo.elevation.m,
+                "constellation": constellation,
+                "manuf":         manuf,
+                "constellation_key": normalize_key(constellation),
+                "manufacturer_key":  normalize_key(manuf),
+                "fingerprint":   sat["fingerprint"],
+                "group":         tle_group(constellation),
+            })
+        except Exception as e:
+            print(f"    ✗ skipped {sat['name']}: {e}")
+
+    # Import into Neo4j
+    if rows:
+        bulk_write(UPSERT_CYPHER, rows, label=f"{constellation} sats")
+        tle_cache.invalidate(row["name"] for row in rows)
+    return report, names
+
+def remove_dropped(reports, seen):
+    """
+    Clear TLEs of satellites a group used to list but no fetched group lists now.
+    Runs after every group is in so a satellite that moved groups isn't cleared.
+    """
+    for constellation, report in reports.items():
+        group   = tle_group(constellation)
+        dropped = tracked_names("tle_group", group) - seen
+        if dropped:
+            report["removed"] = bulk_write(
+                CLEAR_TLE_CYPHER,
+                [{"name": name, "group": group} for name in dropped],
+                label=f"dropped {constellation} sats",
+            )
+            tle_cache.invalidate(dropped)
+        print(format_report(f"Celestrak {constellation}", report))
+
+async def fetch_and_write(constellations):
+    """
+    Fetch every group concurrently and write them in CELESTRAK_CONSTELLATIONS
+    order, each as soon as it and every group before it have arrived. A
+    satellite listed in several groups always gets the first of them.
+    Returns constellation → delta report.
+    """
+    limiter = HostRateLimiter(MIN_REQUEST_INTERVAL)
+    limits  = httpx.Limits(max_connections=MAX_CONNECTIONS)
+    async with httpx.AsyncClient(
+        limits=limits, timeout=FETCH_TIMEOUT, follow_redirects=True
+    ) as client:
+        reports, seen = {}, set()
+        tasks = []
+        for c in constellations:
+            url = f"{CELESTRAK_BASE_URL}/NORAD/elements/gp.php?GROUP={c}&FORMAT=TLE"
+            print(f"Fetching TLEs for {c}: {url}")
+            tasks.append(asyncio.ensure_future(fetch_group(client, limiter, c, url)))
+
+        try:
+            for task in tasks:
+                constellation, text, error = await task
+                if error is not None:
+                    print(f"  → HTTP error for {constellation}: {error}")
+                    continue
+                # writes run in a worker thread so pending fetches keep going
+                result = await asyncio.to_thread(write_group, constellation, text, frozenset(seen))
+                if result is not None:
+                    reports[constellation], names = result
+                    seen |= names
+        finally:
+            # a failed write ends the step; don't leave fetches running
+            for task in tasks:
+                task.cancel()
+
+    await asyncio.to_thread(remove_dropped, reports, seen)
+    return reports
+
 def import_celestrak():
     # Wait for Neo4j
     wait_for_neo4j()
@@ -37,65 +244,4 @@ def import_celestrak():
             c = "GPS-OPS"
         constellations.append(c)
 
-    # Build URLs
-    urls = [
-        f"https://celestrak.org/NORAD/elements/gp.php?GROUP={c}&FORMAT=TLE"
-        for c in constellations
-    ]
-
-    for constellation, url in zip(constellations, urls):
-        print(f"Fetching TLEs for {constellation}: {url}")
-        try:
-            resp = httpx.get(url, follow_redirects=True, timeout=30.0)
-            resp.raise_for_status()
-        except Exception as e:
-            print(f"  → HTTP error for {constellation}: {e}")
-            continue
-
-        try:
-            sats = parse_tle(resp.text)
-        except ValueError as e:
-            print(f"  → TLE parse error for {constellation}: {e}")
-            continue
-
-        print(f"  → Parsed {len(sats)} {constellation} sats")
-        # Import into Neo4j
-        with get_session() as session:
-            count = 0
-            for sat in sats:
-                try:
-                    manuf = 'SpaceX' if constellation.upper() == 'STARLINK' else None
-                    sf_sat = EarthSatellite(sat["tle1"], sat["tle2"], sat["name"], ts)
-                    geo    = sf_sat.at(now).subpoint()
-                    lat, lon, alt = geo.latitude.degrees, geo.longitude.degrees, geo.elevation.m
-
-                    session.run(
-                        """
-                        MERGE (s:Satellite {name: $name})
-                        ON CREATE SET s.source = "Celestrak"
-                        SET
-                          s.constellation      = $constellation,
-                          s.tle1               = $tle1,
-                          s.tle2               = $tle2,
-                          s.manufacturer       = $manuf,
-                          s.latitude           = $lat,
-                          s.longitude          = $lon,
-                          s.altitude           = $alt
-                        """,
-                        {
-                            "name":         sat["name"],
-                            "tle1":         sat["tle1"],
-                            "tle2":         sat["tle2"],
-                            "lat":          lat,
-                            "lon":          lon,
-                            "alt":          alt,
-                            "constellation": constellation,
-                            "manuf":         manuf
-                        }
-                    )
-                    count += 1
-                    if count % 500 == 0:
-                        print(f"    … imported {count} sats")
-                except Exception as e:
-                    print(f"    ✗ skipped {sat['name']}: {e}")
-            print(f"Done importing {count} {constellation} sats\n")
+    return asyncio.run(fetch_and_write(constellations))
@@ -1,8 +1,11 @@
 import httpx
-from neo4j_driver import get_session
 import os
 from dotenv import load_dotenv
-from data.utils import wait_for_neo4j
+from data.utils import wait_for_neo4j, normalize_key
+from data.bulk import bulk_write
+from data import tle_catalog
+from data.delta import tle_fingerprint, stored_fingerprints, tracked_names, split_changed, format_report
+import tle_cache
 from skyfield.api import EarthSatellite, load
 
 load_dotenv()
@@ -12,6 +15,34 @@ PASSWORD = os.getenv("SPACETRACK_PASSWORD")
 CONSTELLATION = os.getenv("SPACETRACK_CONSTELLATION", "Space-Track")
 LOGIN_URL = "https://www.space-track.org/ajaxauth/login"
 TLE_URL = "https://www.space-track.org/basicspacedata/query/class/tle_latest/format/tle/limit/100"
+CACHE_KEY = "spacetrack-tle_latest"
+TLE_GROUP = "spacetrack:tle_latest"
+
+UPSERT_CYPHER = """
+UNWIND $rows AS row
+MERGE (s:Satellite {name: row.name})
+ON CREATE SET s.source = "Space-Track"
+SET
+  s.constellation = row.constellation,
+  s.tle1          = row.tle1,
+  s.tle2          = row.tle2,
+  s.latitude      = row.lat,
+  s.longitude     = row.lon,
+  s.altitude      = row.alt,
+  s.constellation_key = row.constellation_key,
+  s.spacetrack_fingerprint = row.fingerprint,
+  s.tle_group         = row.group
+// the TLE Celestrak's fingerprint describes is gone: have Celestrak rewrite it
+// next run, so it is back in place if this satellite drops off Space-Track
+REMOVE s.tle_fingerprint
+"""
+
+CLEAR_TLE_CYPHER = """
+UNWIND $rows AS row
+MATCH (s:Satellite {name: row.name})
+WHERE s.tle_group = row.group
+REMOVE s.tle1, s.tle2, s.tle_fingerprint, s.spacetrack_fingerprint, s.tle_group
+"""
 
 def parse_tle(text):
     lines = text.strip().split("\n")
@@ -27,57 +58,61 @@ def parse_tle(text):
 
 def import_spacetrack():
     wait_for_neo4j()
-    print(f"Logging in to Space-Track as {USERNAME}")
     with httpx.Client(follow_redirects=True, timeout=30.0) as client:
-        client.post(LOGIN_URL, data={"identity": USERNAME, "password": PASSWORD})
-        resp = client.get(TLE_URL)
-        resp.raise_for_status()
-        satellites = parse_tle(resp.text)
+        def login():
+            print(f"Logging in to Space-Track as {USERNAME}")
+            client.post(LOGIN_URL, data={"identity": USERNAME, "password": PASSWORD})
+
+        # only logs in and downloads once the cached copy is past the refresh interval
+        text = tle_catalog.fetch(client, CACHE_KEY, TLE_URL, prepare=login)
+        satellites = parse_tle(text)
 
     print(f"Parsed {len(satellites)} TLEs for {CONSTELLATION}")
+    for sat in satellites:
+        sat["fingerprint"] = tle_fingerprint(sat["tle1"], sat["tle2"], TLE_GROUP)
+
+    # skip element sets this step already wrote; its own property, since UCS and
+    # Celestrak run earlier and clear it whenever they overwrite a satellite
+    stored = stored_fingerprints("spacetrack_fingerprint", [sat["name"] for sat in satellites])
+    changed, report = split_changed(satellites, stored)
 
     ts  = load.timescale()
     now = ts.now()
 
-    with get_session() as session:
-        count = 0
-        for sat in satellites:
-            try:
-                sf_sat = EarthSatellite(sat["tle1"], sat["tle2"], sat["name"], ts)
-                geo    = sf_sat.at(now).subpoint()
-                lat, lon, alt = geo.latitude.degrees, geo.longitude.degrees, geo.elevation.m
-
-                session.run(
-                    """
-                    MERGE (s:Satellite {name: $name})
-                    ON CREATE SET s.source = "Space-Track"
-                    SET
-                      s.constellation = $constellation,
-                      s.tle1          = $tle1,
-                      s.tle2          = $tle2,
-                      s.latitude      = $lat,
-                      s.longitude     = $lon,
-                      s.altitude      = $alt
-                    """,
-                    {
-                        "name":          sat["name"],
-                        "tle1":          sat["tle1"],
-                        "tle2":          sat["tle2"],
-                        "lat":           lat,
-                        "lon":           lon,
-                        "alt":           alt,
-                        "constellation": CONSTELLATION,
-                    }
-                )
-
-                count += 1
-                if count % 50 == 0:
-                    print(f"... imported {count} {CONSTELLATION} sats")
-
-            except Exception as e:
-                print(f"Skipped {sat['name']}: {e}")
-
-        print(f"Done importing {count} {CONSTELLATION} satellites")
+    rows = []
+    for sat in changed:
+        try:
+            sf_sat = EarthSatellite(sat["tle1"], sat["tle2"], sat["name"], ts)
+            geo    = sf_sat.at(now).subpoint()
+            rows.append({
+                "name":          sat["name"],
+                "tle1":          sat["tle1"],
+                "tle2":          sat["tle2"],
+                "lat":           geo.latitude.degrees,
+                "lon":           geo.longitude.degrees,
+                "alt":           geo.elevation.m,
+                "constellation": CONSTELLATION,
+                "constellation_key": normalize_key(CONSTELLATION),
+                "fingerprint":   sat["fingerprint"],
+                "group":         TLE_GROUP,
+            })
+        except Exception as e:
+            print(f"Skipped {sat['name']}: {e}")
+
+    if rows:
+        bulk_write(UPSERT_CYPHER, rows, label=f"{CONSTELLATION} sats")
+        tle_cache.invalidate(row["name"] for row in rows)
+
+    dropped = tracked_names("tle_group", TLE_GROUP) - {sat["name"] for sat in satellites}
+    if dropped:
+        report["removed"] = bulk_write(
+            CLEAR_TLE_CYPHER,
+            [{"name": name, "group": TLE_GROUP} for name in dropped],
+            label=f"dropped {CONSTELLATION} sats",
+        )
+        tle_cache.invalidate(dropped)
+    print(format_report(CONSTELLATION, report))
+    return report
 
 # def import_spacetrack():
 #     wait_for_neo4j()
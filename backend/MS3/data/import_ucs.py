@@ -1,6 +1,36 @@
 import csv
-from neo4j_driver import get_session
-from data.utils import wait_for_neo4j
+from data.utils import wait_for_neo4j, normalize_key
+from data.bulk import bulk_write
+from data.delta import row_fingerprint, stored_fingerprints, tracked_names, split_changed, format_report
+
+UPSERT_CYPHER = """
+UNWIND $rows AS row
+MERGE (s:Satellite {name: row.name})
+ON CREATE SET s.source = "UCS"
+SET
+  s.country_of_operator = row.country,
+  s.orbit_class         = row.orbit,
+  s.manufacturer        = row.manufacturer,
+  s.constellation       = row.constellation,
+  s.latitude            = row.lat,
+  s.longitude           = row.lon,
+  s.altitude            = row.alt,
+  s.country_key         = row.country_key,
+  s.orbit_class_key     = row.orbit_key,
+  s.manufacturer_key    = row.manufacturer_key,
+  s.constellation_key   = row.constellation_key,
+  s.ucs_fingerprint     = row.fingerprint
+// Celestrak and Space-Track run later and also write constellation /
+// manufacturer: dropping their fingerprints makes them rewrite this satellite
+REMOVE s.tle_fingerprint, s.spacetrack_fingerprint
+"""
+
+# satellites no longer in the CSV keep their attributes but stop being tracked as UCS rows
+UNTRACK_CYPHER = """
+UNWIND $rows AS row
+MATCH (s:Satellite {name: row.name})
+REMOVE s.ucs_fingerprint
+"""
 
 def import_ucs():
     wait_for_neo4j()
@@ -13,45 +43,39 @@ def import_ucs():
     print(f"CSV Columns: {reader.fieldnames}")
     print(f"Parsed {len(rows)} UCS satellites")
 
-    with get_session() as session:
-        count = 0
-        for row in rows:
-            name         = row["Name of Satellite"]
-            country      = row.get("Country of Operator/Owner", "")
-            orbit        = row.get("Class of Orbit", "")
-            manufacturer = row.get("Contractor", "")
-            constellation = row.get("Purpose", "")
-            lat = float(row.get("Latitude", 0) or 0)
-            lon = float(row.get("Longitude", 0) or 0)
-            alt = float(row.get("Altitude", 0) or 0)
-
-            session.run(
-                """
-                MERGE (s:Satellite {name: $name})
-                ON CREATE SET s.source = "UCS"
-                SET
-                  s.country_of_operator = $country,
-                  s.orbit_class         = $orbit,
-                  s.manufacturer        = $manufacturer,
-                  s.constellation       = $constellation,
-                  s.latitude            = $lat,
-                  s.longitude           = $lon,
-                  s.altitude            = $alt
-                """,
-                {
-                    "name":         name,
-                    "country":      country,
-                    "orbit":        orbit,
-                    "manufacturer": manufacturer,
-                    "constellation": constellation,
-                    "lat":          lat,
-                    "lon":          lon,
-                    "alt":          alt,
-                }
-            )
-
-            count += 1
-            if count % 100 == 0:
-                print(f"... imported {count} UCS sats")
-
-        print(f"Done importing {count} UCS satellites")
+    params = []
+    for row in rows:
+        country       = row.get("Country of Operator/Owner", "")
+        orbit         = row.get("Class of Orbit", "")
+        manufacturer  = row.get("Contractor", "")
+        constellation = row.get("Purpose", "")
+        params.append({
+            "name":              row["Name of Satellite"],
+            "country":           country,
+            "orbit":             orbit,
+            "manufacturer":      manufacturer,
+            "constellation":     constellation,
+            "country_key":       normalize_key(country),
+            "orbit_key":         normalize_key(orbit),
+            "manufacturer_key":  normalize_key(manufacturer),
+            "constellation_key": normalize_key(constellation),
+            "lat":               float(row.get("Latitude", 0) or 0),
+            "lon":               float(row.get("Longitude", 0) or 0),
+            "alt":               float(row.get("Altitude", 0) or 0),
+        })
+    for p in params:
+        p["fingerprint"] = row_fingerprint(p)
+
+    # the CSV rarely changes, so most runs write nothing
+    stored = stored_fingerprints("ucs_fingerprint", [p["name"] for p in params])
+    changed, report = split_changed(params, stored)
+    if changed:
+        bulk_write(UPSERT_CYPHER, changed, label="UCS sats")
+
+    dropped = tracked_names("ucs_fingerprint") - {p["name"] for p in params}
+    if dropped:
+        report["removed"] = bulk_write(
+            UNTRACK_CYPHER, [{"name": name} for name in dropped], label="dropped UCS sats"
+        )
+    print(format_report("UCS", report))
+    return report
@@ -0,0 +1,186 @@
+"""
+Schema + import pipeline, run off the request path.
+
+The API starts it in a background thread (IMPORT_ON_STARTUP) and keeps
+serving whatever is already in Neo4j; POST /api/import/run starts another.
+It can also run as a one-off job:
+
+    python -m data.pipeline
+
+A separate process can't reach the API's in-memory caches, so every run
+bumps a version counter on an (:ImportState {id: "catalog"}) node; the API
+polls it (start_watcher) and refreshes /options and the snapshot catalog
+when a CLI run moves it.
+"""
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+from data import import_ucs, import_celestrak, import_spacetrack
+from data.schema import ensure_schema
+from data.constellations import build_constellation_hubs
+from neo4j_driver import get_session
+import options_cache
+import snapshot
+
+# run the pipeline when the API starts; turn off when a separate job owns imports
+IMPORT_ON_STARTUP = os.getenv("IMPORT_ON_STARTUP", "true").lower() in ("1", "true", "yes")
+# seconds between checks for imports finished by another process
+VERSION_POLL_SEC = float(os.getenv("IMPORT_VERSION_POLL_SEC", 30.0))
+
+BUMP_VERSION_CYPHER = """
+MERGE (i:ImportState {id: "catalog"})
+SET i.version = coalesce(i.version, 0) + 1, i.finished_at = datetime()
+RETURN i.version AS version
+"""
+
+READ_VERSION_CYPHER = """
+MATCH (i:ImportState {id: "catalog"}) RETURN i.version AS version
+"""
+
+STEPS = [
+    ("schema",         ensure_schema),
+    ("ucs",            import_ucs.import_ucs),
+    ("celestrak",      import_celestrak.import_celestrak),
+    ("spacetrack",     import_spacetrack.import_spacetrack),
+    ("constellations", build_constellation_hubs),
+]
+
+_run_lock = threading.Lock()
+_watch_stop = threading.Event()
+_watch_thread = None
+# last catalog version this process has published
+_seen_version = None
+_status = {
+    "state":           "idle",    # idle | running | succeeded | partial | failed
+    "started_at":      None,
+    "finished_at":     None,
+    "last_success_at": None,
+    "steps":           {},
+}
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+def status() -> dict:
+    """
+    Snapshot of the current / last run for the status endpoint.
+    """
+    return {**_status, "steps": {name: dict(step) for name, step in _status["steps"].items()}}
+
+def is_running() -> bool:
+    return _run_lock.locked()
+
+def _publish():
+    # readers keep serving the old data until the refresh is complete
+    snapshot.mark_catalog_dirty()
+    options_cache.invalidate()
+
+def _bump_version():
+    with get_session() as session:
+        return session.run(BUMP_VERSION_CYPHER).single()["version"]
+
+def _read_version():
+    with get_session() as session:
+        rec = session.run(READ_VERSION_CYPHER).single()
+        return rec["version"] if rec else None
+
+def _watch():
+    global _seen_version
+    while not _watch_stop.wait(VERSION_POLL_SEC):
+        # an in-process run publishes on its own when it finishes
+        if is_running():
+            continue
+        try:
+            version = _read_version()
+        except Exception as e:
+            print(f"Import version check failed: {e}")
+            continue
+        if version is None or version == _seen_version:
+            continue
+        if _seen_version is not None:
+            print(f"Import version {version} written by another process, publishing")
+            _publish()
+        _seen_version = version
+
+def start_watcher():
+    """
+    Poll the import version so CLI runs reach this process's caches.
+    """
+    global _watch_thread
+    if _watch_thread is None or not _watch_thread.is_alive():
+        _watch_stop.clear()
+        _watch_thread = threading.Thread(target=_watch, name="import-version-watcher", daemon=True)
+        _watch_thread.start()
+
+def stop_watcher():
+    _watch_stop.set()
+
+def run(publish: bool = True) -> dict:
+    """
+    Run every step in order; a failing step is recorded and the rest still run.
+    Returns the final status, or the current one if a run is already going.
+    """
+    if not _run_lock.acquire(blocking=False):
+        print("Import already running, skipping")
+        return status()
+    return _run_holding_lock(publish)
+
+def _run_holding_lock(publish: bool) -> dict:
+    global _seen_version
+    try:
+        _status.update(state="running", started_at=_now(), finished_at=None)
+        _status["steps"] = {name: {"state": "pending"} for name, _ in STEPS}
+
+        failed = 0
+        for name, fn in STEPS:
+            step = _status["steps"][name]
+            step.update(state="running", started_at=_now())
+            started = time.monotonic()
+            print(f"▶️  Import step {name}...")
+            try:
+                result = fn()
+                step.update(state="succeeded", report=result if isinstance(result, dict) else None)
+                print(f"✅ Import step {name} done")
+            except Exception as e:
+                failed += 1
+                step.update(state="failed", error=str(e))
+                print(f"❌ Import step {name} failed: {e}")
+            step["seconds"] = round(time.monotonic() - started, 3)
+
+        try:
+            version = _bump_version()
+        except Exception as e:
+            version = None
+            print(f"Import version bump failed: {e}")
+        if publish:
+            if version is not None:
+                _seen_version = version
+            _publish()
+        finished = _now()
+        _status.update(
+            state="succeeded" if failed == 0 else "partial" if failed < len(STEPS) else "failed",
+            finished_at=finished,
+        )
+        if failed == 0:
+            _status["last_success_at"] = finished
+        print(f"Import pipeline {_status['state']}")
+        return status()
+    finally:
+        _run_lock.release()
+
+def start_background() -> bool:
+    """
+    Kick off a run in a daemon thread. Returns False if one is already running.
+    """
+    if not _run_lock.acquire(blocking=False):
+        return False
+    threading.Thread(
+        target=_run_holding_lock, args=(True,), name="import-pipeline", daemon=True
+    ).start()
+    return True
+
+if __name__ == "__main__":
+    result = run(publish=False)
+    raise SystemExit(0 if result["state"] == "succeeded" else 1)
@@ -0,0 +1,100 @@
+from neo4j_driver import get_session
+from data.utils import wait_for_neo4j
+
+# (name, label, property) → uniqueness constraint; MERGE on these becomes an index seek
+CONSTRAINTS = [
+    ("satellite_name_unique",     "Satellite",     "name"),
+    ("constellation_name_unique", "Constellation", "name"),
+]
+
+# (name, label, property) → range index for the filters in routers/satellites.py
+INDEXES = [
+    ("satellite_orbit_class",   "Satellite", "orbit_class"),
+    ("satellite_constellation", "Satellite", "constellation"),
+    ("satellite_country",       "Satellite", "country_of_operator"),
+    ("satellite_manufacturer",  "Satellite", "manufacturer"),
+    # normalized shadow keys (data.utils.normalize_key) used by /positions and /graph3d
+    ("satellite_orbit_class_key",   "Satellite", "orbit_class_key"),
+    ("satellite_constellation_key", "Satellite", "constellation_key"),
+    ("satellite_country_key",       "Satellite", "country_key"),
+    ("satellite_manufacturer_key",  "Satellite", "manufacturer_key"),
+    # delta import: which source group a satellite's TLE came from (data/delta.py)
+    ("satellite_tle_group",         "Satellite", "tle_group"),
+]
+
+def _existing(session):
+    """
+    Map (kind, label, property) → name for every single-property
+    uniqueness constraint and range index already in the database.
+    """
+    found = {}
+    for rec in session.run(
+        "SHOW CONSTRAINTS YIELD name, type, labelsOrTypes, properties "
+        "WHERE type IN ['UNIQUENESS', 'NODE_PROPERTY_UNIQUENESS']"
+    ):
+        if len(rec["labelsOrTypes"]) == 1 and len(rec["properties"]) == 1:
+            found[("constraint", rec["labelsOrTypes"][0], rec["properties"][0])] = rec["name"]
+    for rec in session.run(
+        "SHOW INDEXES YIELD name, type, labelsOrTypes, properties, owningConstraint "
+        "WHERE type = 'RANGE' AND owningConstraint IS NULL"
+    ):
+        if rec["labelsOrTypes"] and len(rec["labelsOrTypes"]) == 1 and len(rec["properties"]) == 1:
+            found[("index", rec["labelsOrTypes"][0], rec["properties"][0])] = rec["name"]
+    return found
+
+def ensure_schema():
+    """
+    Create any missing constraints/indexes, wait for them to come online
+    and return {"created": [...], "present": [...], "offline": [...], "failed": [...]}.
+    """
+    wait_for_neo4j()
+    report = {"created": [], "present": [], "offline": [], "failed": []}
+
+    with get_session() as session:
+        existing = _existing(session)
+
+        for name, label, prop in CONSTRAINTS:
+            key = ("constraint", label, prop)
+            if key in existing:
+                report["present"].append(existing[key])
+                continue
+            try:
+                session.run(
+                    f"CREATE CONSTRAINT {name} IF NOT EXISTS "
+                    f"FOR (n:{label}) REQUIRE n.{prop} IS UNIQUE"
+                ).consume()
+                report["created"].append(name)
+            except Exception as e:
+                # usually duplicate names already in the graph
+                report["failed"].append(f"{name}: {e}")
+
+        for name, label, prop in INDEXES:
+            key = ("index", label, prop)
+            if key in existing:
+                report["present"].append(existing[key])
+                continue
+            try:
+                session.run(
+                    f"CREATE INDEX {name} IF NOT EXISTS FOR (n:{label}) ON (n.{prop})"
+                ).consume()
+                report["created"].append(name)
+            except Exception as e:
+                report["failed"].append(f"{name}: {e}")
+
+        # block until new indexes are populated, then verify their state
+        session.run("CALL db.awaitIndexes(300)").consume()
+        names = report["created"] + report["present"]
+        for rec in session.run(
+            "SHOW INDEXES YIELD name, state WHERE name IN $names AND state <> 'ONLINE' "
+            "RETURN name, state",
+            names=names,
+        ):
+            report["offline"].append(f"{rec['name']} ({rec['state']})")
+
+    print(f"Schema created:  {report['created'] or '-'}")
+    print(f"Schema present:  {report['present'] or '-'}")
+    if report["failed"]:
+        print(f"❌ Schema failed:  {report['failed']}")
+    if report["offline"]:
+        print(f"⚠️  Schema not online: {report['offline']}")
+    return report
@@ -0,0 +1,126 @@
+import json
+import os
+import re
+import time
+from typing import NamedTuple, Optional
+
+# raw TLE payloads live here, one <key>.tle + <key>.json (validators) per source
+CACHE_DIR = os.getenv("TLE_CACHE_DIR", "tle-cache")
+# don't hit a source again within this many seconds; Celestrak refreshes GP data every ~2h
+MIN_REFRESH_SEC = float(os.getenv("TLE_MIN_REFRESH_SEC", 7200))
+
+class CachedTLE(NamedTuple):
+    text:          str
+    fetched_at:    float           # unix time of the last 200 or 304
+    etag:          Optional[str]
+    last_modified: Optional[str]
+
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+    def is_fresh(self, min_refresh: float = None) -> bool:
+        return self.age() < (MIN_REFRESH_SEC if min_refresh is None else min_refresh)
+
+def _paths(key: str):
+    safe = re.sub(r"[^A-Za-z0-9_.-]", "_", key)
+    return os.path.join(CACHE_DIR, f"{safe}.tle"), os.path.join(CACHE_DIR, f"{safe}.json")
+
+def _write_atomic(path: str, data: str):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+def load(key: str) -> Optional[CachedTLE]:
+    """
+    Cached payload for a source key, or None if nothing usable is on disk.
+    """
+    body_path, meta_path = _paths(key)
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        with open(body_path, encoding="utf-8") as f:
+            text = f.read()
+    except (OSError, ValueError):
+        return None
+    return CachedTLE(
+        text=text,
+        fetched_at=meta.get("fetched_at", 0.0),
+        etag=meta.get("etag"),
+        last_modified=meta.get("last_modified"),
+    )
+
+def conditional_headers(entry: Optional[CachedTLE]) -> dict:
+    headers = {}
+    if entry is not None:
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+    return headers
+
+def _write_meta(key: str, fetched_at: float, etag, last_modified):
+    _, meta_path = _paths(key)
+    _write_atomic(meta_path, json.dumps({
+        "fetched_at": fetched_at, "etag": etag, "last_modified": last_modified,
+    }))
+
+def store(key: str, text: str, headers) -> CachedTLE:
+    """
+    Save a 200 response body with its validators.
+    """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    body_path, _ = _paths(key)
+    entry = CachedTLE(
+        text=text,
+        fetched_at=time.time(),
+        etag=headers.get("ETag"),
+        last_modified=headers.get("Last-Modified"),
+    )
+    # body first: a crash in between leaves old validators, which just means a full GET next time
+    _write_atomic(body_path, text)
+    _write_meta(key, entry.fetched_at, entry.etag, entry.last_modified)
+    return entry
+
+def mark_not_modified(key: str, entry: CachedTLE, headers) -> CachedTLE:
+    """
+    Record a 304: the body is unchanged, only the timestamp (and maybe validators) move.
+    """
+    entry = entry._replace(
+        fetched_at=time.time(),
+        etag=headers.get("ETag") or entry.etag,
+        last_modified=headers.get("Last-Modified") or entry.last_modified,
+    )
+    _write_meta(key, entry.fetched_at, entry.etag, entry.last_modified)
+    return entry
+
+def resolve(key: str, entry: Optional[CachedTLE], resp) -> CachedTLE:
+    """
+    Turn a conditional GET response into a cache entry (304 → cached body, 200 → stored).
+    """
+    if resp.status_code == 304 and entry is not None:
+        return mark_not_modified(key, entry, resp.headers)
+    resp.raise_for_status()
+    return store(key, resp.text, resp.headers)
+
+def fetch(client, key: str, url: str, min_refresh: float = None, prepare=None) -> str:
+    """
+    TLE text for url through the disk cache, using a sync httpx client.
+    Inside the refresh interval no request is made; after it a conditional
+    GET is sent. If upstream fails and a cached copy exists, that is served.
+    `prepare` runs right before the GET (e.g. a login) and only when one is needed.
+    """
+    entry = load(key)
+    if entry is not None and entry.is_fresh(min_refresh):
+        print(f"  📦 {key}: cached copy is {entry.age():.0f}s old, not refetching")
+        return entry.text
+    try:
+        if prepare is not None:
+            prepare()
+        resp = client.get(url, headers=conditional_headers(entry))
+        return resolve(key, entry, resp).text
+    except Exception as e:
+        if entry is None:
+            raise
+        print(f"  ⚠️ {key}: fetch failed ({e}), serving cached copy from {entry.age():.0f}s ago")
+        return entry.text
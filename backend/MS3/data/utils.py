@@ -15,3 +15,13 @@ def wait_for_neo4j():
             print(f"🔁 Waiting for Neo4j... attempt {attempt + 1}")
             time.sleep(2)
     raise RuntimeError("❌ Neo4j not available after retries")
+
+def normalize_key(value):
+    """
+    Indexed lookup form of a filter property (trimmed, upper-cased).
+    Blank values map to None so they are never written as keys.
+    """
+    if value is None:
+        return None
+    value = str(value).strip().upper()
+    return value or None
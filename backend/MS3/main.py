@@ -1,8 +1,11 @@
+import threading
 from fastapi import FastAPI
-from routers import satellites
+from routers import satellites, health
 from fastapi.middleware.cors import CORSMiddleware
-from data import import_ucs, import_celestrak, import_spacetrack
-from neo4j_driver import get_session
+from data import pipeline
+from neo4j_driver import close_async_driver
+import orekit_pool
+import snapshot
 
 app = FastAPI()
 
@@ -15,6 +18,7 @@ app.add_middleware(
 )
 
 app.include_router(satellites.router)
+app.include_router(health.router)
 
 @app.get("/")
 def root():
@@ -22,27 +26,29 @@ def root():
 
 @app.on_event("startup")
 async def startup_event():
-    print("Running data imports...")
-    for fn in (
-        import_ucs.import_ucs,
-        import_celestrak.import_celestrak,
-        import_spacetrack.import_spacetrack,
-    ):
-        try:
-            fn()
-            print(f"{fn.__name__} completed.")
-        except Exception as e:
-            print(f"{fn.__name__} failed: {e}")
-    print("Data import phase done.")
-
-    print("Creating Constellation hub nodes and HAS_SATELLITE edges...")
-    with get_session() as session:
-        session.run(
-            """
-            MATCH (s:Satellite)
-            WHERE s.constellation IS NOT NULL AND s.constellation <> ""
-            MERGE (c:Constellation {name: s.constellation})
-            MERGE (c)-[:HAS_SATELLITE]->(s)
-            """
-        )
-    print("Constellation hubs created.")
\ No newline at end of file
+    # nothing here waits on Neo4j or the JVM: the API serves the existing
+    # graph right away and /health/ready reports when Neo4j is reachable
+    print("Warming Orekit worker pool in the background...")
+    threading.Thread(target=_warm_orekit, name="orekit-warmup", daemon=True).start()
+
+    snapshot.start()
+    pipeline.start_watcher()
+
+    if pipeline.IMPORT_ON_STARTUP:
+        print("Starting background import pipeline...")
+        pipeline.start_background()
+    else:
+        print("IMPORT_ON_STARTUP is off; run `python -m data.pipeline` or POST /api/import/run")
+
+def _warm_orekit():
+    try:
+        orekit_pool.start()
+    except Exception as e:
+        print(f"Orekit pool start failed: {e}")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    snapshot.stop()
+    pipeline.stop_watcher()
+    orekit_pool.shutdown()
+    await close_async_driver()
@@ -1,13 +1,49 @@
-from neo4j import GraphDatabase
+from neo4j import GraphDatabase, AsyncGraphDatabase
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
+URI      = os.getenv("NEO4J_URI")
+AUTH     = (os.getenv("NEO4J_USERNAME"), os.getenv("NEO4J_PASSWORD"))
+DATABASE = os.getenv("NEO4J_DATABASE", "neo4j")
+
+# connections per driver, and how long a caller may wait for one (seconds)
+POOL_SIZE       = int(os.getenv("NEO4J_POOL_SIZE", 100))
+ACQUIRE_TIMEOUT = float(os.getenv("NEO4J_ACQUIRE_TIMEOUT", 30.0))
+
 driver = GraphDatabase.driver(
-    os.getenv("NEO4J_URI"),
-    auth=(os.getenv("NEO4J_USERNAME"), os.getenv("NEO4J_PASSWORD"))
+    URI,
+    auth=AUTH,
+    max_connection_pool_size=POOL_SIZE,
+    connection_acquisition_timeout=ACQUIRE_TIMEOUT,
 )
 
+# created on first use so it binds to the running event loop
+_async_driver = None
+
 def get_session():
-    return driver.session(database=os.getenv("NEO4J_DATABASE", "neo4j"))
+    return driver.session(database=DATABASE)
+
+def get_async_driver():
+    global _async_driver
+    if _async_driver is None:
+        _async_driver = AsyncGraphDatabase.driver(
+            URI,
+            auth=AUTH,
+            max_connection_pool_size=POOL_SIZE,
+            connection_acquisition_timeout=ACQUIRE_TIMEOUT,
+        )
+    return _async_driver
+
+def get_async_session():
+    """
+    Async session for the routers; use as `async with get_async_session() as session`.
+    """
+    return get_async_driver().session(database=DATABASE)
+
+async def close_async_driver():
+    global _async_driver
+    if _async_driver is not None:
+        await _async_driver.close()
+        _async_driver = None
@@ -0,0 +1,69 @@
+import asyncio
+import hashlib
+import json
+from typing import Dict, List, NamedTuple, Optional
+
+from neo4j_driver import get_async_session
+
+# response key → Satellite property; each has a range index (data/schema.py)
+OPTION_FIELDS = {
+    "manufacturers":  "manufacturer",
+    "orbits":         "orbit_class",
+    "constellations": "constellation",
+    "countries":      "country_of_operator",
+}
+
+class Options(NamedTuple):
+    values:  Dict[str, List[str]]
+    etag:    str
+    version: int
+
+_options: Optional[Options] = None
+_version = 0
+_lock = asyncio.Lock()
+
+async def _build(version: int) -> Options:
+    values = {}
+    async with get_async_session() as session:
+        for key, prop in OPTION_FIELDS.items():
+            # one index-backed DISTINCT per property instead of a cross-product scan
+            result = await session.run(
+                f"MATCH (s:Satellite) WHERE s.{prop} IS NOT NULL AND s.{prop} <> '' "
+                f"RETURN DISTINCT s.{prop} AS value"
+            )
+            values[key] = sorted([rec["value"] async for rec in result])
+
+    body = json.dumps(values, sort_keys=True).encode()
+    etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+    return Options(values=values, etag=etag, version=version)
+
+async def get() -> Options:
+    """
+    Cached filter options, rebuilt from Neo4j on first use after an invalidation.
+    """
+    global _options
+    options = _options
+    if options is not None:
+        return options
+    async with _lock:
+        if _options is not None:
+            return _options
+        # an invalidate() landing mid-build means the values may predate the
+        # import; rebuild once, and if it happens again serve without caching
+        for _ in range(2):
+            version = _version
+            built = await _build(version)
+            if version == _version:
+                _options = built
+                print(f"Options cache built (version {built.version}, etag {built.etag})")
+                return built
+        return built
+
+def invalidate():
+    """
+    Drop the cached options; the import pipeline calls this after writing.
+    The ETag is a content hash, so an import that changes nothing keeps it.
+    """
+    global _options, _version
+    _version += 1
+    _options = None
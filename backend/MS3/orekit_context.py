@@ -0,0 +1,60 @@
+import os
+import threading
+from typing import NamedTuple
+
+import orekit
+vm_env = orekit.initVM()
+
+from org.orekit.data import DataContext, DirectoryCrawler
+from org.orekit.time import AbsoluteDate, TimeScalesFactory
+from org.orekit.frames import FramesFactory
+from org.orekit.bodies import OneAxisEllipsoid
+from org.orekit.utils import Constants, IERSConventions
+from java.util import Date
+from java.io import File
+
+OREKIT_DATA_PATH = os.getenv("OREKIT_DATA_PATH", "/app/orekit-data")
+
+class OrekitContext(NamedTuple):
+    utc:   object   # TimeScale
+    itrf:  object   # Frame (IERS 2010, simple EOP)
+    earth: object   # OneAxisEllipsoid, WGS84 on ITRF
+
+_context = None
+_lock = threading.Lock()
+
+def attach_thread():
+    """
+    Attach the calling thread to the JVM if it is not attached yet.
+    """
+    if not vm_env.isCurrentThreadAttached():
+        vm_env.attachCurrentThread()
+
+def get_context() -> OrekitContext:
+    """
+    Return the process-wide Orekit context, building it on first use.
+    Data providers, UTC, ITRF (with EOP loading) and the WGS84 ellipsoid are
+    created exactly once; they are immutable and safe to share across threads.
+    """
+    global _context
+    if _context is None:
+        with _lock:
+            if _context is None:
+                attach_thread()
+                mgr = DataContext.getDefault().getDataProvidersManager()
+                mgr.clearProviders()
+                mgr.addProvider(DirectoryCrawler(File(OREKIT_DATA_PATH)))
+
+                utc   = TimeScalesFactory.getUTC()
+                itrf  = FramesFactory.getITRF(IERSConventions.IERS_2010, True)
+                earth = OneAxisEllipsoid(
+                    Constants.WGS84_EARTH_EQUATORIAL_RADIUS,
+                    Constants.WGS84_EARTH_FLATTENING,
+                    itrf,
+                )
+                _context = OrekitContext(utc=utc, itrf=itrf, earth=earth)
+                print(f"Orekit context ready (data: {OREKIT_DATA_PATH})")
+    return _context
+
+def now() -> AbsoluteDate:
+    return AbsoluteDate(Date(), get_context().utc)
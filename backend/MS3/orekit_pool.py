@@ -0,0 +1,95 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import orekit_context
+
+# long-lived JVM-attached worker threads
+WORKERS        = int(os.getenv("OREKIT_WORKERS", os.cpu_count() or 4))
+# jobs allowed to wait for a worker before callers get backpressure
+QUEUE_SIZE     = int(os.getenv("OREKIT_QUEUE_SIZE", 32))
+# seconds a caller waits for a queue slot before PoolSaturated
+SUBMIT_TIMEOUT = float(os.getenv("OREKIT_SUBMIT_TIMEOUT", 2.0))
+
+class PoolSaturated(RuntimeError):
+    """Raised when the Orekit job queue stays full for SUBMIT_TIMEOUT seconds."""
+
+def _init_worker():
+    # attach once for the lifetime of the thread instead of per request
+    orekit_context.attach_thread()
+
+_executor = ThreadPoolExecutor(
+    max_workers=WORKERS,
+    thread_name_prefix="orekit",
+    initializer=_init_worker,
+)
+_slots = threading.BoundedSemaphore(WORKERS + QUEUE_SIZE)
+_warm = threading.Event()
+
+def _submit_holding_slot(fn, *args, **kwargs) -> Future:
+    try:
+        future = _executor.submit(fn, *args, **kwargs)
+    except Exception:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+    return future
+
+def submit(fn, *args, **kwargs) -> Future:
+    """
+    Queue fn(*args, **kwargs) on an Orekit worker. Blocks up to SUBMIT_TIMEOUT
+    for a free slot and raises PoolSaturated if the queue stays full.
+    """
+    if not _slots.acquire(timeout=SUBMIT_TIMEOUT):
+        raise PoolSaturated(f"Orekit pool busy ({WORKERS} workers, {QUEUE_SIZE} queued)")
+    return _submit_holding_slot(fn, *args, **kwargs)
+
+def run(fn, *args, **kwargs):
+    """
+    Run a job on the pool from a sync handler and wait for its result.
+    """
+    return submit(fn, *args, **kwargs).result()
+
+def _release_if_acquired(waiter):
+    if not waiter.cancelled() and waiter.exception() is None and waiter.result():
+        _slots.release()
+
+async def run_async(fn, *args, **kwargs):
+    """
+    Run a job on the pool from an async handler without blocking the event loop.
+    """
+    if not _slots.acquire(blocking=False):
+        # shielded: if the request is cancelled while the thread is still
+        # waiting, the thread may acquire the slot anyway and it must go back
+        waiter = asyncio.ensure_future(asyncio.to_thread(_slots.acquire, True, SUBMIT_TIMEOUT))
+        try:
+            acquired = await asyncio.shield(waiter)
+        except asyncio.CancelledError:
+            waiter.add_done_callback(_release_if_acquired)
+            raise
+        if not acquired:
+            raise PoolSaturated(f"Orekit pool busy ({WORKERS} workers, {QUEUE_SIZE} queued)")
+    return await asyncio.wrap_future(_submit_holding_slot(fn, *args, **kwargs))
+
+def start():
+    """
+    Spin up every worker and build the shared Orekit context on one of them.
+    """
+    # the barrier keeps each warm-up job busy so the executor spawns every thread
+    barrier = threading.Barrier(WORKERS)
+
+    def warm_up():
+        orekit_context.get_context()
+        barrier.wait(timeout=60)
+
+    for future in [submit(warm_up) for _ in range(WORKERS)]:
+        future.result()
+    _warm.set()
+    print(f"Orekit pool ready ({WORKERS} workers, queue {QUEUE_SIZE})")
+
+def is_warm() -> bool:
+    return _warm.is_set()
+
+def shutdown():
+    _executor.shutdown(wait=False, cancel_futures=True)
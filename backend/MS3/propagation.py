@@ -0,0 +1,119 @@
+from datetime import datetime, timezone
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+from sgp4.api import Satrec, SatrecArray, jday
+
+# WGS84 ellipsoid (km)
+WGS84_A  = 6378.137
+WGS84_F  = 1.0 / 298.257223563
+WGS84_E2 = WGS84_F * (2.0 - WGS84_F)
+
+def julian_date(when: Optional[datetime] = None) -> Tuple[float, float]:
+    """
+    Split Julian date (jd, fr) of a UTC datetime, as expected by sgp4.
+    """
+    when = when or datetime.now(timezone.utc)
+    if when.tzinfo is not None:
+        when = when.astimezone(timezone.utc)
+    return jday(
+        when.year, when.month, when.day,
+        when.hour, when.minute, when.second + when.microsecond / 1e6,
+    )
+
+def gmst(jd, fr):
+    """
+    Greenwich mean sidereal time in radians (IAU-82, same model as sgp4's gstime).
+    """
+    tut1 = ((jd - 2451545.0) + fr) / 36525.0
+    seconds = (
+        -6.2e-6 * tut1 ** 3
+        + 0.093104 * tut1 ** 2
+        + (876600.0 * 3600 + 8640184.812866) * tut1
+        + 67310.54841
+    )
+    return np.mod(np.radians(seconds / 240.0), 2 * np.pi)
+
+def teme_to_geodetic(r, jd, fr):
+    """
+    Convert TEME positions (..., 3) in km at (jd, fr) to WGS84 geodetic
+    latitude/longitude in degrees and altitude in metres. Polar motion is ignored.
+    """
+    r = np.asarray(r, dtype=float)
+    theta = gmst(jd, fr)
+    cos_t, sin_t = np.cos(theta), np.sin(theta)
+
+    # TEME → Earth-fixed: rotate about z by GMST
+    x = cos_t * r[..., 0] + sin_t * r[..., 1]
+    y = -sin_t * r[..., 0] + cos_t * r[..., 1]
+    z = r[..., 2]
+
+    lon = np.arctan2(y, x)
+    p   = np.hypot(x, y)
+    lat = np.arctan2(z, p * (1.0 - WGS84_E2))
+    for _ in range(5):
+        sin_lat = np.sin(lat)
+        n   = WGS84_A / np.sqrt(1.0 - WGS84_E2 * sin_lat ** 2)
+        lat = np.arctan2(z + WGS84_E2 * n * sin_lat, p)
+
+    sin_lat, cos_lat = np.sin(lat), np.cos(lat)
+    n   = WGS84_A / np.sqrt(1.0 - WGS84_E2 * sin_lat ** 2)
+    alt = p * cos_lat + z * sin_lat - n * (1.0 - WGS84_E2 * sin_lat ** 2)
+
+    return np.degrees(lat), np.degrees(lon), alt * 1000.0
+
+class SatelliteBatch:
+    """
+    A set of TLEs parsed once into an sgp4 SatrecArray so that every
+    satellite can be propagated to a time in a single vectorized call.
+    """
+
+    def __init__(self, names, satrecs):
+        self.names = np.asarray(names, dtype=object)
+        self.array = SatrecArray(list(satrecs)) if len(self.names) else None
+
+    @classmethod
+    def from_tles(cls, records: Iterable[Tuple[str, str, str]], cache=None) -> "SatelliteBatch":
+        """
+        Build a batch from (name, tle1, tle2) tuples, skipping unparsable sets.
+        Parsed Satrecs are reused from `cache` (a tle_cache.TLECache) when given.
+        """
+        names, satrecs = [], []
+        for name, tle1, tle2 in records:
+            try:
+                if cache is not None:
+                    satrecs.append(cache.get(name, tle1, tle2, Satrec.twoline2rv))
+                else:
+                    satrecs.append(Satrec.twoline2rv(tle1, tle2))
+                names.append(name)
+            except Exception as e:
+                print(f"TLE parse failed for {name}: {e}")
+        return cls(names, satrecs)
+
+    def __len__(self):
+        return len(self.names)
+
+    def geodetic(self, when: Optional[datetime] = None):
+        """
+        Propagate every satellite to `when` (default: now).
+        Returns (ok, lat_deg, lon_deg, alt_m) aligned with self.names; rows
+        that sgp4 flags as failed (decayed, bad elements, ...) have ok=False.
+        """
+        if self.array is None:
+            empty = np.empty(0)
+            return np.empty(0, dtype=bool), empty, empty, empty
+
+        jd, fr = julian_date(when)
+        e, r, _ = self.array.sgp4(np.array([jd]), np.array([fr]))
+        ok = (e[:, 0] == 0) & np.all(np.isfinite(r[:, 0, :]), axis=1)
+
+        lat, lon, alt = teme_to_geodetic(r[:, 0, :], jd, fr)
+        return ok, lat, lon, alt
+
+    def positions(self, when: Optional[datetime] = None):
+        """
+        Like geodetic(), but returns (names, lat_deg, lon_deg, alt_m) for the
+        successfully propagated satellites only.
+        """
+        ok, lat, lon, alt = self.geodetic(when)
+        return self.names[ok], lat[ok], lon[ok], alt[ok]
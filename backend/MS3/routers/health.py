@@ -0,0 +1,55 @@
+import asyncio
+import os
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from neo4j_driver import get_async_session
+from data import pipeline
+import orekit_pool
+import snapshot
+
+router = APIRouter()
+
+# seconds the readiness probe waits on Neo4j before reporting not ready
+READY_TIMEOUT = float(os.getenv("READY_TIMEOUT_SEC", 2.0))
+
+async def _neo4j_ok():
+    async with get_async_session() as session:
+        result = await session.run("RETURN 1 AS ok")
+        await result.consume()
+
+@router.get("/health/live")
+def live():
+    # the process is up and the event loop is answering
+    return {"status": "ok"}
+
+@router.get("/health/ready")
+async def ready():
+    """
+    Ready as soon as Neo4j answers: the API serves the existing graph while
+    an import is still running, so the import state is reported, not gated on.
+    """
+    neo4j_error = None
+    try:
+        await asyncio.wait_for(_neo4j_ok(), timeout=READY_TIMEOUT)
+    except Exception as e:
+        neo4j_error = str(e) or type(e).__name__
+
+    snap = snapshot.current()
+    body = {
+        "status":      "ready" if neo4j_error is None else "not ready",
+        "neo4j":       "ok" if neo4j_error is None else neo4j_error,
+        "orekit_warm": orekit_pool.is_warm(),
+        "positions_age": round(snap.age(), 3) if snap else None,
+        "import":      pipeline.status()["state"],
+    }
+    return JSONResponse(body, status_code=200 if neo4j_error is None else 503)
+
+@router.get("/api/import/status")
+def import_status():
+    return pipeline.status()
+
+@router.post("/api/import/run", status_code=202)
+def run_import():
+    if not pipeline.start_background():
+        return JSONResponse({"msg": "Import already running", **pipeline.status()}, status_code=409)
+    return {"msg": "Import started"}
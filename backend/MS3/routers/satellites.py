@@ -1,197 +1,325 @@
-from fastapi import APIRouter, HTTPException, Query
-from neo4j_driver import get_session
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from neo4j_driver import get_async_session
+from data.utils import normalize_key
+from propagation import SatelliteBatch
+import tle_cache
+import snapshot
+import options_cache
 from typing import Optional, List, Dict
-from functools import wraps
 
+import asyncio
+import json
 import math
+import os
+import threading
 
-import orekit
-import jpype
-vm_env = orekit.initVM()
+import orekit_context
+import orekit_pool
 
-from org.orekit.data import DataContext, DirectoryCrawler
 from org.orekit.propagation.analytical.tle import TLE, TLEPropagator
-from org.orekit.time import AbsoluteDate, TimeScalesFactory
-from org.orekit.frames import FramesFactory
-from org.orekit.bodies import OneAxisEllipsoid
-from org.orekit.utils import IERSConventions
-from java.util import Date
-from java.io import File
-
-ctx = DataContext.getDefault()
-mgr = ctx.getDataProvidersManager()
-mgr.clearProviders()
-mgr.addProvider(DirectoryCrawler(File("/app/orekit-data")))
-
-def with_orekit_thread(func):
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        vm_env.attachCurrentThread()
-        try:
-            return func(*args, **kwargs)
-        finally:
-            vm_env.detachCurrentThread()
-    return wrapper
 
 router = APIRouter(prefix="/api/satellites")
 
+# satellites propagated per step when /graph3d streams NDJSON
+STREAM_CHUNK = int(os.getenv("GRAPH_STREAM_CHUNK", 500))
+
+def build_propagator(tle1, tle2):
+    # TLEPropagator keeps propagation state, so each cached one carries its own lock
+    return TLEPropagator.selectExtrapolator(TLE(tle1, tle2)), threading.Lock()
+
+def propagate_with_orekit(sats):
+    """
+    Runs on an orekit_pool worker: propagate (name, tle1, tle2) tuples to now
+    and return {name: (lat_deg, lon_deg, alt_m)} for the finite results.
+    """
+    # Shared OreKit frame/ellipsoid, built once per process
+    ctx         = orekit_context.get_context()
+    now_date    = orekit_context.now()
+    earth_frame = ctx.itrf
+    earth       = ctx.earth
+
+    positions = {}
+    for name, tle1, tle2 in sats:
+        try:
+            propagator, lock = tle_cache.propagator_cache.get(name, tle1, tle2, build_propagator)
+            with lock:
+                pv = propagator.propagate(now_date).getPVCoordinates(earth_frame)
+            geo = earth.transform(pv.getPosition(), earth_frame, now_date)
+
+            lat = math.degrees(geo.getLatitude())
+            lon = math.degrees(geo.getLongitude())
+            alt = geo.getAltitude()
+
+            if all(isinstance(v, float) and math.isfinite(v) for v in (lat, lon, alt)):
+                positions[name] = (lat, lon, alt)
+        except Exception as e:
+            print(f"Propagation failed for {name}: {e}")
+    return positions
+
+def propagate_with_sgp4(records):
+    """
+    Runs in a worker thread: parse (name, tle1, tle2) records and propagate
+    them to now in one vectorized sgp4 call, off the event loop.
+    """
+    names, lat, lon, alt = SatelliteBatch.from_tles(records, cache=tle_cache.satrec_cache).positions()
+    return [
+        {"name": n, "lat": float(la), "lon": float(lo), "alt": float(al)}
+        for n, la, lo, al in zip(names, lat, lon, alt)
+    ]
+
+def key_filter(**keys: Optional[str]):
+    """
+    Build an equality WHERE fragment over the normalized *_key properties,
+    leaving out unset filters so the planner can seek on their indexes.
+    """
+    params = {prop: normalize_key(v) for prop, v in keys.items()}
+    params = {prop: v for prop, v in params.items() if v is not None}
+    clause = " AND ".join(f"s.{prop} = ${prop}" for prop in params) or "true"
+    return clause, params
+
+def report_staleness(response: Response, snap):
+    # age of the positions served: 0 when propagated for this request
+    response.headers["X-Positions-Age"] = f"{snap.age():.3f}" if snap else "0"
+    if snap:
+        response.headers["X-Positions-Time"] = snap.computed_at.isoformat()
+
 @router.get("/positions")
 async def get_satellite_positions(
+    response: Response,
     orbit: Optional[str] = Query(None),
     constellation: Optional[str] = Query(None),
     country: Optional[str] = Query(None),
     manufacturer: Optional[str] = Query(None)
 ):
-    query = """
+    snap = snapshot.current()
+    report_staleness(response, snap)
+    if snap is not None:
+        rows = snap.select(
+            orbit_class_key=normalize_key(orbit),
+            constellation_key=normalize_key(constellation),
+            country_key=normalize_key(country),
+            manufacturer_key=normalize_key(manufacturer),
+        )
+        return [
+            {"name": n, "lat": float(la), "lon": float(lo), "alt": float(al)}
+            for n, la, lo, al in zip(snap.names[rows], snap.lat[rows], snap.lon[rows], snap.alt[rows])
+        ]
+
+    # No fresh snapshot yet: propagate this request's satellites directly
+    where, params = key_filter(
+        orbit_class_key=orbit,
+        constellation_key=constellation,
+        country_key=country,
+        manufacturer_key=manufacturer,
+    )
+    query = f"""
     MATCH (s:Satellite)
-    WHERE ($orbit IS NULL OR toUpper(s.orbit_class) = toUpper($orbit))
-      AND ($constellation IS NULL OR toUpper(s.constellation) = toUpper($constellation))
-      AND ($country IS NULL OR toUpper(s.country_of_operator) = toUpper($country))
-      AND ($manufacturer IS NULL OR toUpper(s.manufacturer) = toUpper($manufacturer))
+    WHERE {where}
       AND s.tle1 IS NOT NULL AND s.tle2 IS NOT NULL
     RETURN s.name AS name, s.tle1 AS tle1, s.tle2 AS tle2
-    LIMIT 100
     """
 
-    session = get_session()
-    satellites = []
-    now_date = AbsoluteDate.now(ts_utc)  # Current time for propagation
-
     try:
-        result = session.run(query, {
-            "orbit": orbit,
-            "constellation": constellation,
-            "country": country,
-            "manufacturer": manufacturer
-        })
-
-        for record in result:
-            try:
-                tle = TLE(record["tle1"], record["tle2"])
-                propagator = TLEPropagator.selectExtrapolator(tle)
-                pv = propagator.propagate(now_date).getPVCoordinates(earth_frame)
-                pos = pv.getPosition()
-                lat_lon = earth.transform(pos, earth_frame, now_date)
-                
-                satellites.append({
-                    "name": record["name"],
-                    "lat": lat_lon.getLatitude().toDegrees(),
-                    "lon": lat_lon.getLongitude().toDegrees(),
-                    "alt": lat_lon.getAltitude()
-                })
-            except Exception as e:
-                print(f"TLE propagation failed for {record['name']}: {e}")
-                continue
-
-        return satellites
+        # 1) Fetch every matching TLE-bearing satellite
+        async with get_async_session() as session:
+            result = await session.run(query, params)
+            records = [
+                (rec["name"], rec["tle1"], rec["tle2"])
+                async for rec in result
+            ]
+
+        # 2) Propagate the whole set to "now"; parsing and sgp4 over the full
+        #    catalog would stall every other request on the loop
+        return await asyncio.to_thread(propagate_with_sgp4, records)
 
     except Exception as e:
         print(f"Error in /positions: {e}")
         raise HTTPException(status_code=500, detail="Failed to compute satellite positions.")
 
+async def graph3d_positions(records, snap):
+    """
+    {name: (lat, lon, alt)} for the TLE-bearing satellites in `records`, from
+    the background snapshot or, when there is none, the Orekit worker pool.
+    """
+    sats = {}
+    for rec in records:
+        if rec["tle1"] and rec["tle2"]:
+            sats.setdefault(rec["id"], (rec["id"], rec["tle1"], rec["tle2"]))
+
+    if snap is not None:
+        positions = {}
+        for name in sats:
+            pos = snap.position(name)
+            if pos is not None:
+                positions[name] = pos
+        return positions
+    return await orekit_pool.run_async(propagate_with_orekit, list(sats.values()))
+
+def graph3d_node(rec, position):
+    lat, lon, alt = position
+    return {
+        "id":            rec["id"],
+        "lat":           lat,
+        "lon":           lon,
+        "alt":           alt,
+        "country":       rec.get("country"),
+        "constellation": rec.get("constellation"),
+        "manufacturer":  rec.get("manufacturer")
+    }
+
+def ndjson_line(obj) -> str:
+    return json.dumps(obj) + "\n"
+
+async def achunked(records, size):
+    chunk = []
+    async for rec in records:
+        chunk.append(rec)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+async def stream_graph3d(cypher, params, snap):
+    """
+    Yield one NDJSON line per node/link while the Neo4j cursor is read,
+    propagating STREAM_CHUNK satellites at a time so memory stays bounded.
+    """
+    async with get_async_session() as session:
+        result = await session.run(cypher, params)
+        async for chunk in achunked(result, STREAM_CHUNK):
+            try:
+                positions = await graph3d_positions(chunk, snap)
+            except orekit_pool.PoolSaturated as e:
+                yield ndjson_line({"error": str(e)})
+                return
+            for rec in chunk:
+                if rec["id"] in positions:
+                    yield ndjson_line({"node": graph3d_node(rec, positions[rec["id"]])})
+                for link in rec["links"]:
+                    yield ndjson_line({"link": {"source": rec["id"], **link}})
+
 @router.get("/graph3d")
-@with_orekit_thread
-def get_graph_with_positions(
+async def get_graph_with_positions(
+    response:      Response,
     manufacturer:  Optional[str] = Query(None),
     orbit:         Optional[str] = Query(None),
     constellation: Optional[str] = Query(None),
     country:       Optional[str] = Query(None),
-) -> Dict[str, List[Dict]]:
+    stream:        Optional[str] = Query(None),
+):
 
     def norm(v: Optional[str]) -> Optional[str]:
         if not v or v.strip().upper() == "ALL":
             return None
         return v
 
-    m = norm(manufacturer)
-    o = norm(orbit)
-    c = norm(constellation)
-    co= norm(country)
+    where, params = key_filter(
+        manufacturer_key=norm(manufacturer),
+        orbit_class_key=norm(orbit),
+        constellation_key=norm(constellation),
+        country_key=norm(country),
+    )
 
-    # 1) Fetch satellites + relationships
-    cypher = """
+    # 1) One row per satellite with its outgoing relationships
+    cypher = f"""
     MATCH (s:Satellite)
-     WHERE ($m  IS NULL OR toUpper(coalesce(s.manufacturer,      '')) = toUpper($m))
-       AND ($o  IS NULL OR toUpper(coalesce(s.orbit_class,      '')) = toUpper($o))
-       AND ($c  IS NULL OR toUpper(coalesce(s.constellation,   '')) = toUpper($c))
-       AND ($co IS NULL OR toUpper(coalesce(s.country_of_operator,'')) = toUpper($co))
-    OPTIONAL MATCH (s)-[r]->(a)
-    RETURN 
+     WHERE {where}
+    // a pattern comprehension, not OPTIONAL MATCH + collect: no grouping
+    // aggregation, so rows stream out as the scan finds them
+    RETURN
       s.name            AS id,
       s.manufacturer    AS manufacturer,
       s.constellation   AS constellation,
       s.country_of_operator AS country,
-      s.tle1            AS tle1, 
+      s.tle1            AS tle1,
       s.tle2            AS tle2,
-      type(r)           AS type, 
-      a.name            AS target
+      [(s)-[r]->(a) | {{target: a.name, type: type(r)}}] AS links
     """
 
-    session = get_session()
-    result  = session.run(cypher, m=m, o=o, c=c, co=co)
-
-    # 2) Prepare OreKit once
-    ts_utc      = TimeScalesFactory.getUTC()
-    now_date    = AbsoluteDate(Date(), ts_utc)
-    earth_frame = FramesFactory.getITRF(IERSConventions.IERS_2010, True)
-    earth       = OneAxisEllipsoid(
-        6_378_136.46, 1.0/298.257223563, earth_frame
-    )
+    # 2) Positions from the background snapshot, or the Orekit worker pool
+    #    when no fresh snapshot exists
+    snap = snapshot.current()
 
-    nodes: Dict[str, Dict] = {}
-    links: List[Dict]   = []
+    if stream == "ndjson":
+        streamed = StreamingResponse(
+            stream_graph3d(cypher, params, snap), media_type="application/x-ndjson"
+        )
+        report_staleness(streamed, snap)
+        return streamed
 
-    for rec in result:
-        src      = rec["id"]
-        tle1     = rec.get("tle1")
-        tle2     = rec.get("tle2")
-        country  = rec.get("country")
-        constel  = rec.get("constellation")
-        manu     = rec.get("manufacturer")
+    report_staleness(response, snap)
+    async with get_async_session() as session:
+        result  = await session.run(cypher, params)
+        records = [rec async for rec in result]
 
-        if src not in nodes and tle1 and tle2:
-            try:
-                tle        = TLE(tle1, tle2)
-                propagator = TLEPropagator.selectExtrapolator(tle)
-                pv         = propagator.propagate(now_date).getPVCoordinates(earth_frame)
-                pos        = pv.getPosition()
-                geo        = earth.transform(pos, earth_frame, now_date)
-
-                lat = math.degrees(geo.getLatitude())
-                lon = math.degrees(geo.getLongitude())
-                alt = geo.getAltitude()
-
-                if all(isinstance(v, float) and math.isfinite(v) for v in (lat, lon, alt)):
-                    nodes[src] = {
-                        "id":            src,
-                        "lat":           lat,
-                        "lon":           lon,
-                        "alt":           alt,
-                        "country":       country,
-                        "constellation": constel,
-                        "manufacturer":  manu
-                    }
-            except Exception as e:
-                print(f"Propagation failed for {src}: {e}")
-
-        tgt = rec.get("target")
-        if src and tgt:
+    try:
+        positions = await graph3d_positions(records, snap)
+    except orekit_pool.PoolSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    nodes: List[Dict] = []
+    links: List[Dict] = []
+
+    for rec in records:
+        src = rec["id"]
+        if src in positions:
+            nodes.append(graph3d_node(rec, positions[src]))
+        for link in rec["links"]:
             links.append({
                 "source": src,
-                "target": tgt,
-                "type":   rec.get("type")
+                "target": link["target"],
+                "type":   link["type"]
             })
 
-    return {"nodes": list(nodes.values()), "links": links}
+    return {"nodes": nodes, "links": links}
+
+async def stream_graph(params):
+    """
+    NDJSON variant of /graph: satellites come one row each with their links
+    alongside, so only the (few) link targets need de-duplicating.
+    """
+    query = """
+    MATCH (s:Satellite)
+    WHERE ($manufacturer IS NULL OR s.manufacturer = $manufacturer)
+      AND ($orbit IS NULL OR s.orbit_class = $orbit)
+      AND ($constellation IS NULL OR s.constellation = $constellation)
+      AND ($country IS NULL OR s.country_of_operator = $country)
+    RETURN s.name AS source, [(s)-[r]->(a) | {target: a.name, type: type(r)}] AS links
+    """
+    seen_targets = set()
+    async with get_async_session() as session:
+        result = await session.run(query, params)
+        async for record in result:
+            source = record["source"]
+            yield ndjson_line({"node": {"id": source, "label": source}})
+            for link in record["links"]:
+                target = link["target"]
+                if target not in seen_targets:
+                    seen_targets.add(target)
+                    yield ndjson_line({"node": {"id": target, "label": target}})
+                yield ndjson_line({"link": {"source": source, **link}})
 
-    
 @router.get("/graph")
-def get_graph(
+async def get_graph(
     manufacturer: Optional[str] = None,
     orbit: Optional[str] = None,
     constellation: Optional[str] = None,
     country: Optional[str] = None,
+    stream: Optional[str] = None,
 ):
+    if stream == "ndjson":
+        return StreamingResponse(
+            stream_graph({
+                "manufacturer": manufacturer,
+                "orbit": orbit,
+                "constellation": constellation,
+                "country": country,
+            }),
+            media_type="application/x-ndjson",
+        )
+
     try:
         query = """
         MATCH (s:Satellite)
@@ -203,27 +331,27 @@ def get_graph(
         RETURN s.name AS source, type(r) AS type, a.name AS target
         """
 
-        session = get_session()
-        result = session.run(
-            query,
-            manufacturer=manufacturer,
-            orbit=orbit,
-            constellation=constellation,
-            country=country
-        )
-
         nodes = {}
         edges = []
 
-        for record in result:
-            for node in [record["source"], record["target"]]:
-                if node and node not in nodes:
-                    nodes[node] = {"id": node, "label": node}
-            edges.append({
-                "source": record["source"],
-                "target": record["target"],
-                "type": record["type"]
-            })
+        async with get_async_session() as session:
+            result = await session.run(
+                query,
+                manufacturer=manufacturer,
+                orbit=orbit,
+                constellation=constellation,
+                country=country
+            )
+
+            async for record in result:
+                for node in [record["source"], record["target"]]:
+                    if node and node not in nodes:
+                        nodes[node] = {"id": node, "label": node}
+                edges.append({
+                    "source": record["source"],
+                    "target": record["target"],
+                    "type": record["type"]
+                })
 
         return {
             "nodes": list(nodes.values()),
@@ -234,42 +362,19 @@ def get_graph(
         print(f"Error in /graph: {e}")
         raise HTTPException(status_code=500, detail="Internal Server Error")
 
+@router.get("/cache-stats")
+def get_cache_stats():
+    return tle_cache.stats()
+
 @router.get("/options")
-def get_options():
+async def get_options(request: Request):
     try:
-        session = get_session()
-        query = """
-        MATCH (s:Satellite)
-        RETURN DISTINCT 
-            s.manufacturer AS manufacturer,
-            s.orbit_class AS orbit,
-            s.constellation AS constellation,
-            s.country_of_operator AS country
-        """
-        result = session.run(query)
-
-        manufacturers = set()
-        orbits = set()
-        constellations = set()
-        countries = set()
-
-        for record in result:
-            if record["manufacturer"]:
-                manufacturers.add(record["manufacturer"])
-            if record["orbit"]:
-                orbits.add(record["orbit"])
-            if record["constellation"]:
-                constellations.add(record["constellation"])
-            if record["country"]:
-                countries.add(record["country"])
-
-        return {
-            "manufacturers": sorted(manufacturers),
-            "orbits": sorted(orbits),
-            "constellations": sorted(constellations),
-            "countries": sorted(countries)
-        }
-
+        options = await options_cache.get()
     except Exception as e:
         print(f"Error in /options: {e}")
         raise HTTPException(status_code=500, detail="Internal Server Error")
+
+    headers = {"ETag": options.etag, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == options.etag:
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(options.values, headers=headers)
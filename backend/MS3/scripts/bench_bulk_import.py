@@ -0,0 +1,63 @@
+"""
+Compare row-at-a-time MERGE against the batched UNWIND writer.
+
+Run from backend/MS3 against a local Neo4j (uses the same .env as the app):
+    python -m scripts.bench_bulk_import 10000
+Benchmark nodes are named BENCH-<n> and deleted afterwards.
+"""
+import sys
+import time
+from neo4j_driver import get_session
+from data.bulk import bulk_write
+
+ROW_CYPHER = """
+MERGE (s:Satellite {name: $name})
+SET s.tle1 = $tle1, s.tle2 = $tle2, s.latitude = $lat, s.longitude = $lon, s.altitude = $alt
+"""
+
+BULK_CYPHER = """
+UNWIND $rows AS row
+MERGE (s:Satellite {name: row.name})
+SET s.tle1 = row.tle1, s.tle2 = row.tle2, s.latitude = row.lat, s.longitude = row.lon, s.altitude = row.alt
+"""
+
+def make_rows(n):
+    return [
+        {
+            "name": f"BENCH-{i}",
+            "tle1": f"1 {i:05d}U 24001A   24001.00000000  .00000000  00000-0  00000-0 0  9990",
+            "tle2": f"2 {i:05d}  53.0000   0.0000 0001000   0.0000   0.0000 15.00000000    10",
+            "lat":  (i % 180) - 90.0,
+            "lon":  (i % 360) - 180.0,
+            "alt":  550_000.0,
+        }
+        for i in range(n)
+    ]
+
+def cleanup():
+    with get_session() as session:
+        session.run("MATCH (s:Satellite) WHERE s.name STARTS WITH 'BENCH-' DETACH DELETE s").consume()
+
+def per_row(rows):
+    with get_session() as session:
+        for row in rows:
+            session.run(ROW_CYPHER, row).consume()
+
+def report(label, n, seconds):
+    print(f"{label:<12} {n} rows in {seconds:6.2f}s → {n / seconds:8.0f} rows/sec")
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    rows = make_rows(n)
+
+    cleanup()
+    start = time.perf_counter()
+    per_row(rows)
+    report("per-row", n, time.perf_counter() - start)
+
+    cleanup()
+    start = time.perf_counter()
+    bulk_write(BULK_CYPHER, rows, label="bench rows")
+    report("UNWIND", n, time.perf_counter() - start)
+
+    cleanup()
@@ -0,0 +1,93 @@
+"""
+p50/p99 latency of the old toUpper() filters against the indexed *_key filters.
+
+Run from backend/MS3 against a scratch Neo4j database (it seeds BENCH-<n>
+Satellite nodes and deletes them afterwards):
+    python -m scripts.bench_filters 50000 200
+"""
+import random
+import sys
+import time
+from neo4j_driver import get_session
+from data.bulk import bulk_write
+from data.schema import ensure_schema
+from data.utils import normalize_key
+
+ORBITS        = ["LEO", "MEO", "GEO", "Elliptical"]
+COUNTRIES     = ["USA", "China", "Russia", "United Kingdom", "India", "Japan", "France"]
+MANUFACTURERS = [f"Contractor {i}" for i in range(200)]
+CONSTELLATIONS = [f"Group {i}" for i in range(50)]
+
+SEED_CYPHER = """
+UNWIND $rows AS row
+MERGE (s:Satellite {name: row.name})
+SET s.orbit_class = row.orbit, s.country_of_operator = row.country,
+    s.manufacturer = row.manufacturer, s.constellation = row.constellation,
+    s.orbit_class_key = row.orbit_key, s.country_key = row.country_key,
+    s.manufacturer_key = row.manufacturer_key, s.constellation_key = row.constellation_key
+"""
+
+OLD_QUERY = """
+MATCH (s:Satellite)
+WHERE toUpper(coalesce(s.manufacturer, '')) = toUpper($manufacturer)
+  AND toUpper(coalesce(s.country_of_operator, '')) = toUpper($country)
+RETURN count(s) AS n
+"""
+
+NEW_QUERY = """
+MATCH (s:Satellite)
+WHERE s.manufacturer_key = $manufacturer AND s.country_key = $country
+RETURN count(s) AS n
+"""
+
+def seed(n):
+    rows = []
+    for i in range(n):
+        orbit, country = random.choice(ORBITS), random.choice(COUNTRIES)
+        manufacturer, constellation = random.choice(MANUFACTURERS), random.choice(CONSTELLATIONS)
+        rows.append({
+            "name": f"BENCH-{i}",
+            "orbit": orbit, "country": country,
+            "manufacturer": manufacturer, "constellation": constellation,
+            "orbit_key": normalize_key(orbit), "country_key": normalize_key(country),
+            "manufacturer_key": normalize_key(manufacturer),
+            "constellation_key": normalize_key(constellation),
+        })
+    bulk_write(SEED_CYPHER, rows, batch_size=5000, label="bench sats")
+
+def cleanup():
+    with get_session() as session:
+        session.run(
+            "MATCH (s:Satellite) WHERE s.name STARTS WITH 'BENCH-' "
+            "CALL { WITH s DETACH DELETE s } IN TRANSACTIONS OF 10000 ROWS"
+        ).consume()
+
+def measure(query, runs, normalize):
+    timings = []
+    with get_session() as session:
+        for _ in range(runs):
+            manufacturer = random.choice(MANUFACTURERS).lower()
+            country = random.choice(COUNTRIES).lower()
+            if normalize:
+                manufacturer, country = normalize_key(manufacturer), normalize_key(country)
+            start = time.perf_counter()
+            session.run(query, manufacturer=manufacturer, country=country).consume()
+            timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2], timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+
+if __name__ == "__main__":
+    n    = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    ensure_schema()
+    seed(n)
+    try:
+        for label, query, normalize in (
+            ("toUpper()", OLD_QUERY, False),
+            ("*_key",     NEW_QUERY, True),
+        ):
+            p50, p99 = measure(query, runs, normalize)
+            print(f"{label:<10} p50 {p50:8.2f} ms   p99 {p99:8.2f} ms   ({runs} runs, {n} sats)")
+    finally:
+        cleanup()
@@ -0,0 +1,93 @@
+"""
+Local stand-in for celestrak.org's gp.php endpoint, serving canned TLE files
+with artificial latency so the concurrent Celestrak fetch can be exercised offline.
+
+    python -m scripts.celestrak_standin --dir ./tle-fixtures --latency 1.5 --port 8089
+    CELESTRAK_BASE_URL=http://localhost:8089 CELESTRAK_CONSTELLATIONS=STARLINK,GPS ...
+
+<dir>/<GROUP>.tle is served for ?GROUP=<GROUP>; groups without a file get
+--synthetic generated records. Add --fail-rate to inject 503s for retry testing,
+or --fail-first N --fail-status 429 to fail the first N requests of every group.
+Responses carry an ETag and answer If-None-Match with 304, like the real site.
+tests/test_celestrak_fetch.py runs it in-process on an ephemeral port.
+"""
+import argparse
+import hashlib
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+def synthetic_tles(group, count):
+    lines = []
+    for i in range(count):
+        inc  = 30 + (i * 7) % 70
+        raan = (i * 13.7) % 360
+        ma   = (i * 29.3) % 360
+        lines += [
+            f"{group}-{i}",
+            f"1 {i:05d}U 24001A   24300.50000000  .00016717  00000-0  10270-3 0  9005",
+            f"2 {i:05d} {inc:8.4f} {raan:8.4f} 0006703 130.5360 {ma:8.4f} 15.50000000    10",
+        ]
+    return "\n".join(lines) + "\n"
+
+def make_handler(args):
+    # requests seen per group, for --fail-first
+    seen = Counter()
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path != "/NORAD/elements/gp.php":
+                self.send_error(404)
+                return
+            group = parse_qs(url.query).get("GROUP", [""])[0].upper()
+
+            with lock:
+                seen[group] += 1
+                nth = seen[group]
+            time.sleep(args.latency * random.uniform(0.5, 1.5))
+            if nth <= args.fail_first or random.random() < args.fail_rate:
+                self.send_error(args.fail_status)
+                return
+
+            path = Path(args.dir) / f"{group}.tle"
+            body = path.read_text() if path.exists() else synthetic_tles(group, args.synthetic)
+            data = body.encode()
+            etag = '"' + hashlib.md5(data).hexdigest() + '"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Type", "text/plain")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, fmt, *a):
+            if not getattr(args, "quiet", False):
+                super().log_message(fmt, *a)
+
+    Handler.requests = seen
+    return Handler
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dir", default="./tle-fixtures")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=1.0, help="mean seconds per response")
+    parser.add_argument("--synthetic", type=int, default=500, help="records for groups without a file")
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--fail-first", type=int, default=0, help="fail the first N requests per group")
+    parser.add_argument("--fail-status", type=int, default=503)
+    args = parser.parse_args()
+
+    print(f"Celestrak stand-in on http://localhost:{args.port} (latency ~{args.latency}s)")
+    ThreadingHTTPServer(("", args.port), make_handler(args)).serve_forever()
@@ -0,0 +1,51 @@
+"""
+Fire concurrent requests at a running MS3 and report throughput per
+concurrency level, to check that one uvicorn worker scales with the async driver.
+
+    python -m scripts.load_test http://localhost:5003/api/satellites/graph 400
+"""
+import asyncio
+import sys
+import time
+import httpx
+
+LEVELS = (1, 4, 16, 64, 128)
+
+async def worker(client, url, remaining, timings, errors):
+    while remaining:
+        remaining.pop()
+        start = time.perf_counter()
+        try:
+            resp = await client.get(url)
+            resp.raise_for_status()
+            timings.append((time.perf_counter() - start) * 1000)
+        except Exception:
+            errors.append(1)
+
+async def run_level(url, concurrency, total):
+    remaining = list(range(total))
+    timings, errors = [], []
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(timeout=120.0, limits=limits) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            worker(client, url, remaining, timings, errors) for _ in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - start
+
+    timings.sort()
+    p50 = timings[len(timings) // 2] if timings else float("nan")
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))] if timings else float("nan")
+    print(
+        f"concurrency {concurrency:>4}: {total / elapsed:8.1f} req/s   "
+        f"p50 {p50:8.1f} ms   p99 {p99:8.1f} ms   errors {len(errors)}"
+    )
+
+async def main(url, total):
+    for level in LEVELS:
+        await run_level(url, level, total)
+
+if __name__ == "__main__":
+    url   = sys.argv[1] if len(sys.argv) > 1 else "http://localhost:5003/api/satellites/graph"
+    total = int(sys.argv[2]) if len(sys.argv) > 2 else 400
+    asyncio.run(main(url, total))
@@ -0,0 +1,159 @@
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+import numpy as np
+
+import tle_cache
+from neo4j_driver import get_session
+from propagation import SatelliteBatch
+
+# seconds between propagation passes
+SNAPSHOT_INTERVAL  = float(os.getenv("SNAPSHOT_INTERVAL_SEC", 2.0))
+# handlers fall back to live propagation when the snapshot is older than this
+SNAPSHOT_MAX_AGE   = float(os.getenv("SNAPSHOT_MAX_AGE_SEC", 30.0))
+# safety-net reload of the TLE catalog even if no import marked it dirty
+CATALOG_RELOAD_SEC = float(os.getenv("SNAPSHOT_CATALOG_RELOAD_SEC", 600.0))
+
+KEY_COLUMNS = ("orbit_class_key", "constellation_key", "country_key", "manufacturer_key")
+
+CATALOG_QUERY = """
+MATCH (s:Satellite)
+WHERE s.tle1 IS NOT NULL AND s.tle2 IS NOT NULL
+RETURN s.name AS name, s.tle1 AS tle1, s.tle2 AS tle2,
+       s.orbit_class_key AS orbit_class_key, s.constellation_key AS constellation_key,
+       s.country_key AS country_key, s.manufacturer_key AS manufacturer_key
+"""
+
+def _frozen(array):
+    array.flags.writeable = False
+    return array
+
+@dataclass(frozen=True)
+class Catalog:
+    batch: SatelliteBatch
+    keys:  Dict[str, np.ndarray]   # *_key columns aligned with batch.names
+    index: Dict[str, int]          # name → row
+    loaded_at: float
+
+@dataclass(frozen=True)
+class PositionSnapshot:
+    """
+    Columnar positions of every TLE-bearing satellite at one instant.
+    Arrays are read-only and shared by all readers; a refresh publishes a new object.
+    """
+    computed_at: datetime
+    names: np.ndarray
+    lat:   np.ndarray
+    lon:   np.ndarray
+    alt:   np.ndarray
+    ok:    np.ndarray
+    catalog: Catalog
+
+    def age(self) -> float:
+        return (datetime.now(timezone.utc) - self.computed_at).total_seconds()
+
+    def select(self, **keys: Optional[str]) -> np.ndarray:
+        """
+        Row indices of propagated satellites whose *_key columns equal the
+        given (already normalized) values; None means "no filter".
+        """
+        mask = self.ok.copy()
+        for column, value in keys.items():
+            if value is not None:
+                mask &= self.catalog.keys[column] == value
+        return np.flatnonzero(mask)
+
+    def position(self, name: str):
+        row = self.catalog.index.get(name)
+        if row is None or not self.ok[row]:
+            return None
+        return float(self.lat[row]), float(self.lon[row]), float(self.alt[row])
+
+_current: Optional[PositionSnapshot] = None
+_catalog: Optional[Catalog] = None
+_catalog_dirty = threading.Event()
+_stop = threading.Event()
+_thread: Optional[threading.Thread] = None
+
+def current() -> Optional[PositionSnapshot]:
+    """
+    Latest snapshot if it is fresh enough to serve, else None.
+    """
+    snap = _current
+    if snap is None or snap.age() > SNAPSHOT_MAX_AGE:
+        return None
+    return snap
+
+def mark_catalog_dirty():
+    """
+    Ask the refresher to re-read TLEs and filter keys from Neo4j; the
+    import pipeline calls this after it has written new data.
+    """
+    _catalog_dirty.set()
+
+def load_catalog() -> Catalog:
+    with get_session() as session:
+        records = list(session.run(CATALOG_QUERY))
+
+    batch = SatelliteBatch.from_tles(
+        ((rec["name"], rec["tle1"], rec["tle2"]) for rec in records),
+        cache=tle_cache.satrec_cache,
+    )
+    by_name = {rec["name"]: rec for rec in records}
+    keys = {
+        column: _frozen(np.array([by_name[n][column] for n in batch.names], dtype=object))
+        for column in KEY_COLUMNS
+    }
+    index = {name: row for row, name in enumerate(batch.names)}
+    print(f"Snapshot catalog loaded: {len(batch)} satellites")
+    return Catalog(batch=batch, keys=keys, index=index, loaded_at=time.monotonic())
+
+def refresh() -> PositionSnapshot:
+    """
+    Propagate the whole catalog to now and publish the result.
+    """
+    global _current, _catalog
+    if (
+        _catalog is None
+        or _catalog_dirty.is_set()
+        or time.monotonic() - _catalog.loaded_at > CATALOG_RELOAD_SEC
+    ):
+        _catalog_dirty.clear()
+        _catalog = load_catalog()
+
+    when = datetime.now(timezone.utc)
+    ok, lat, lon, alt = _catalog.batch.geodetic(when)
+    _current = PositionSnapshot(
+        computed_at=when,
+        names=_frozen(_catalog.batch.names),
+        lat=_frozen(lat),
+        lon=_frozen(lon),
+        alt=_frozen(alt),
+        ok=_frozen(ok),
+        catalog=_catalog,
+    )
+    return _current
+
+def _run():
+    while not _stop.is_set():
+        started = time.monotonic()
+        try:
+            refresh()
+        except Exception as e:
+            print(f"Snapshot refresh failed: {e}")
+        _stop.wait(max(0.0, SNAPSHOT_INTERVAL - (time.monotonic() - started)))
+
+def start():
+    global _thread
+    if _thread is None or not _thread.is_alive():
+        _stop.clear()
+        _thread = threading.Thread(target=_run, name="snapshot-refresher", daemon=True)
+        _thread.start()
+        print(f"Position snapshot refresher started (every {SNAPSHOT_INTERVAL}s)")
+
+def stop():
+    _stop.set()
@@ -0,0 +1,64 @@
+import os
+import re
+import sys
+
+import pytest
+
+# tests import the app modules the way main.py does, from the MS3 root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# neo4j_driver reads this at import; nothing here connects to it
+os.environ.setdefault("NEO4J_URI", "bolt://localhost:7687")
+
+from data import import_celestrak, import_spacetrack, import_ucs
+
+
+class FakeGraph:
+    """
+    Satellite nodes as dicts, updated by the importers' own UNWIND statements:
+    MERGE or MATCH on row.name, an optional `WHERE s.x = row.y`, the
+    `s.x = row.y` assignments after SET and the REMOVE list.
+    """
+
+    def __init__(self):
+        self.nodes = {}
+
+    def bulk_write(self, cypher, rows, label="rows", **_):
+        body = "\n".join(l for l in cypher.splitlines() if not l.strip().startswith("//"))
+        where = re.search(r"WHERE s\.(\w+) = row\.(\w+)", body)
+        sets = re.search(r"\nSET(.*?)(?=\nREMOVE|\Z)", body, re.S)
+        assigns = re.findall(r"s\.(\w+)\s*=\s*row\.(\w+)", sets.group(1)) if sets else []
+        removes = re.search(r"\nREMOVE (.+)", body)
+        removes = re.findall(r"s\.(\w+)", removes.group(1)) if removes else []
+        for row in rows:
+            node = self.nodes.get(row["name"])
+            if node is None:
+                if "MERGE" not in body:
+                    continue
+                node = self.nodes[row["name"]] = {"name": row["name"]}
+            if where and node.get(where.group(1)) != row[where.group(2)]:
+                continue
+            for prop, field in assigns:
+                node[prop] = row[field]
+            for prop in removes:
+                node.pop(prop, None)
+        return len(rows)
+
+    def stored_fingerprints(self, prop, names):
+        return {name: self.nodes[name].get(prop) for name in names if name in self.nodes}
+
+    def tracked_names(self, prop, value=None):
+        return {
+            name for name, node in self.nodes.items()
+            if (node.get(prop) == value if value is not None else node.get(prop) is not None)
+        }
+
+
+@pytest.fixture
+def graph(monkeypatch):
+    fake = FakeGraph()
+    for module in (import_celestrak, import_spacetrack, import_ucs):
+        monkeypatch.setattr(module, "bulk_write", fake.bulk_write)
+        monkeypatch.setattr(module, "stored_fingerprints", fake.stored_fingerprints)
+        monkeypatch.setattr(module, "tracked_names", fake.tracked_names)
+        monkeypatch.setattr(module, "wait_for_neo4j", lambda: None)
+    return fake
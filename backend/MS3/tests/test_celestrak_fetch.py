@@ -0,0 +1,152 @@
+"""
+Celestrak fetch stage against scripts/celestrak_standin.py on an ephemeral port:
+conditional GETs, 429 retries, stale fallback, and concurrent fetches written
+in configured order. No Neo4j needed: the write stage is replaced.
+
+    python -m pytest tests
+"""
+import asyncio
+import threading
+import time
+from argparse import Namespace
+from http.server import ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from data import import_celestrak, tle_catalog
+from scripts.celestrak_standin import make_handler, synthetic_tles
+
+
+@pytest.fixture
+def standin(tmp_path):
+    def start(**overrides):
+        args = Namespace(
+            dir=str(tmp_path / "fixtures"), latency=0.02, synthetic=30,
+            fail_rate=0.0, fail_first=0, fail_status=503, quiet=True,
+        )
+        for key, value in overrides.items():
+            setattr(args, key, value)
+        handler = make_handler(args)
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_port}", handler
+
+    servers = []
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(tle_catalog, "CACHE_DIR", str(tmp_path / "tle-cache"))
+    monkeypatch.setattr(import_celestrak, "MIN_REQUEST_INTERVAL", 0.0)
+
+
+@pytest.fixture
+def no_backoff(monkeypatch):
+    real_sleep = asyncio.sleep
+
+    async def fast_sleep(delay, *args):
+        await real_sleep(0)
+
+    monkeypatch.setattr(import_celestrak.asyncio, "sleep", fast_sleep)
+
+
+def fetch(base_url, group):
+    """
+    Run fetch_group once; returns ((constellation, text, error), statuses seen).
+    """
+    statuses = []
+
+    async def record(response):
+        statuses.append(response.status_code)
+
+    async def go():
+        async with httpx.AsyncClient(event_hooks={"response": [record]}) as client:
+            limiter = import_celestrak.HostRateLimiter(0.0)
+            url = f"{base_url}/NORAD/elements/gp.php?GROUP={group}&FORMAT=TLE"
+            return await import_celestrak.fetch_group(client, limiter, group, url)
+
+    return asyncio.run(go()), statuses
+
+
+def test_fetch_then_cache_then_304(standin, monkeypatch):
+    base_url, handler = standin()
+
+    (group, text, error), statuses = fetch(base_url, "STARLINK")
+    assert error is None and text == synthetic_tles("STARLINK", 30)
+    assert statuses == [200]
+
+    # inside the refresh interval the cached copy is used without a request
+    (_, cached, _), statuses = fetch(base_url, "STARLINK")
+    assert cached == text and statuses == []
+    assert handler.requests["STARLINK"] == 1
+
+    # once stale, a conditional GET comes back 304 and the cached body is reused
+    monkeypatch.setattr(tle_catalog, "MIN_REFRESH_SEC", 0.0)
+    before = tle_catalog.load("celestrak-STARLINK").fetched_at
+    (_, revalidated, error), statuses = fetch(base_url, "STARLINK")
+    assert error is None and revalidated == text
+    assert statuses == [304]
+    assert tle_catalog.load("celestrak-STARLINK").fetched_at > before
+
+
+def test_429_is_retried(standin, no_backoff):
+    base_url, handler = standin(fail_first=2, fail_status=429)
+
+    (_, text, error), statuses = fetch(base_url, "GPS-OPS")
+    assert error is None and text == synthetic_tles("GPS-OPS", 30)
+    assert statuses == [429, 429, 200]
+
+
+def test_429_exhausted_falls_back_to_cache(standin, no_backoff, monkeypatch):
+    base_url, _ = standin()
+    (_, text, _), _ = fetch(base_url, "ONEWEB")
+
+    monkeypatch.setattr(tle_catalog, "MIN_REFRESH_SEC", 0.0)
+    throttled_url, _ = standin(fail_first=100, fail_status=429)
+    (_, stale, error), statuses = fetch(throttled_url, "ONEWEB")
+    assert error is None and stale == text
+    assert statuses == [429] * import_celestrak.FETCH_RETRIES
+
+    # nothing cached: the error comes back instead
+    (_, missing, error), _ = fetch(throttled_url, "IRIDIUM")
+    assert missing is None
+    assert isinstance(error, httpx.HTTPStatusError) and error.response.status_code == 429
+
+
+def test_fetches_run_concurrently_and_write_in_order(standin, monkeypatch):
+    base_url, _ = standin(latency=0.3)
+    monkeypatch.setattr(import_celestrak, "CELESTRAK_BASE_URL", base_url)
+    monkeypatch.setattr(import_celestrak, "MAX_CONNECTIONS", 8)
+
+    real_fetch = import_celestrak.fetch_group
+
+    async def first_group_slow(client, limiter, constellation, url):
+        if constellation == "G0":
+            await asyncio.sleep(0.5)
+        return await real_fetch(client, limiter, constellation, url)
+
+    written = []
+
+    def fake_write(constellation, text, claimed):
+        written.append(constellation)
+        return {"inserted": 0}, {f"{constellation}-0"}
+
+    monkeypatch.setattr(import_celestrak, "fetch_group", first_group_slow)
+    monkeypatch.setattr(import_celestrak, "write_group", fake_write)
+    monkeypatch.setattr(import_celestrak, "remove_dropped", lambda reports, seen: None)
+
+    groups = [f"G{i}" for i in range(6)]
+    started = time.perf_counter()
+    reports = asyncio.run(import_celestrak.fetch_and_write(groups))
+    elapsed = time.perf_counter() - started
+
+    assert written == groups
+    assert list(reports) == groups
+    # six requests of >= 0.15 s each plus the 0.5 s delay would take >= 1.4 s back to back
+    assert elapsed < 1.4
@@ -0,0 +1,11 @@
+from data.delta import split_changed
+
+
+def test_split_changed_counts_fingerprintless_nodes_as_updated():
+    rows = [{"name": n, "fingerprint": "1"} for n in ("new", "legacy", "same", "stale")]
+    stored = {"legacy": None, "same": "1", "stale": "0"}
+
+    changed, report = split_changed(rows, stored)
+
+    assert [row["name"] for row in changed] == ["new", "legacy", "stale"]
+    assert report == {"inserted": 1, "updated": 2, "unchanged": 1, "removed": 0}
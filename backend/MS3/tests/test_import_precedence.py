@@ -0,0 +1,69 @@
+import asyncio
+
+from data import import_celestrak, import_spacetrack
+
+
+def tle_text(sats):
+    """3-line TLE text for {name: satnum}; satnum also varies the element set."""
+    lines = []
+    for name, num in sats.items():
+        lines += [
+            name,
+            f"1 {num:05d}U 24001A   24300.50000000  .00016717  00000-0  10270-3 0  9005",
+            f"2 {num:05d}  51.6400 {num % 360:8.4f} 0006703 130.5360 325.0288 15.50000000    10",
+        ]
+    return "\n".join(lines)
+
+
+def celestrak(monkeypatch, **groups):
+    """One Celestrak step over groups {constellation: {name: satnum}}, in that order."""
+    async def fetch_group(client, limiter, constellation, url):
+        return constellation, tle_text(groups[constellation]), None
+
+    monkeypatch.setattr(import_celestrak, "fetch_group", fetch_group)
+    return asyncio.run(import_celestrak.fetch_and_write(list(groups)))
+
+
+def spacetrack(monkeypatch, sats):
+    monkeypatch.setattr(import_spacetrack.tle_catalog, "fetch", lambda *a, **k: tle_text(sats))
+    return import_spacetrack.import_spacetrack()
+
+
+def test_satellite_leaving_spacetrack_keeps_its_celestrak_tle(graph, monkeypatch):
+    celestrak(monkeypatch, STATIONS={"ISS": 25544})
+    spacetrack(monkeypatch, {"ISS": 11111, "OTHER": 22222})
+    assert graph.nodes["ISS"]["tle_group"] == import_spacetrack.TLE_GROUP
+
+    # next run: Celestrak still lists it, Space-Track's rolling list doesn't
+    celestrak(monkeypatch, STATIONS={"ISS": 25544})
+    report = spacetrack(monkeypatch, {"OTHER": 22222})
+
+    iss = graph.nodes["ISS"]
+    assert iss["tle_group"] == "celestrak:STATIONS"
+    assert iss["tle1"].startswith("1 25544U")
+    assert iss["constellation"] == "STATIONS"
+    assert report["removed"] == 0
+
+
+def test_satellite_only_spacetrack_listed_loses_its_tle(graph, monkeypatch):
+    spacetrack(monkeypatch, {"ONLY": 33333})
+    report = spacetrack(monkeypatch, {"OTHER": 22222})
+
+    assert "tle1" not in graph.nodes["ONLY"]
+    assert report["removed"] == 1
+
+
+def test_satellite_moving_to_a_later_group_takes_its_constellation(graph, monkeypatch):
+    celestrak(monkeypatch, STARLINK={"SAT": 1, "A": 2}, ACTIVE={"SAT": 1, "B": 3})
+    # listed in both: the first configured group owns it, and keeps it next run
+    assert graph.nodes["SAT"]["constellation"] == "STARLINK"
+    assert celestrak(monkeypatch, STARLINK={"SAT": 1, "A": 2}, ACTIVE={"SAT": 1, "B": 3})["ACTIVE"]["updated"] == 0
+
+    # SAT leaves STARLINK with the same element set
+    reports = celestrak(monkeypatch, STARLINK={"A": 2}, ACTIVE={"SAT": 1, "B": 3})
+
+    sat = graph.nodes["SAT"]
+    assert (sat["constellation"], sat["tle_group"]) == ("ACTIVE", "celestrak:ACTIVE")
+    assert "tle1" in sat
+    assert reports["ACTIVE"]["updated"] == 1
+    assert reports["STARLINK"]["removed"] == 0
@@ -0,0 +1,56 @@
+import pytest
+
+from data import pipeline
+
+
+@pytest.fixture
+def published(monkeypatch):
+    calls = []
+    monkeypatch.setattr(pipeline, "_publish", lambda: calls.append(pipeline._seen_version))
+    monkeypatch.setattr(pipeline, "_seen_version", None)
+    monkeypatch.setattr(pipeline, "STEPS", [("noop", lambda: None)])
+    return calls
+
+
+class Polls:
+    """Stands in for _watch_stop: lets the watcher loop once per queued version."""
+
+    def __init__(self, versions):
+        self.versions = list(versions)
+
+    def wait(self, _timeout):
+        return not self.versions
+
+    def read(self):
+        return self.versions.pop(0)
+
+
+def watch_once(monkeypatch, versions):
+    polls = Polls(versions)
+    monkeypatch.setattr(pipeline, "_watch_stop", polls)
+    monkeypatch.setattr(pipeline, "_read_version", polls.read)
+    pipeline._watch()
+
+
+def test_watcher_publishes_when_another_process_bumps_the_version(monkeypatch, published):
+    watch_once(monkeypatch, [None, 4, 4, 5, 5])
+    # the first version seen is the baseline; only the move to 5 is published
+    assert len(published) == 1
+    assert pipeline._seen_version == 5
+
+
+def test_in_process_run_is_not_published_twice(monkeypatch, published):
+    monkeypatch.setattr(pipeline, "_bump_version", lambda: 7)
+    pipeline.run()
+    assert published == [7]
+
+    watch_once(monkeypatch, [7, 7])
+    assert published == [7]
+
+
+def test_cli_run_bumps_the_version_without_publishing(monkeypatch, published):
+    bumps = []
+    monkeypatch.setattr(pipeline, "_bump_version", lambda: bumps.append(1) or len(bumps))
+    assert pipeline.run(publish=False)["state"] == "succeeded"
+    assert bumps == [1]
+    assert published == []
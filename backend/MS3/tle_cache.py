@@ -0,0 +1,99 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+# per-cache entry bound; one entry per satellite TLE set
+MAX_ENTRIES = int(os.getenv("TLE_CACHE_SIZE", 20000))
+
+class TLECache:
+    """
+    Thread-safe LRU of objects built from a TLE pair (parsed Satrec,
+    Orekit propagator, ...), keyed by (name, hash of both TLE lines).
+    """
+
+    def __init__(self, label, max_entries=MAX_ENTRIES):
+        self.label = label
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._by_name = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def key(name, tle1, tle2):
+        digest = hashlib.blake2b(f"{tle1}\n{tle2}".encode(), digest_size=16).hexdigest()
+        return name, digest
+
+    def get(self, name, tle1, tle2, factory):
+        """
+        Return the cached object for this TLE set, building it with
+        factory(tle1, tle2) on a miss.
+        """
+        key = self.key(name, tle1, tle2)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        # build outside the lock; a concurrent miss on the same key just rebuilds
+        value = factory(tle1, tle2)
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self._by_name.setdefault(name, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                old_key, _ = self._entries.popitem(last=False)
+                self._forget(old_key)
+                self.evictions += 1
+        return value
+
+    def _forget(self, key):
+        keys = self._by_name.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_name[key[0]]
+
+    def invalidate(self, names):
+        with self._lock:
+            for name in names:
+                for key in self._by_name.pop(name, ()):
+                    self._entries.pop(key, None)
+                    self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries":       len(self._entries),
+                "max_entries":   self.max_entries,
+                "hits":          self.hits,
+                "misses":        self.misses,
+                "hit_ratio":     round(self.hits / lookups, 4) if lookups else None,
+                "evictions":     self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+# sgp4 Satrec objects for the vectorized engine (/positions)
+satrec_cache = TLECache("satrec")
+# Orekit TLEPropagators (/graph3d)
+propagator_cache = TLECache("orekit")
+
+def invalidate(names):
+    """
+    Drop every cached object for these satellites; called by the importers
+    after they write new tle1/tle2 values.
+    """
+    names = list(names)
+    for cache in (satrec_cache, propagator_cache):
+        cache.invalidate(names)
+
+def stats():
+    return {cache.label: cache.stats() for cache in (satrec_cache, propagator_cache)}
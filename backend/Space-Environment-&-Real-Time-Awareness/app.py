@@ -1,7 +1,11 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
-from services.alerts import schedule_alert
+from pymongo.errors import PyMongoError
+from services import alert_dispatcher, refresh
+from services.alerts import schedule_alert, upcoming_alerts
 from services.congestion import get_congestion_data
+from services.congestion_grid import compute_grid
+from services.conjunctions import get_conjunctions
 from services.reentry import get_decay_data
 from services.launch_history import get_combined_launch_history
 from services.satellite_filter import get_satellites_by_type
@@ -11,12 +15,52 @@ from services.alerts import check_alert as check_alert_service
 
 
 app = Flask(__name__)
-CORS(app)
+# let the browser read the data-age headers
+CORS(app, expose_headers=["X-Data-Refreshed-At", "X-Data-Age"])
 
 # Load env vars (for local dev as fallback, optional)
 os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017/")
 os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
 
+# pops due alerts and fans them out to /api/alerts/stream, once per worker
+alert_dispatcher.start()
+# in-process refreshes only with REFRESH_SCHEDULER=1; normally `python -m services.refresh`
+# (ms-sera-refresh) keeps the Mongo collections fresh
+refresh.start()
+
+
+def page_args():
+    # ?limit=&offset= ; no limit returns everything, as before
+    limit = request.args.get("limit")
+    offset = int(request.args.get("offset", 0))
+    limit = int(limit) if limit else None
+    if offset < 0 or (limit is not None and limit < 0):
+        raise ValueError("limit and offset must be >= 0")
+    return limit, offset
+
+
+def with_age(payload, source):
+    """
+    JSON response with the age of the source's last refresh in headers
+    (the heatmap and /api/satellites bodies can't take extra keys).
+    """
+    response = jsonify(payload)
+    try:
+        refreshed_at, age = refresh.data_age(source)
+    except PyMongoError as e:
+        print(f"[MongoDB] Could not read refresh status: {e}")
+        return response
+    if refreshed_at is not None:
+        response.headers["X-Data-Refreshed-At"] = refreshed_at.isoformat()
+        response.headers["X-Data-Age"] = str(int(age))
+    return response
+
+
+@app.errorhandler(PyMongoError)
+def mongo_unavailable(e):
+    print(f"[MongoDB] {e}")
+    return jsonify({"error": "database unavailable"}), 503
+
 # Satellite visibility alert registration
 @app.route("/api/alerts/register", methods=["POST"])
 def register():
@@ -30,36 +74,67 @@ def register():
 # Orbital congestion heatmap
 @app.route("/api/orbit-heatmap", methods=["GET"])
 def orbit_heatmap():
-    result = get_congestion_data()
+    # ?satellites=false drops the per-satellite list (and its TLE lines)
+    include = request.args.get("satellites", "true").lower() not in ("0", "false", "no")
+    result = get_congestion_data(include_satellites=include)
+    return with_age(result, "congestion")
+
+# 3-D congestion grid (altitude × latitude × longitude) with hotspots
+@app.route("/api/congestion-grid", methods=["GET"])
+def congestion_grid():
+    args = request.args
+    try:
+        alt_edges = args.get("alt_edges")
+        result = compute_grid(
+            alt_edges=[float(x) for x in alt_edges.split(",")] if alt_edges else None,
+            lat_step=float(args.get("lat_step", 10)),
+            lon_step=float(args.get("lon_step", 10)),
+            lat_mode=args.get("lat_mode", "equal_area"),
+            top_k=int(args.get("top", 20)),
+            include_satellites=args.get("satellites", "false").lower() in ("1", "true", "yes"),
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     return jsonify(result)
 
+# Close approaches from the last screening run (python -m services.conjunctions)
+@app.route("/api/conjunctions", methods=["GET"])
+def conjunctions():
+    try:
+        limit = int(request.args.get("limit", 500))
+        max_km = request.args.get("max_km")
+        result = get_conjunctions(limit=limit, max_distance_km=float(max_km) if max_km else None)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"count": len(result), "results": result})
+
 # Satellite re-entry and decay data
 @app.route("/api/satellite-decay", methods=["GET"])
 def satellite_decay():
-    result = get_decay_data()
-
-    for doc in result:
-        if "_id" in doc:
-            doc["_id"] = str(doc["_id"])
+    try:
+        limit, offset = page_args()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    result = get_decay_data(limit=limit, offset=offset)
 
-    return jsonify({
+    return with_age({
         "count": len(result),
         "results": result
-    })
+    }, "decay")
 
 # Combined satellite launch history
 @app.route("/api/launch-history", methods=["GET"])
 def launch_history():
-    result = get_combined_launch_history()
+    try:
+        limit, offset = page_args()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    result = get_combined_launch_history(limit=limit, offset=offset)
 
-    for doc in result:
-        if "_id" in doc:
-            doc["_id"] = str(doc["_id"])
-
-    return jsonify({
+    return with_age({
         "count": len(result),
         "results": result
-    })
+    }, "launch_history")
 
 @app.route("/api/alerts/check", methods=["GET"])
 def check_alert():
@@ -67,18 +142,45 @@ def check_alert():
     result = check_alert_service(user_id)
     return jsonify(result)
 
+# Upcoming scheduled passes for a user
+@app.route("/api/alerts/upcoming", methods=["GET"])
+def alerts_upcoming():
+    user_id = request.args.get("user_id", "default_user")
+    result = upcoming_alerts(user_id)
+    return jsonify({"count": len(result), "results": result})
+
+# Server-Sent Events: alerts are pushed as they fall due instead of polled
+@app.route("/api/alerts/stream", methods=["GET"])
+def alerts_stream():
+    user_id = request.args.get("user_id", "default_user")
+    return Response(
+        stream_with_context(alert_dispatcher.stream(user_id)),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 
 # Filter satellites by type
 @app.route("/api/satellites", methods=["GET"])
 def satellite_filter():
     satellite_type = request.args.get("type", "").lower()
-    result = get_satellites_by_type(satellite_type)
-
+    try:
+        limit, offset = page_args()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    result = get_satellites_by_type(satellite_type, limit=limit, offset=offset)
+
+    return with_age(result, "satellites")
+
+# Last refresh of every background source
+@app.route("/api/refresh/status", methods=["GET"])
+def refresh_status():
+    result = refresh.get_status()
     for doc in result:
-        if "_id" in doc:
-            doc["_id"] = str(doc["_id"])
-
-    return jsonify(result)
+        for key in ("refreshed_at", "attempted_at"):
+            if doc.get(key) is not None:
+                doc[key] = doc[key].isoformat()
+    return jsonify({"count": len(result), "results": result})
 
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=5000, debug=True)
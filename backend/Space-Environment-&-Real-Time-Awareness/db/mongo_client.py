@@ -0,0 +1,172 @@
+from pymongo import MongoClient, InsertOne, ReplaceOne
+from pymongo.errors import BulkWriteError, OperationFailure
+import os
+import time
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# operations per bulk_write round trip
+BULK_BATCH_SIZE = int(os.getenv("MONGO_BULK_BATCH_SIZE", 1000))
+
+# One client per process: it owns the connection pool and server monitoring,
+# so requests reuse warm connections instead of handshaking every time.
+# The client connects lazily and is created after gunicorn forks the worker.
+client = MongoClient(
+    os.getenv("MONGO_URI", "mongodb://localhost:27017/"),
+    maxPoolSize=int(os.getenv("MONGO_MAX_POOL_SIZE", 50)),
+    minPoolSize=int(os.getenv("MONGO_MIN_POOL_SIZE", 2)),
+    maxIdleTimeMS=int(os.getenv("MONGO_MAX_IDLE_MS", 300000)),
+    # fail a request quickly when mongod is down instead of hanging for 30 s
+    serverSelectionTimeoutMS=int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", 3000)),
+    connectTimeoutMS=int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", 3000)),
+    socketTimeoutMS=int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", 20000)),
+    waitQueueTimeoutMS=int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", 5000)),
+    retryWrites=True,
+)
+
+db = client[os.getenv("MONGO_DB", "satellite_db")]
+
+
+def get_collection(name):
+    return db[name]
+
+
+def _key_fields(key):
+    return [key] if isinstance(key, str) else list(key)
+
+
+def _key_filter(doc, key):
+    return {field: doc.get(field) for field in _key_fields(key)}
+
+
+def bulk_write(collection, docs, key=None, batch_size=BULK_BATCH_SIZE):
+    """
+    Write docs in unordered batches: plain inserts, or replace-upserts matched
+    on `key` (a field name or a list of them) when given. Inserts add `_id` to
+    the docs, like insert_many. A failed document doesn't stop the rest of its
+    batch, but the error is logged and re-raised once that batch is done, so
+    callers never mistake a partial write for a complete one.
+    Returns {"inserted", "upserted", "matched", "modified"} counts.
+    """
+    if isinstance(collection, str):
+        collection = get_collection(collection)
+    totals = {"inserted": 0, "upserted": 0, "matched": 0, "modified": 0}
+
+    for start in range(0, len(docs), batch_size):
+        batch = docs[start:start + batch_size]
+        if key is None:
+            ops = [InsertOne(doc) for doc in batch]
+        else:
+            ops = [ReplaceOne(_key_filter(doc, key), doc, upsert=True) for doc in batch]
+        try:
+            result = collection.bulk_write(ops, ordered=False).bulk_api_result
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors") or e.details.get("writeConcernErrors") or [{}]
+            print(
+                f"[MongoDB] {collection.name}: {len(errors)} of {len(ops)} writes failed, "
+                f"first: {errors[0].get('errmsg')}"
+            )
+            raise
+        totals["inserted"] += result.get("nInserted", 0)
+        totals["upserted"] += result.get("nUpserted", 0)
+        totals["matched"] += result.get("nMatched", 0)
+        totals["modified"] += result.get("nModified", 0)
+
+    return totals
+
+
+# (collection, key fields) whose unique index this process already ensured
+_unique_indexes = set()
+
+
+# an index with these keys but other options already exists
+INDEX_CONFLICT_CODES = (85, 86)
+
+
+def ensure_unique_index(collection, key):
+    """
+    Unique index on the key fields. Sparse, so documents written before the
+    collection was keyed (no key fields) stay readable until their keyed
+    replacements are in; sync_by_key then removes them.
+    """
+    fields = _key_fields(key)
+    marker = (collection.full_name, tuple(fields))
+    if marker not in _unique_indexes:
+        try:
+            collection.create_index([(field, 1) for field in fields], unique=True, sparse=True)
+        except OperationFailure as e:
+            # a plain unique index from an earlier version works just as well
+            if e.code not in INDEX_CONFLICT_CODES:
+                raise
+        _unique_indexes.add(marker)
+
+
+def sync_by_key(collection, docs, key, scope=None):
+    """
+    Make the documents of `collection` matching `scope` (all by default) equal
+    to docs, matched on their natural key. New and changed documents are
+    upserted, documents whose key is gone (or that have no key at all) are
+    deleted afterwards and unchanged ones are not written at all. A unique index on the key keeps concurrent refreshes
+    from duplicating documents. Each document changes atomically; there is
+    no window where the collection is empty. A failed write raises before
+    anything is deleted.
+    Returns {"inserted", "updated", "unchanged", "removed"} counts.
+    """
+    if isinstance(collection, str):
+        collection = get_collection(collection)
+    fields = _key_fields(key)
+    ensure_unique_index(collection, fields)
+
+    def key_of(doc):
+        return tuple(doc.get(field) for field in fields)
+
+    stored = {key_of(doc): doc for doc in collection.find(scope or {}, {"_id": 0})}
+    seen, changed = set(), []
+    report = {"inserted": 0, "updated": 0, "unchanged": 0, "removed": 0}
+    for doc in docs:
+        k = key_of(doc)
+        if k in seen:
+            continue
+        seen.add(k)
+        old = stored.get(k)
+        if old == doc:
+            report["unchanged"] += 1
+            continue
+        report["inserted" if old is None else "updated"] += 1
+        changed.append(doc)
+
+    if changed:
+        bulk_write(collection, changed, key=fields)
+
+    gone = [k for k in stored if k not in seen]
+    for start in range(0, len(gone), BULK_BATCH_SIZE):
+        batch = gone[start:start + BULK_BATCH_SIZE]
+        if len(fields) == 1:
+            query = {fields[0]: {"$in": [k[0] for k in batch]}}
+        else:
+            query = {"$or": [dict(zip(fields, k)) for k in batch]}
+        report["removed"] += collection.delete_many(query).deleted_count
+
+    return report
+
+
+def swap_in(name, docs, indexes=()):
+    """
+    Replace collection `name` with docs in one step: write them into a
+    staging collection, build its indexes, then renameCollection it over the
+    live one (dropTarget). Readers see either the previous set or the new
+    one, never a half-written mix. `indexes` are create_index key specs.
+    """
+    staging = db[f"{name}__staging_{os.getpid()}_{int(time.time() * 1000)}"]
+    try:
+        if docs:
+            bulk_write(staging, docs)
+        else:
+            db.create_collection(staging.name)
+        for keys in indexes:
+            staging.create_index(keys)
+        staging.rename(name, dropTarget=True)
+    except Exception:
+        staging.drop()
+        raise
@@ -0,0 +1,69 @@
+"""
+Compare the per-satellite Skyfield loop with the vectorized heatmap path.
+
+    python -m scripts.bench_congestion               # cached/active Celestrak group
+    python -m scripts.bench_congestion --synthetic 10000
+
+Both paths must agree on zone membership; altitudes may differ in the
+last decimal (Skyfield uses UT1/TT and a slightly different frame chain).
+"""
+import argparse
+import time
+
+from skyfield.api import EarthSatellite
+
+from services import congestion
+from services.propagation import TLEArray
+from services.tle_catalog import get_tle_records
+
+
+def synthetic_records(count):
+    records = []
+    for i in range(count):
+        inc = 30 + (i * 7) % 70
+        raan = (i * 13.7) % 360
+        ma = (i * 29.3) % 360
+        # spread mean motion from ~16 rev/day (LEO) down to ~1 rev/day (GEO)
+        mm = 16.0 - 15.0 * ((i * 0.618) % 1.0) ** 3
+        records.append((
+            f"SYN-{i}",
+            f"1 {i % 100000:05d}U 24001A   24300.50000000  .00000100  00000-0  10270-4 0  9005",
+            f"2 {i % 100000:05d} {inc:8.4f} {raan:8.4f} 0006703 130.5360 {ma:8.4f} {mm:11.8f}    10",
+        ))
+    return records
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--synthetic", type=int, default=0, help="use N generated TLEs instead of Celestrak")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    records = synthetic_records(args.synthetic) if args.synthetic else get_tle_records("active")
+    print(f"{len(records)} TLEs")
+
+    sats = []
+    for name, l1, l2 in records:
+        sat = EarthSatellite(l1, l2, name)
+        sat.line1, sat.line2 = l1, l2
+        sats.append(sat)
+    tle_array = TLEArray.from_records(records)
+
+    loop, loop_ms = timed(lambda: congestion.cluster_by_altitude(sats), args.repeat)
+    vec, vec_ms = timed(lambda: congestion.cluster_by_altitude_vectorized(tle_array), args.repeat)
+
+    for zone in sorted(set(loop) | set(vec)):
+        a = loop.get(zone, {}).get("count", 0)
+        b = vec.get(zone, {}).get("count", 0)
+        print(f"  {zone:<20} loop {a:>6}  vectorized {b:>6}")
+    print(f"loop        {loop_ms:9.1f} ms")
+    print(f"vectorized  {vec_ms:9.1f} ms   ({loop_ms / vec_ms:.0f}x)")
@@ -0,0 +1,92 @@
+"""
+Scaling benchmark for the conjunction screen on random LEO catalogs.
+
+    python -m scripts.bench_conjunctions --sizes 1000,2500,5000,10000 --hours 1
+
+For each size it times the KD-tree screen over the window and extrapolates
+to 24 h. A separate O(N²) check on --brute-size objects samples every pair
+once a second over --brute-hours and confirms the screen (on its coarse
+grid) finds every pair that gets within the threshold.
+"""
+import argparse
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from services.conjunctions import screen
+from services.propagation import TLEArray, julian_date
+
+
+def random_leo_records(count, seed=7):
+    rng = np.random.default_rng(seed)
+    records = []
+    for i in range(count):
+        inc = rng.uniform(0, 100)
+        raan = rng.uniform(0, 360)
+        argp = rng.uniform(0, 360)
+        ma = rng.uniform(0, 360)
+        ecc = int(rng.uniform(1, 20)) * 100
+        mm = rng.uniform(14.0, 15.8)
+        records.append((
+            f"RND-{i}",
+            f"1 {i % 100000:05d}U 24001A   24300.50000000  .00000100  00000-0  10270-4 0  9005",
+            f"2 {i % 100000:05d} {inc:8.4f} {raan:8.4f} {ecc:07d} {argp:8.4f} {ma:8.4f} {mm:11.8f}    10",
+        ))
+    return records
+
+
+def brute_force_pairs(tle_array, start, hours, step_sec, threshold_km):
+    """
+    Every pair closer than threshold_km at any sample, checked pairwise.
+    """
+    jd0, fr0 = julian_date(start)
+    n_steps = int(hours * 3600 / step_sec) + 1
+    fr = fr0 + np.arange(n_steps) * step_sec / 86400.0
+    e, r, _ = tle_array.array.sgp4(np.full(n_steps, jd0), fr)
+    found = set()
+    for k in range(n_steps):
+        pos = r[:, k]
+        d2 = np.sum((pos[:, None, :] - pos[None, :, :]) ** 2, axis=-1)
+        i, j = np.nonzero(np.triu(d2 < threshold_km ** 2, k=1))
+        found.update(zip(tle_array.names[i], tle_array.names[j]))
+    return found
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="1000,2500,5000,10000")
+    parser.add_argument("--hours", type=float, default=1.0)
+    parser.add_argument("--step", type=float, default=10.0)
+    parser.add_argument("--threshold", type=float, default=5.0)
+    parser.add_argument("--brute-size", type=int, default=1000)
+    parser.add_argument("--brute-hours", type=float, default=0.25)
+    parser.add_argument("--brute-threshold", type=float, default=25.0)
+    args = parser.parse_args()
+
+    start = datetime(2024, 10, 27, 12, tzinfo=timezone.utc)
+    for size in (int(s) for s in args.sizes.split(",")):
+        tle_array = TLEArray.from_records(random_leo_records(size))
+        t0 = time.perf_counter()
+        events = screen(tle_array, start, args.hours, args.step, args.threshold)
+        elapsed = time.perf_counter() - t0
+        print(
+            f"N={size:>6}: {elapsed:7.1f} s for {args.hours:g} h "
+            f"(~{elapsed * 24 / args.hours / 60:5.1f} min per 24 h), {len(events)} events"
+        )
+
+    if args.brute_size:
+        tle_array = TLEArray.from_records(random_leo_records(args.brute_size, seed=11))
+        t0 = time.perf_counter()
+        events = screen(tle_array, start, args.brute_hours, args.step, args.brute_threshold)
+        screen_s = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        brute = brute_force_pairs(tle_array, start, args.brute_hours, 1.0, args.brute_threshold)
+        brute_s = time.perf_counter() - t0
+        screened = {(ev["sat1"], ev["sat2"]) for ev in events}
+        screened |= {(b, a) for a, b in screened}
+        print(
+            f"check N={args.brute_size}, {args.brute_hours:g} h, ≤ {args.brute_threshold:g} km: "
+            f"screen {screen_s:.1f} s / {len(events)} events, brute force (1 s samples) "
+            f"{brute_s:.1f} s / {len(brute)} pairs, missed by screen: {len(brute - screened)}"
+        )
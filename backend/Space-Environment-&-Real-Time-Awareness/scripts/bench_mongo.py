@@ -0,0 +1,97 @@
+"""
+Per-request Mongo cost: a new MongoClient per request (the old service
+code) against the shared pooled client in db/mongo_client.py.
+
+    python -m scripts.bench_mongo                       # local mongod
+    python -m scripts.bench_mongo --uri mongodb://localhost:27017/ --requests 300 --docs 500
+
+"write" is the refresh pattern of the endpoints (delete_many + insert of
+--docs documents), "read" is a single indexed find_one. Runs against the
+satellite_bench database, which is dropped at the end.
+"""
+import argparse
+import os
+import statistics
+import time
+
+from pymongo import MongoClient
+
+BENCH_DB = "satellite_bench"
+BENCH_COLLECTION = "requests"
+
+
+def sample_docs(count):
+    return [
+        {
+            "norad_cat_id": str(10000 + i),
+            "name": f"BENCH-{i}",
+            "launch_date": "2024-01-01",
+            "decay_date": "2025-01-01",
+            "source": "US",
+        }
+        for i in range(count)
+    ]
+
+
+def timed_requests(fn, count):
+    fn()    # warm-up
+    samples = []
+    for _ in range(count):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "mean": statistics.fmean(samples),
+        "p50": samples[len(samples) // 2],
+        "p95": samples[int(len(samples) * 0.95) - 1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--uri", default=os.getenv("MONGO_URI", "mongodb://localhost:27017/"))
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--docs", type=int, default=500)
+    args = parser.parse_args()
+
+    os.environ["MONGO_URI"] = args.uri
+    os.environ["MONGO_DB"] = BENCH_DB
+    from db import mongo_client
+
+    docs = sample_docs(args.docs)
+    shared = mongo_client.get_collection(BENCH_COLLECTION)
+    shared.create_index("norad_cat_id")
+
+    def per_request(work):
+        def run():
+            client = MongoClient(args.uri)
+            try:
+                work(client[BENCH_DB][BENCH_COLLECTION])
+            finally:
+                # the old code never closed its clients; closing keeps the
+                # "before" numbers from being skewed by leaked pools
+                client.close()
+        return run
+
+    def write(collection):
+        collection.delete_many({})
+        mongo_client.bulk_write(collection, [dict(doc) for doc in docs])
+
+    def read(collection):
+        collection.find_one({"norad_cat_id": "10042"}, {"_id": 0})
+
+    print(f"{args.requests} requests, {args.docs} docs per write, {args.uri}")
+    print(f"{'scenario':<8} {'client':<12} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9}")
+    for name, work in (("write", write), ("read", read)):
+        before = timed_requests(per_request(work), args.requests)
+        after = timed_requests(lambda: work(shared), args.requests)
+        for label, stats in (("per-request", before), ("shared", after)):
+            print(f"{name:<8} {label:<12} {stats['mean']:9.2f} {stats['p50']:9.2f} {stats['p95']:9.2f}")
+        print(f"{name:<8} speedup      {before['mean'] / after['mean']:9.1f}x")
+
+    mongo_client.client.drop_database(BENCH_DB)
+
+
+if __name__ == "__main__":
+    main()
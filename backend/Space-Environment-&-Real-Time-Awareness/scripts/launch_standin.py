@@ -0,0 +1,170 @@
+"""
+Local stand-in for Launch Library 2 and the SpaceX API, serving a synthetic
+multi-thousand-launch history so the incremental ingestion can be run offline.
+
+    python -m scripts.launch_standin --ll2 7000 --spacex 200 --port 8090
+    LL2_BASE_URL=http://localhost:8090/2.2.0 SPACEX_BASE_URL=http://localhost:8090/v4 \
+        python -m services.launch_history
+
+GET  /2.2.0/launch/?limit=&offset=&ordering=last_updated,id&last_updated__gte=
+POST /v4/launches/query   {"query": {"date_utc": {"$gte": ...}}, "options": {"page", "limit", ...}}
+
+--touch N bumps last_updated on N random LL2 launches every --touch-every
+seconds, so a rerun has something to pick up. --rate-limit N answers 429
+after N LL2 requests, like the free tier.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+START = datetime(1957, 10, 4, tzinfo=timezone.utc)
+
+
+def iso(dt):
+    return dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def synthetic_ll2(count):
+    span = (datetime(2026, 1, 1, tzinfo=timezone.utc) - START) / count
+    launches = []
+    for i in range(count):
+        net = START + span * i
+        launches.append({
+            "id": f"00000000-0000-4000-8000-{i:012d}",
+            "name": f"Rocket {i % 40} | Mission {i}",
+            "net": iso(net),
+            "last_updated": iso(net + timedelta(days=1)),
+            "status": {"name": "Launch Successful" if i % 17 else "Launch Failure"},
+            "launch_service_provider": {"name": f"Provider {i % 25}"},
+            "rocket": {"configuration": {"name": f"Rocket {i % 40}"}},
+        })
+    return launches
+
+
+def synthetic_spacex(count):
+    start = datetime(2006, 3, 24, tzinfo=timezone.utc)
+    span = (datetime(2027, 1, 1, tzinfo=timezone.utc) - start) / count
+    now = datetime.now(timezone.utc)
+    launches = []
+    for i in range(count):
+        date = start + span * i
+        launches.append({
+            "id": f"5eb87c{i:018x}",
+            "name": f"Flight {i}",
+            "rocket": "5e9d0d95eda69973a809d1ec",
+            "date_utc": date.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+            "success": None if date > now else i % 20 != 0,
+            "upcoming": date > now,
+        })
+    return launches
+
+
+def make_handler(args, ll2, spacex, lock):
+    ll2_requests = [0]
+
+    class Handler(BaseHTTPRequestHandler):
+        def _json(self, body, status=200):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path.rstrip("/") != "/2.2.0/launch":
+                self.send_error(404)
+                return
+            with lock:
+                ll2_requests[0] += 1
+                if args.rate_limit and ll2_requests[0] > args.rate_limit:
+                    self._json({"detail": "Request was throttled."}, 429)
+                    return
+                rows = list(ll2)
+            time.sleep(args.latency)
+
+            q = {k: v[0] for k, v in parse_qs(url.query).items()}
+            limit, offset = int(q.get("limit", 10)), int(q.get("offset", 0))
+            if "last_updated__gte" in q:
+                rows = [l for l in rows if l["last_updated"] >= q["last_updated__gte"]]
+            # comma-separated fields, least significant sorted first
+            for field in reversed([f for f in q.get("ordering", "").split(",") if f]):
+                rows.sort(key=lambda l: l[field.lstrip("-")], reverse=field.startswith("-"))
+
+            nxt = None
+            if offset + limit < len(rows):
+                nxt = f"http://{self.headers['Host']}{url.path}?" + urlencode({**q, "offset": offset + limit})
+            self._json({
+                "count": len(rows),
+                "next": nxt,
+                "previous": None,
+                "results": rows[offset:offset + limit],
+            })
+
+        def do_POST(self):
+            if urlparse(self.path).path != "/v4/launches/query":
+                self.send_error(404)
+                return
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            time.sleep(args.latency)
+            options = body.get("options", {})
+            since = body.get("query", {}).get("date_utc", {}).get("$gte")
+            rows = sorted(
+                (l for l in spacex if since is None or l["date_utc"] >= since),
+                key=lambda l: l["date_utc"],
+            )
+            limit, page = int(options.get("limit", 10)), int(options.get("page", 1))
+            total_pages = max(1, -(-len(rows) // limit))
+            self._json({
+                "docs": rows[(page - 1) * limit:page * limit],
+                "totalDocs": len(rows),
+                "limit": limit,
+                "page": page,
+                "totalPages": total_pages,
+                "hasNextPage": page < total_pages,
+                "nextPage": page + 1 if page < total_pages else None,
+            })
+
+        def log_message(self, fmt, *a):
+            if args.verbose:
+                super().log_message(fmt, *a)
+
+    return Handler
+
+
+def touch_loop(args, ll2, lock):
+    while True:
+        time.sleep(args.touch_every)
+        now = iso(datetime.now(timezone.utc))
+        with lock:
+            for launch in random.sample(ll2, min(args.touch, len(ll2))):
+                launch["last_updated"] = now
+                launch["status"] = {"name": "Launch Successful"}
+        print(f"Touched {args.touch} LL2 launches at {now}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--ll2", type=int, default=7000, help="LL2 launches to serve")
+    parser.add_argument("--spacex", type=int, default=200, help="SpaceX launches to serve")
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per response")
+    parser.add_argument("--touch", type=int, default=0)
+    parser.add_argument("--touch-every", type=float, default=30.0)
+    parser.add_argument("--rate-limit", type=int, default=0, help="LL2 requests before 429s, 0 = none")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    lock = threading.Lock()
+    ll2, spacex = synthetic_ll2(args.ll2), synthetic_spacex(args.spacex)
+    if args.touch:
+        threading.Thread(target=touch_loop, args=(args, ll2, lock), daemon=True).start()
+
+    print(f"LL2 / SpaceX stand-in on http://localhost:{args.port} ({len(ll2)} + {len(spacex)} launches)")
+    ThreadingHTTPServer(("", args.port), make_handler(args, ll2, spacex, lock)).serve_forever()
@@ -0,0 +1,174 @@
+# services/alert_dispatcher.py
+#
+# Push delivery for scheduled pass alerts:
+#   dispatcher  pops due members of the alerts:due sorted set in batches (a Lua
+#               script, so with several workers each alert is popped once) and
+#               PUBLISHes them on one channel
+#   hub         one pub/sub connection per process, fanning messages out to the
+#               in-process queues of the SSE streams of the user they are for
+#   stream      generator behind /api/alerts/stream (Server-Sent Events)
+#
+# Idle streams cost a queue and a greenlet each (gunicorn runs gevent workers),
+# not a Redis connection or a request per poll.
+
+import json
+import os
+import queue
+import threading
+import time
+
+from db.redis_client import r
+from services.alerts import DUE_KEY, user_key, upcoming_alerts
+
+CHANNEL = os.getenv("ALERT_CHANNEL", "alerts:events")
+BATCH_SIZE = int(os.getenv("ALERT_BATCH_SIZE", 500))
+# longest the dispatcher sleeps before looking at the sorted set again
+MAX_IDLE_SEC = float(os.getenv("ALERT_DISPATCH_IDLE_SEC", 1.0))
+# comment line sent on quiet streams so proxies don't close them
+HEARTBEAT_SEC = float(os.getenv("ALERT_HEARTBEAT_SEC", 15))
+# alerts buffered per stream; a client that stops reading loses the overflow
+STREAM_QUEUE_SIZE = 100
+RECONNECT_DELAY_SEC = 2.0
+
+# ZRANGEBYSCORE + ZREM in one step, so two dispatchers never pop the same alert
+_pop_due = r.register_script("""
+local items = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[2]))
+if #items > 0 then
+  redis.call('ZREM', KEYS[1], unpack(items))
+end
+return items
+""")
+
+# user_id → set of queues, one per open stream in this process
+_subscribers = {}
+_lock = threading.Lock()
+_started = False
+
+
+def dispatch_due(now=None, batch_size=BATCH_SIZE):
+    """
+    Pop up to batch_size alerts due by `now` and publish them. Returns how many.
+    """
+    now = time.time() if now is None else now
+    members = _pop_due(keys=[DUE_KEY], args=[now, batch_size])
+    if not members:
+        return 0
+    pipe = r.pipeline(transaction=False)
+    for member in members:
+        try:
+            user_id = json.loads(member)["user_id"]
+        except (ValueError, KeyError):
+            print(f"[WARN] Dropping malformed alert: {member!r}")
+            continue
+        pipe.zrem(user_key(user_id), member)
+        pipe.publish(CHANNEL, member)
+    pipe.execute()
+    return len(members)
+
+
+def _dispatch_loop():
+    while True:
+        try:
+            sent = dispatch_due()
+            if sent:
+                print(f"[DEBUG] Dispatched {sent} alerts")
+            if sent >= BATCH_SIZE:
+                continue
+            # sleep until the next alert is due, but re-check at least every MAX_IDLE_SEC
+            nxt = r.zrange(DUE_KEY, 0, 0, withscores=True)
+            wait = nxt[0][1] - time.time() if nxt else MAX_IDLE_SEC
+            time.sleep(min(max(wait, 0.05), MAX_IDLE_SEC))
+        except Exception as e:
+            print(f"[WARN] Alert dispatcher: {e}")
+            time.sleep(RECONNECT_DELAY_SEC)
+
+
+def _route(member):
+    try:
+        user_id = json.loads(member)["user_id"]
+    except (ValueError, KeyError):
+        return
+    with _lock:
+        targets = list(_subscribers.get(user_id, ()))
+    for q in targets:
+        try:
+            q.put_nowait(member)
+        except queue.Full:
+            print(f"[WARN] Alert stream for {user_id} is full, dropping alert")
+
+
+def _listen_loop():
+    while True:
+        pubsub = r.pubsub(ignore_subscribe_messages=True)
+        try:
+            pubsub.subscribe(CHANNEL)
+            for message in pubsub.listen():
+                if message["type"] == "message":
+                    _route(message["data"])
+        except Exception as e:
+            print(f"[WARN] Alert subscriber: {e}")
+            time.sleep(RECONNECT_DELAY_SEC)
+        finally:
+            try:
+                pubsub.close()
+            except Exception:
+                pass
+
+
+def start():
+    """
+    Start the dispatcher and the pub/sub hub once per process.
+    ALERT_DISPATCHER=0 keeps the dispatcher off (the hub still runs).
+    """
+    global _started
+    with _lock:
+        if _started:
+            return
+        _started = True
+    if os.getenv("ALERT_DISPATCHER", "1") != "0":
+        threading.Thread(target=_dispatch_loop, name="alert-dispatcher", daemon=True).start()
+    threading.Thread(target=_listen_loop, name="alert-hub", daemon=True).start()
+
+
+def subscribe(user_id):
+    q = queue.Queue(maxsize=STREAM_QUEUE_SIZE)
+    with _lock:
+        _subscribers.setdefault(user_id, set()).add(q)
+    return q
+
+
+def unsubscribe(user_id, q):
+    with _lock:
+        streams = _subscribers.get(user_id)
+        if streams is not None:
+            streams.discard(q)
+            if not streams:
+                del _subscribers[user_id]
+
+
+def _event(name, data, event_id=None):
+    head = f"id: {event_id}\n" if event_id else ""
+    return f"{head}event: {name}\ndata: {data}\n\n"
+
+
+def stream(user_id):
+    """
+    SSE events for one user: the upcoming passes once, then each alert as it
+    is dispatched, with heartbeat comments in between.
+    """
+    q = subscribe(user_id)
+    try:
+        yield f"retry: {int(RECONNECT_DELAY_SEC * 1000)}\n\n"
+        try:
+            yield _event("upcoming", json.dumps(upcoming_alerts(user_id)))
+        except Exception as e:
+            print(f"[WARN] Could not list upcoming alerts for {user_id}: {e}")
+        while True:
+            try:
+                member = q.get(timeout=HEARTBEAT_SEC)
+            except queue.Empty:
+                yield ": keepalive\n\n"
+                continue
+            yield _event("alert", member, json.loads(member).get("id"))
+    finally:
+        unsubscribe(user_id, q)
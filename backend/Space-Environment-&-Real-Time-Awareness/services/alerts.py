@@ -1,80 +1,204 @@
-from skyfield.api import load, wgs84, utc
 from datetime import datetime, timedelta, timezone
 from db.redis_client import r
+from services.propagation import get_tle_array, julian_date, teme_to_ecef, geodetic_to_ecef, WGS84_A
+from sgp4.api import SatrecArray
 import numpy as np
+import json
+import os
+import uuid
 
-# how many seconds between samples
-STEP_SEC = 5 * 60        # 5 min steps for a quick test
+# seconds between samples; a LEO pass through a 500 km sphere lasts a minute or more
+STEP_SEC = float(os.getenv("ALERT_STEP_SEC", 20))
 # fallback test alert delay when nothing real shows up
 FALLBACK_DELAY_SEC = 60  # 1 min test alert
-# demo horizon
-HORIZON_HOURS = 1        # only look 1 hour ahead
-# max sats to scan
-MAX_SATS = 50            # only check first 50 TLEs
+# how far ahead to look
+HORIZON_HOURS = float(os.getenv("ALERT_HORIZON_HOURS", 24))
+# Celestrak group scanned for passes (the whole active catalog by default)
+TLE_GROUP = os.getenv("ALERT_TLE_GROUP", "active")
+RADIUS_KM = float(os.getenv("ALERT_RADIUS_KM", 500))
+# time steps per vectorized call: small first so a pass in the next minutes is
+# found quickly, doubling up to the max; the scan stops at the first chunk with a pass
+FIRST_CHUNK_STEPS = 15
+MAX_CHUNK_STEPS = 240
+# bisection rounds when refining a crossing (STEP_SEC / 2**n resolution)
+REFINE_ROUNDS = 12
+# passes scheduled per registration, and the minimum spacing between them
+PASSES_PER_REGISTRATION = int(os.getenv("ALERT_PASSES", 3))
+PASS_GAP_SEC = float(os.getenv("ALERT_PASS_GAP_SEC", 600))
+# upcoming alerts a single user may hold; the latest ones are dropped beyond it
+MAX_ALERTS_PER_USER = int(os.getenv("ALERT_MAX_PER_USER", 20))
 
-def find_closest_pass(satrec, observer_latlon, ts, radius_km=500):
+# every scheduled alert, scored by the epoch second it is due; the dispatcher
+# (services/alert_dispatcher.py) pops due members from here
+DUE_KEY = "alerts:due"
+
+def user_key(user_id):
+    # the same members, per user, for listing upcoming passes
+    return f"alerts:user:{user_id}"
+
+def _distance_km(satrec, observer, jd, fr):
+    e, pos, _ = satrec.sgp4(jd, fr)
+    if e:
+        return np.inf
+    return float(np.linalg.norm(teme_to_ecef(np.asarray(pos), jd, fr) - observer))
+
+def _refine_entry(satrec, observer, jd, fr_out, fr_in, radius_km):
+    """
+    Bisect between a sample outside the radius and the next one inside it.
+    """
+    for _ in range(REFINE_ROUNDS):
+        mid = (fr_out + fr_in) / 2.0
+        if _distance_km(satrec, observer, jd, mid) <= radius_km:
+            fr_in = mid
+        else:
+            fr_out = mid
+    return fr_in
+
+def find_next_pass(tle_array, lat, lon, start=None, radius_km=RADIUS_KM,
+                   horizon_hours=HORIZON_HOURS, step_sec=STEP_SEC):
     """
-    Return the first datetime over the next HORIZON_HOURS when the satellite
-    is within radius_km of observer_latlon, or None.
+    Earliest (datetime, name) over the horizon at which any satellite comes
+    within radius_km of the observer, or None.
+
+    Satellites that can reach the radius at all are propagated over a chunk
+    of time steps in one sgp4 call and compared with the observer in the
+    Earth-fixed frame; the first chunk with a sample inside the radius ends
+    the scan and the crossing of the satellites that entered at that sample
+    is refined by bisection.
     """
-    now = datetime.utcnow().replace(tzinfo=utc)
-    total_steps = int((HORIZON_HOURS * 3600) / STEP_SEC)
-    for i in range(total_steps + 1):
-        t = ts.utc(
-            now.year, now.month, now.day,
-            now.hour, now.minute, now.second + i * STEP_SEC
-        )
-        sat_pos = satrec.at(t).position.km
-        obs_pos = wgs84.latlon(
-            observer_latlon.latitude.degrees,
-            observer_latlon.longitude.degrees,
-            elevation_m=0
-        ).at(t).position.km
-        dist = np.linalg.norm(sat_pos - obs_pos)
-        if dist <= radius_km:
-            print(f"[DEBUG] PASS: {satrec.name} at {t.utc_datetime()} (dist {dist:.1f} km)")
-            return t.utc_datetime()
+    # a satellite whose perigee is higher than the radius can never get close
+    # enough: the observer is no farther than WGS84_A from the Earth's centre
+    rows = np.array(
+        [i for i, sat in enumerate(tle_array.satrecs) if sat.altp * WGS84_A <= radius_km],
+        dtype=int,
+    )
+    if len(rows) == 0:
+        return None
+    satrecs = SatrecArray([tle_array.satrecs[i] for i in rows])
+
+    start = start or datetime.now(timezone.utc)
+    jd0, fr0 = julian_date(start)
+    observer = geodetic_to_ecef(lat, lon)
+    n_steps = int(horizon_hours * 3600 / step_sec) + 1
+    step_fr = step_sec / 86400.0
+
+    first, chunk = 0, FIRST_CHUNK_STEPS
+    while first < n_steps:
+        fr = fr0 + np.arange(first, min(first + chunk, n_steps)) * step_fr
+        first, chunk = first + len(fr), min(chunk * 2, MAX_CHUNK_STEPS)
+        jd = np.full(len(fr), jd0)
+        e, pos, _ = satrecs.sgp4(jd, fr)
+        dist = np.linalg.norm(teme_to_ecef(pos, jd0, fr) - observer, axis=-1)
+        inside = (e == 0) & (dist <= radius_km)
+        steps_hit = np.flatnonzero(inside.any(axis=0))
+        if len(steps_hit) == 0:
+            continue
+
+        k = steps_hit[0]
+        best = None
+        for row in rows[np.flatnonzero(inside[:, k])]:
+            if fr[k] == fr0:
+                # already in range at the start of the window
+                fr_pass = fr0
+            else:
+                fr_pass = _refine_entry(
+                    tle_array.satrecs[row], observer, jd0, fr[k] - step_fr, fr[k], radius_km
+                )
+            if best is None or fr_pass < best[0]:
+                best = (fr_pass, tle_array.names[row])
+
+        fr_pass, name = best
+        when = start + timedelta(days=fr_pass - fr0)
+        print(f"[DEBUG] PASS: {name} at {when} (within {radius_km:.0f} km)")
+        return when, name
     return None
 
+def find_passes(tle_array, lat, lon, count=PASSES_PER_REGISTRATION, start=None,
+                gap_sec=PASS_GAP_SEC):
+    """
+    Up to `count` upcoming passes as (datetime, name), at least gap_sec apart.
+    """
+    start = start or datetime.now(timezone.utc)
+    horizon_end = start + timedelta(hours=HORIZON_HOURS)
+    passes = []
+    while len(passes) < count and start < horizon_end:
+        hours_left = (horizon_end - start).total_seconds() / 3600.0
+        found = find_next_pass(tle_array, lat, lon, start=start, horizon_hours=hours_left)
+        if not found:
+            break
+        passes.append(found)
+        start = found[0] + timedelta(seconds=gap_sec)
+    return passes
+
+def _alert_member(user_id, lat, lon, when, name, msg):
+    # one JSON document is both the sorted-set member and the published payload
+    return json.dumps({
+        "id": uuid.uuid4().hex,
+        "user_id": user_id,
+        "lat": lat,
+        "lon": lon,
+        "at": when.isoformat(),
+        "sat": name,
+        "msg": msg,
+    }, sort_keys=True)
+
+def add_alerts(user_id, alerts):
+    """
+    Queue (when, member) pairs for delivery and cap what the user holds.
+    """
+    key = user_key(user_id)
+    scored = {member: when.timestamp() for when, member in alerts}
+    pipe = r.pipeline()
+    pipe.zadd(DUE_KEY, scored)
+    pipe.zadd(key, scored)
+    pipe.zrange(key, MAX_ALERTS_PER_USER, -1)
+    dropped = pipe.execute()[-1]
+    if dropped:
+        pipe = r.pipeline()
+        pipe.zrem(DUE_KEY, *dropped)
+        pipe.zrem(key, *dropped)
+        pipe.execute()
+
+def upcoming_alerts(user_id):
+    """
+    The user's scheduled alerts that have not been delivered yet, soonest first.
+    """
+    return [json.loads(member) for member in r.zrange(user_key(user_id), 0, -1)]
+
 def schedule_alert(user_id, lat, lon):
-    tle_url = 'https://celestrak.org/NORAD/elements/gp.php?GROUP=stations&FORMAT=tle'
-    print(f"[DEBUG] Loading TLE data from {tle_url}")
+    print(f"[DEBUG] Loading TLE data for group '{TLE_GROUP}'")
     try:
-        sats = load.tle_file(tle_url)
+        tle_array = get_tle_array(TLE_GROUP)
     except Exception as e:
         print(f"[ERROR] TLE load failed: {e}")
         return {"msg": "Failed to load TLE data"}
 
-    # demo: only scan the first MAX_SATS satellites
-    sats = sats[:MAX_SATS]
-    print(f"[DEBUG] Scanning {len(sats)} satellites (limited to {MAX_SATS})")
-
-    ts = load.timescale()
-    observer = wgs84.latlon(latitude_degrees=lat,
-                             longitude_degrees=lon,
-                             elevation_m=0)
-
-    soonest = None
-    name = None
-    for sat in sats:
-        try:
-            t_pass = find_closest_pass(sat, observer, ts)
-            if t_pass and (soonest is None or t_pass < soonest):
-                soonest, name = t_pass, sat.name
-        except Exception as e:
-            print(f"[WARN] {sat.name} skipped: {e}")
-
-    if soonest:
-        now_utc = datetime.utcnow().replace(tzinfo=timezone.utc)
-        ttl = int((soonest - now_utc).total_seconds())
-        if ttl > 0:
-            msg = f"Sat '{name}' within 500 km at {soonest.strftime('%H:%M')}"
-            r.setex(f"alert:{user_id}", ttl, msg)
-            return {"msg": "Alert set", "at": soonest.strftime('%Y-%m-%d %H:%M')}
+    print(f"[DEBUG] Scanning {len(tle_array)} satellites over {HORIZON_HOURS:g} h at {STEP_SEC:g} s steps")
+    now_utc = datetime.now(timezone.utc)
+    passes = [(when, name) for when, name in find_passes(tle_array, lat, lon) if when > now_utc]
+
+    if passes:
+        alerts = []
+        for when, name in passes:
+            msg = f"Sat '{name}' within {RADIUS_KM:.0f} km at {when.strftime('%H:%M')}"
+            alerts.append((when, _alert_member(user_id, lat, lon, when, name, msg)))
+        add_alerts(user_id, alerts)
+
+        # kept for clients still polling /api/alerts/check
+        soonest = passes[0][0]
+        ttl = max(1, int((soonest - now_utc).total_seconds()))
+        r.setex(f"alert:{user_id}", ttl, json.loads(alerts[0][1])["msg"])
+        return {
+            "msg": "Alert set",
+            "at": soonest.strftime('%Y-%m-%d %H:%M'),
+            "passes": [when.strftime('%Y-%m-%d %H:%M') for when, _ in passes],
+        }
 
     # fallback test alert
-    test_time = datetime.utcnow().replace(tzinfo=timezone.utc) + timedelta(seconds=FALLBACK_DELAY_SEC)
-    r.setex(f"alert:{user_id}", FALLBACK_DELAY_SEC, "Test alert: sat passing now")
+    test_time = now_utc + timedelta(seconds=FALLBACK_DELAY_SEC)
+    test_msg = "Test alert: sat passing now"
+    add_alerts(user_id, [(test_time, _alert_member(user_id, lat, lon, test_time, None, test_msg))])
+    r.setex(f"alert:{user_id}", FALLBACK_DELAY_SEC, test_msg)
     print("[DEBUG] No real pass → test alert in 1 min")
     return {"msg": "Test alert set", "at": test_time.strftime('%Y-%m-%d %H:%M')}
 
@@ -1,37 +1,12 @@
 # services/congestion.py
  
-from skyfield.api import EarthSatellite, load
+from skyfield.api import load
 from collections import defaultdict
-from pymongo import MongoClient
-import os
-from bson import ObjectId
-import requests
+from db.mongo_client import get_collection
+from services.propagation import get_tle_array
+import numpy as np
  
  
-def fetch_tle_data():
-    url = 'https://celestrak.org/NORAD/elements/gp.php?GROUP=active&FORMAT=tle'
-    response = requests.get(url)
-    lines = response.text.strip().splitlines()
-
-    satellites = []
-
-    for i in range(0, len(lines) - 2, 3):
-        name = lines[i].strip()
-        line1 = lines[i + 1].strip()
-        line2 = lines[i + 2].strip()
-
-        try:
-            sat = EarthSatellite(line1, line2, name)
-            sat.line1 = line1  # Attach for frontend use
-            sat.line2 = line2
-            satellites.append(sat)
-        except Exception as e:
-            print(f"[DEBUG] Skipping invalid TLE for {name}: {e}")
-
-    print(f"[DEBUG] Loaded {len(satellites)} valid TLE satellites")
-    return satellites
-
-
 def classify_congestion(count):
     if count < 100:
         return "Low"
@@ -41,16 +16,27 @@ def classify_congestion(count):
         return "High"
 
 
+# the heatmap is one document, replaced in place under this _id
+CONGESTION_DOC_ID = "active"
+
+
+DEFAULT_BINS = {
+    "LEO (160-600 km)": (160, 600),
+    "LEO (600-1200 km)": (600, 1200),
+    "LEO (1200-2000 km)": (1200, 2000),
+    "MEO": (2000, 35786),
+    "GEO": (35786, 36000),
+    "HEO": (36000, 100000)
+}
+
+
 def cluster_by_altitude(satellites, bins=None):
+    """
+    Per-satellite reference loop over EarthSatellite objects; the endpoint
+    uses cluster_by_altitude_vectorized. Kept for bench_congestion.py.
+    """
     if bins is None:
-        bins = {
-            "LEO (160-600 km)": (160, 600),
-            "LEO (600-1200 km)": (600, 1200),
-            "LEO (1200-2000 km)": (1200, 2000),
-            "MEO": (2000, 35786),
-            "GEO": (35786, 36000),
-            "HEO": (36000, 100000)
-        }
+        bins = DEFAULT_BINS
  
     ts = load.timescale()
     now = ts.now()
@@ -86,28 +72,96 @@ def cluster_by_altitude(satellites, bins=None):
     return output
 
 
-def sanitize_mongo_doc(doc):
-    return {k: str(v) if isinstance(v, ObjectId) else v for k, v in doc.items()}
- 
+def zone_members(alt_km, bins):
+    """
+    zone → row indices whose altitude falls in [low, high), in catalog order.
+    Contiguous, non-overlapping bins (the default) go through one np.digitize;
+    anything else falls back to one vectorized mask per zone.
+    """
+    zones = sorted(bins.items(), key=lambda item: item[1][0])
+    contiguous = all(zones[i][1][1] == zones[i + 1][1][0] for i in range(len(zones) - 1))
 
-def get_congestion_data():
-    satellites = fetch_tle_data()
-    result = cluster_by_altitude(satellites)
- 
-    try:
-        mongo_uri = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
-        client = MongoClient(mongo_uri)
-        db = client["satellite_db"]
-        collection = db["congestion_data"]
- 
-        collection.delete_many({})
-        inserted = collection.insert_one(result)
-        print("[MongoDB] Congestion data stored successfully.")
- 
-        # Sanitize result for JSON response
-        result["_id"] = str(inserted.inserted_id)
- 
-    except Exception as e:
-        print(f"[MongoDB] Error storing data: {e}")
+    members = {}
+    if contiguous and zones:
+        edges = np.array([low for _, (low, _) in zones] + [zones[-1][1][1]], dtype=float)
+        slot = np.digitize(alt_km, edges)    # 0 below, len(edges) at/above the top; NaN → len(edges)
+        order = np.argsort(slot, kind="stable")
+        counts = np.bincount(slot, minlength=len(edges) + 1)
+        bounds = np.concatenate([[0], np.cumsum(counts)])
+        for i, (zone, _) in enumerate(zones, start=1):
+            rows = order[bounds[i]:bounds[i + 1]]
+            if len(rows):
+                members[zone] = rows
+    else:
+        for zone, (low, high) in bins.items():
+            rows = np.flatnonzero((alt_km >= low) & (alt_km < high))
+            if len(rows):
+                members[zone] = rows
+
+    # the loop version filled zones in order of their first satellite
+    return dict(sorted(members.items(), key=lambda item: item[1][0]))
+
+
+def cluster_by_altitude_vectorized(tle_array, bins=None, include_satellites=True):
+    """
+    Same output as cluster_by_altitude, but the whole catalog is propagated
+    in one sgp4 call and binned with np.digitize. With include_satellites
+    off, zones carry only count and congestion (no per-satellite TLE dump).
+    """
+    bins = bins or DEFAULT_BINS
+    ok, _, _, alt_km = tle_array.geodetic()
+    alt_km = np.where(ok, alt_km, np.nan)
+
+    output = {}
+    for zone, rows in zone_members(alt_km, bins).items():
+        if not include_satellites:
+            output[zone] = {"count": len(rows), "congestion": classify_congestion(len(rows))}
+            continue
+        zone_type = "LEO" if "LEO" in zone else zone
+        altitudes = np.round(alt_km[rows], 2).tolist()
+        names = tle_array.names[rows].tolist()
+        line1 = tle_array.line1[rows].tolist()
+        line2 = tle_array.line2[rows].tolist()
+        sats = [
+            {
+                "name": names[i],
+                "altitude": altitudes[i],
+                "tle_line1": line1[i],
+                "tle_line2": line2[i],
+                "type": zone_type
+            }
+            for i in range(len(rows))
+        ]
+        output[zone] = {
+            "count": len(sats),
+            "congestion": classify_congestion(len(sats)),
+            "satellites": sats
+        }
+
+    return output
+
+
+def refresh_congestion_data():
+    """
+    Recompute the heatmap (with satellites) and store it; run by services/refresh.py.
+    """
+    result = cluster_by_altitude_vectorized(get_tle_array("active"))
+    collection = get_collection("congestion_data")
  
-    return result
\ No newline at end of file
+    # a single-document replace is atomic: readers never find the collection empty
+    collection.replace_one({"_id": CONGESTION_DOC_ID}, result, upsert=True)
+    # documents left over from the old delete + insert refresh
+    collection.delete_many({"_id": {"$ne": CONGESTION_DOC_ID}})
+    print("[MongoDB] Congestion data stored successfully.")
+    return {zone: data["count"] for zone, data in result.items()}
+
+
+def get_congestion_data(include_satellites=True):
+    """
+    The stored heatmap ({} before the first refresh). Without satellites the
+    per-satellite lists are projected out in Mongo rather than in Python.
+    """
+    projection = {"_id": 0}
+    if not include_satellites:
+        projection.update({f"{zone}.satellites": 0 for zone in DEFAULT_BINS})
+    return get_collection("congestion_data").find_one({"_id": CONGESTION_DOC_ID}, projection) or {}
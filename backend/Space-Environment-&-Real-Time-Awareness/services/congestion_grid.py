@@ -0,0 +1,155 @@
+# services/congestion_grid.py
+
+from datetime import datetime, timezone
+
+import numpy as np
+
+from services.propagation import WGS84_A, get_tle_array
+
+# altitude shell edges (km): fine through LEO, coarse beyond
+DEFAULT_ALT_EDGES = [
+    160, 300, 400, 500, 600, 700, 800, 1000, 1200, 1500, 2000,
+    5000, 10000, 20000, 30000, 35586, 35986, 100000,
+]
+DEFAULT_LAT_STEP = 10.0
+DEFAULT_LON_STEP = 10.0
+DEFAULT_TOP_K = 20
+MAX_CELLS = 2_000_000
+
+
+def lat_edges(step_deg, mode="uniform"):
+    """
+    Latitude band edges in degrees. "equal_area" spaces the bands evenly in
+    sin(latitude), so with uniform longitude steps every cell in a shell
+    covers the same area (HEALPix-style rings without the pixel scheme).
+    """
+    n = max(1, int(round(180.0 / step_deg)))
+    if mode == "equal_area":
+        return np.degrees(np.arcsin(np.linspace(-1.0, 1.0, n + 1)))
+    return np.linspace(-90.0, 90.0, n + 1)
+
+
+def cell_volumes(alt_e, lat_e, lon_step_deg):
+    """
+    Volume in km³ of every (alt, lat) cell, one longitude slice wide;
+    shape (n_alt, n_lat). Spherical shells over the WGS84 equatorial radius.
+    """
+    r = WGS84_A + np.asarray(alt_e, dtype=float)
+    shell = (r[1:] ** 3 - r[:-1] ** 3) / 3.0
+    band = np.diff(np.sin(np.radians(lat_e)))
+    return np.outer(shell, band) * np.radians(lon_step_deg)
+
+
+def _bin(values, edges):
+    # 0-based bin index, -1 when outside [edges[0], edges[-1])
+    idx = np.digitize(values, edges) - 1
+    idx[(idx < 0) | (idx >= len(edges) - 1)] = -1
+    return idx
+
+
+def compute_grid(
+    alt_edges=None,
+    lat_step=DEFAULT_LAT_STEP,
+    lon_step=DEFAULT_LON_STEP,
+    lat_mode="equal_area",
+    top_k=DEFAULT_TOP_K,
+    include_satellites=False,
+    group="active",
+):
+    """
+    Propagate the catalog to now and count satellites per altitude × latitude
+    × longitude cell. Only non-empty cells are returned, plus the top_k
+    cells by density (objects per 10⁶ km³). Equal-area latitude bands are
+    the default so polar cells don't look dense just for being small.
+    """
+    if lat_mode not in ("uniform", "equal_area"):
+        raise ValueError("lat_mode must be 'uniform' or 'equal_area'")
+    if not (0 < lat_step <= 180 and 0 < lon_step <= 360):
+        raise ValueError("lat_step must be in (0, 180] and lon_step in (0, 360]")
+    alt_e = np.asarray(alt_edges or DEFAULT_ALT_EDGES, dtype=float)
+    # repeated edges make zero-volume cells, whose density is inf / nan
+    if not np.all(np.isfinite(alt_e)) or np.any(np.diff(alt_e) <= 0):
+        raise ValueError("alt_edges must be finite and strictly increasing")
+    lat_e = lat_edges(lat_step, lat_mode)
+    n_lon = max(1, int(round(360.0 / lon_step)))
+    lon_step = 360.0 / n_lon
+    lon_e = np.linspace(-180.0, 180.0, n_lon + 1)
+    n_alt, n_lat = len(alt_e) - 1, len(lat_e) - 1
+    if n_alt < 1:
+        raise ValueError("need at least two altitude edges")
+    if n_alt * n_lat * n_lon > MAX_CELLS:
+        raise ValueError(f"grid too fine ({n_alt}×{n_lat}×{n_lon} cells, max {MAX_CELLS})")
+
+    tle_array = get_tle_array(group)
+    computed_at = datetime.now(timezone.utc)
+    ok, lat, lon, alt = tle_array.geodetic(computed_at)
+
+    a = _bin(alt, alt_e)
+    b = np.clip(np.digitize(lat, lat_e) - 1, 0, n_lat - 1)
+    c = np.clip(((lon + 180.0) // lon_step).astype(int), 0, n_lon - 1)
+    inside = ok & (a >= 0)
+
+    flat = (a * n_lat + b) * n_lon + c
+    cells, counts = np.unique(flat[inside], return_counts=True)
+    ai, rest = np.divmod(cells, n_lat * n_lon)
+    bi, ci = np.divmod(rest, n_lon)
+
+    volumes = cell_volumes(alt_e, lat_e, lon_step)[ai, bi]
+    density = counts / volumes * 1e6
+
+    def cell_doc(i):
+        return {
+            "cell": [int(ai[i]), int(bi[i]), int(ci[i])],
+            "alt_km": [float(alt_e[ai[i]]), float(alt_e[ai[i] + 1])],
+            "lat": [round(float(lat_e[bi[i]]), 4), round(float(lat_e[bi[i] + 1]), 4)],
+            "lon": [float(lon_e[ci[i]]), float(lon_e[ci[i] + 1])],
+            "count": int(counts[i]),
+            "density": float(density[i]),
+        }
+
+    top = np.argsort(-density, kind="stable")[:max(0, top_k)]
+    result = {
+        "computed_at": computed_at.isoformat(),
+        "satellites_total": int(len(tle_array)),
+        "satellites_binned": int(inside.sum()),
+        "grid": {
+            "alt_edges_km": alt_e.tolist(),
+            "lat_edges_deg": np.round(lat_e, 4).tolist(),
+            "lon_step_deg": lon_step,
+            "lat_mode": lat_mode,
+            "shape": [n_alt, n_lat, n_lon],
+        },
+        # sparse COO layout: bounds come from the grid edges
+        "cells": {
+            "alt": ai.tolist(),
+            "lat": bi.tolist(),
+            "lon": ci.tolist(),
+            "count": counts.tolist(),
+        },
+        "hotspots": [cell_doc(i) for i in top],
+    }
+
+    if include_satellites:
+        rows = np.flatnonzero(inside)
+        result["satellites"] = [
+            {
+                "name": name,
+                "latitude": la,
+                "longitude": lo,
+                "altitude_km": al,
+                "cell": [ca, cb, cc],
+            }
+            for name, la, lo, al, ca, cb, cc in zip(
+                tle_array.names[rows].tolist(),
+                np.round(lat[rows], 2).tolist(),
+                np.round(lon[rows], 2).tolist(),
+                np.round(alt[rows], 2).tolist(),
+                a[rows].tolist(), b[rows].tolist(), c[rows].tolist(),
+            )
+        ]
+
+    print(
+        f"[DEBUG][congestion_grid] {result['satellites_binned']} sats → "
+        f"{len(cells)} non-empty of {n_alt * n_lat * n_lon} cells"
+    )
+    return result
@@ -0,0 +1,219 @@
+# services/conjunctions.py
+#
+# Close-approach screening over the active catalog:
+#   1. propagate everything on a coarse time grid (vectorized sgp4, TEME km)
+#   2. per step, a KD-tree finds pairs within threshold + the distance either
+#      object pair could close in half a step — no O(N²) pairwise checks
+#   3. a linear relative-motion model per candidate throws out pairs that
+#      can't get under the threshold around that step
+#   4. survivors get their time of closest approach refined with sgp4 itself
+#
+#   python -m services.conjunctions --hours 24 --threshold 5
+
+import argparse
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from db import mongo_client
+from services.propagation import get_tle_array, julian_date
+
+DEFAULT_HOURS = float(os.getenv("CONJUNCTION_HOURS", 24))
+DEFAULT_STEP_SEC = float(os.getenv("CONJUNCTION_STEP_SEC", 10))
+DEFAULT_THRESHOLD_KM = float(os.getenv("CONJUNCTION_THRESHOLD_KM", 5))
+# time steps propagated per sgp4 call; bounds memory at n_sats × chunk × 6 doubles
+CHUNK_STEPS = int(os.getenv("CONJUNCTION_CHUNK_STEPS", 90))
+# head-on LEO closing speed bounds how far a pair can close within half a step
+MAX_CLOSING_KM_S = 16.0
+# slack for orbit curvature over half a step when using the linear model
+CURVATURE_PAD_KM = 1.0
+REFINE_ITERATIONS = 5
+
+
+def _candidates(r, v, ok, step_sec, threshold_km):
+    """
+    Candidate pairs at one time step: (i, j, tau_sec, linear miss distance).
+    r, v: (n, 3) TEME km and km/s; ok: (n,) mask of valid states.
+    """
+    rows = np.flatnonzero(ok)
+    if len(rows) < 2:
+        return None
+    half = step_sec / 2.0
+    tree = cKDTree(r[rows])
+    pairs = tree.query_pairs(threshold_km + MAX_CLOSING_KM_S * half, output_type="ndarray")
+    if len(pairs) == 0:
+        return None
+
+    i, j = rows[pairs[:, 0]], rows[pairs[:, 1]]
+    dr = r[i] - r[j]
+    dv = v[i] - v[j]
+    dv2 = np.einsum("ij,ij->i", dv, dv)
+    # time of closest approach under straight-line relative motion, kept within ± half a step
+    tau = np.clip(-np.einsum("ij,ij->i", dr, dv) / np.maximum(dv2, 1e-12), -half, half)
+    miss = np.linalg.norm(dr + dv * tau[:, None], axis=1)
+    keep = miss <= threshold_km + CURVATURE_PAD_KM
+    if not keep.any():
+        return None
+    return i[keep], j[keep], tau[keep], miss[keep]
+
+
+def _state(satrec, jd, fr):
+    e, r, v = satrec.sgp4(jd, fr)
+    return e, np.asarray(r), np.asarray(v)
+
+
+def refine_tca(sat_a, sat_b, jd, fr, window_sec):
+    """
+    Newton-style iteration on d/dt |r_a - r_b|² = 0 using full sgp4 states,
+    starting at (jd, fr) and staying within ± window_sec of it.
+    Returns (fr offset from jd, miss_km, relative_speed_km_s) or None.
+    """
+    fr0 = fr
+    for _ in range(REFINE_ITERATIONS):
+        ea, ra, va = _state(sat_a, jd, fr)
+        eb, rb, vb = _state(sat_b, jd, fr)
+        if ea or eb:
+            return None
+        dr, dv = ra - rb, va - vb
+        dv2 = dv @ dv
+        if dv2 < 1e-12:
+            break
+        dt = -(dr @ dv) / dv2
+        offset = np.clip((fr - fr0) * 86400.0 + dt, -window_sec, window_sec)
+        new_fr = fr0 + offset / 86400.0
+        if abs(new_fr - fr) * 86400.0 < 1e-3:
+            fr = new_fr
+            break
+        fr = new_fr
+
+    ea, ra, va = _state(sat_a, jd, fr)
+    eb, rb, vb = _state(sat_b, jd, fr)
+    if ea or eb:
+        return None
+    return fr, float(np.linalg.norm(ra - rb)), float(np.linalg.norm(va - vb))
+
+
+def screen(tle_array, start=None, hours=DEFAULT_HOURS, step_sec=DEFAULT_STEP_SEC,
+           threshold_km=DEFAULT_THRESHOLD_KM):
+    """
+    Find every pair that comes within threshold_km over [start, start + hours].
+    Returns a list of events sorted by TCA, one per pair and encounter.
+    """
+    start = start or datetime.now(timezone.utc)
+    if len(tle_array) < 2:
+        return []
+    jd0, fr0 = julian_date(start)
+    n_steps = int(hours * 3600 / step_sec) + 1
+    offsets = np.arange(n_steps) * step_sec / 86400.0
+    satrecs = tle_array.array
+
+    t0 = time.perf_counter()
+    raw = []   # (i, j, fr of the linear TCA, linear miss)
+    for first in range(0, n_steps, CHUNK_STEPS):
+        fr = fr0 + offsets[first:first + CHUNK_STEPS]
+        jd = np.full(len(fr), jd0)
+        e, r, v = satrecs.sgp4(jd, fr)
+        ok = (e == 0) & np.all(np.isfinite(r), axis=-1)
+        for k in range(len(fr)):
+            found = _candidates(r[:, k], v[:, k], ok[:, k], step_sec, threshold_km)
+            if found is not None:
+                i, j, tau, miss = found
+                raw.append(np.column_stack([i, j, fr[k] + tau / 86400.0, miss]))
+    t_screen = time.perf_counter() - t0
+
+    events = []
+    if raw:
+        cand = np.concatenate(raw)
+        # a slow encounter is flagged on several consecutive steps: group
+        # candidates of the same pair less than two steps apart and refine
+        # only the one with the smallest linear miss distance
+        order = np.lexsort((cand[:, 2], cand[:, 1], cand[:, 0]))
+        cand = cand[order]
+        same_pair = (np.diff(cand[:, 0]) == 0) & (np.diff(cand[:, 1]) == 0)
+        near = np.diff(cand[:, 2]) * 86400.0 <= 2 * step_sec
+        run = np.concatenate([[0], np.cumsum(~(same_pair & near))])
+        best = np.lexsort((cand[:, 3], run))
+        first = np.concatenate([[True], np.diff(run[best]) != 0])
+        cand = cand[best[first]]
+
+        for a, b, fr, _ in cand:
+            a, b = int(a), int(b)
+            sat_a, sat_b = tle_array.satrecs[a], tle_array.satrecs[b]
+            refined = refine_tca(sat_a, sat_b, jd0, fr, step_sec)
+            if refined is None:
+                continue
+            tca_fr, miss, speed = refined
+            if miss > threshold_km:
+                continue
+            events.append({
+                "sat1": tle_array.names[a],
+                "sat2": tle_array.names[b],
+                "tca": start + timedelta(days=tca_fr - fr0),
+                "miss_distance_km": round(miss, 3),
+                "relative_speed_km_s": round(speed, 3),
+            })
+    events.sort(key=lambda ev: ev["tca"])
+
+    print(
+        f"[DEBUG][conjunctions] {len(tle_array)} sats × {n_steps} steps: "
+        f"screen {t_screen:.1f}s, refine {time.perf_counter() - t0 - t_screen:.1f}s, "
+        f"{len(events)} events ≤ {threshold_km} km"
+    )
+    return events
+
+
+def get_collection():
+    return mongo_client.get_collection("conjunctions")
+
+
+def run_screening(hours=DEFAULT_HOURS, step_sec=DEFAULT_STEP_SEC,
+                  threshold_km=DEFAULT_THRESHOLD_KM, group="active"):
+    """
+    Screen the cached catalog and atomically replace the stored results with this run.
+    """
+    start = datetime.now(timezone.utc)
+    events = screen(get_tle_array(group), start, hours, step_sec, threshold_km)
+    run = {
+        "screened_at": start,
+        "hours": hours,
+        "step_sec": step_sec,
+        "threshold_km": threshold_km,
+        "group": group,
+    }
+
+    # each run is a new snapshot with no natural key: build it aside and swap it in
+    mongo_client.swap_in(
+        "conjunctions",
+        [{**event, **run} for event in events],
+        indexes=[[("tca", 1)], [("miss_distance_km", 1)]],
+    )
+    print(f"[MongoDB] Stored {len(events)} conjunctions.")
+    return events
+
+
+def get_conjunctions(limit=500, max_distance_km=None):
+    """
+    Stored events from the last screening, soonest TCA first.
+    """
+    query = {}
+    if max_distance_km is not None:
+        query["miss_distance_km"] = {"$lte": max_distance_km}
+    docs = list(get_collection().find(query, {"_id": 0}).sort("tca", 1).limit(limit))
+    for doc in docs:
+        for key in ("tca", "screened_at"):
+            if isinstance(doc.get(key), datetime):
+                doc[key] = doc[key].replace(tzinfo=timezone.utc).isoformat()
+    return docs
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hours", type=float, default=DEFAULT_HOURS)
+    parser.add_argument("--step", type=float, default=DEFAULT_STEP_SEC)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD_KM)
+    parser.add_argument("--group", default="active")
+    args = parser.parse_args()
+    run_screening(args.hours, args.step, args.threshold, args.group)
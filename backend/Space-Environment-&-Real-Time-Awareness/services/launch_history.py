@@ -1,32 +1,172 @@
-import requests
-from datetime import datetime
-from pymongo import MongoClient
+# services/launch_history.py
+#
+# Incremental launch-history ingestion into Mongo's launch_history:
+#   - LL2 is walked page by page in (last_updated, id) order from a stored
+#     high-water mark (last_updated__gte) plus the number of launches at that
+#     timestamp already written, so a run only downloads launches that
+#     changed, and a run cut short (rate limit, error, page cap) resumes where
+#     it stopped even inside a burst of launches sharing one last_updated
+#   - SpaceX's query API is paged in date order from the date of the latest
+#     launch that already happened; upcoming ones are re-read every run
+#   - both sources run concurrently; records are upserted by launch_id
+#
+#   python -m services.launch_history
+#   LL2_BASE_URL=http://localhost:8090/2.2.0 SPACEX_BASE_URL=http://localhost:8090/v4 \
+#       python -m services.launch_history      # against scripts/launch_standin.py
+
 import os
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from db.mongo_client import bulk_write, ensure_unique_index, get_collection
+
+LL2_BASE_URL = os.getenv("LL2_BASE_URL", "https://ll.thespacedevs.com/2.2.0").rstrip("/")
+SPACEX_BASE_URL = os.getenv("SPACEX_BASE_URL", "https://api.spacexdata.com/v4").rstrip("/")
+LL2_PAGE_SIZE = int(os.getenv("LL2_PAGE_SIZE", 100))
+SPACEX_PAGE_SIZE = int(os.getenv("SPACEX_PAGE_SIZE", 200))
+# pages per source per run, 0 for no cap (LL2's free tier allows ~15 requests/hour)
+MAX_PAGES = int(os.getenv("LAUNCH_MAX_PAGES", 0))
+FETCH_TIMEOUT = float(os.getenv("LAUNCH_FETCH_TIMEOUT_SEC", 30))
+SPACEX_FIELDS = ["id", "name", "rocket", "date_utc", "success", "upcoming"]
+
+# one document per source: {_id, high_water_mark, offset, last_id}; offset
+# counts the launches at exactly high_water_mark already written and last_id
+# is the last of them (LL2 only)
+STATE_COLLECTION = "ingest_state"
+
+
+def get_ingest_state(source):
+    return get_collection(STATE_COLLECTION).find_one({"_id": f"launches:{source}"}) or {}
+
+
+def get_high_water_mark(source):
+    return get_ingest_state(source).get("high_water_mark")
+
+
+def set_high_water_mark(source, value, offset=0, last_id=None):
+    get_collection(STATE_COLLECTION).update_one(
+        {"_id": f"launches:{source}"},
+        {"$set": {"high_water_mark": value, "offset": offset, "last_id": last_id}},
+        upsert=True,
+    )
+
 
-def fetch_launch_library_data():
-    url = "https://ll.thespacedevs.com/2.2.0/launch/?limit=50&ordering=-net"
-    try:
-        response = requests.get(url)
+def _pages_left(pages):
+    return not MAX_PAGES or pages < MAX_PAGES
+
+
+def ingest_launch_library(collection, session=None):
+    """
+    Upsert LL2 launches updated since the stored high-water mark, one page at a time.
+    The mark moves only after a page is written (bulk_write raises otherwise).
+    A 429 ends the run early; the next run resumes from there, skipping the
+    launches at the mark it already wrote.
+    """
+    session = session or requests.Session()
+    state = get_ingest_state("ll2")
+    hwm, offset, last_id = state.get("high_water_mark"), state.get("offset", 0), state.get("last_id")
+    url = f"{LL2_BASE_URL}/launch/"
+    # id breaks last_updated ties, so the offset means the same launches next run
+    params = {"limit": LL2_PAGE_SIZE, "ordering": "last_updated,id"}
+    if hwm:
+        params["last_updated__gte"] = hwm
+    # start one before the offset: finding last_id there shows no launch at the
+    # mark was updated (and moved past it) since, so the offset still holds
+    verify = bool(hwm and offset and last_id)
+    if verify:
+        params["offset"] = offset - 1
+
+    fetched = pages = 0
+    while url and _pages_left(pages):
+        response = session.get(url, params=params, timeout=FETCH_TIMEOUT)
+        if response.status_code == 429:
+            print(f"[LaunchLibrary2] Rate limited after {pages} pages, resuming next run")
+            break
         response.raise_for_status()
-        return response.json().get("results", [])
-    except Exception as e:
-        print(f"[LaunchLibrary2] Error: {e}")
-        return []
-
-def fetch_spacex_data():
-    url = "https://api.spacexdata.com/v4/launches"
-    try:
-        response = requests.get(url)
+        data = response.json()
+        launches = data.get("results", [])
+        if verify:
+            verify = False
+            if launches and launches[0].get("id") == last_id:
+                launches = launches[1:]
+            else:
+                print(f"[LaunchLibrary2] Launches at {hwm} changed since the last run, re-reading them")
+                url = f"{LL2_BASE_URL}/launch/"
+                params = {"limit": LL2_PAGE_SIZE, "ordering": "last_updated,id", "last_updated__gte": hwm}
+                offset = 0
+                pages += 1
+                continue
+        if launches:
+            bulk_write(collection, normalize_launch_library_data(launches), key="launch_id")
+            for launch in launches:
+                updated = launch.get("last_updated")
+                if not updated:
+                    continue
+                if hwm is None or updated > hwm:
+                    hwm, offset = updated, 1
+                elif updated == hwm:
+                    offset += 1
+                last_id = launch.get("id")
+            set_high_water_mark("ll2", hwm, offset, last_id)
+        fetched += len(launches)
+        pages += 1
+        # the next link carries limit / offset / filters itself
+        url, params = data.get("next"), None
+
+    print(f"[LaunchLibrary2] {fetched} launches from {pages} pages, high-water mark {hwm} (+{offset})")
+    return {"fetched": fetched, "pages": pages, "high_water_mark": hwm, "offset": offset, "complete": not url}
+
+
+def ingest_spacex(collection, session=None):
+    """
+    Upsert SpaceX launches dated on or after the latest launch that already
+    happened; upcoming launches change, so they stay above the mark. The mark
+    moves only after a page is written.
+    """
+    session = session or requests.Session()
+    hwm = get_high_water_mark("spacex")
+    query = {"date_utc": {"$gte": hwm}} if hwm else {}
+
+    fetched = pages = 0
+    page = 1
+    while page and _pages_left(pages):
+        response = session.post(
+            f"{SPACEX_BASE_URL}/launches/query",
+            json={
+                "query": query,
+                "options": {
+                    "page": page,
+                    "limit": SPACEX_PAGE_SIZE,
+                    "sort": {"date_utc": "asc"},
+                    "select": SPACEX_FIELDS,
+                    "pagination": True,
+                },
+            },
+            timeout=FETCH_TIMEOUT,
+        )
         response.raise_for_status()
-        return response.json()
-    except Exception as e:
-        print(f"[SpaceX] Error: {e}")
-        return []
+        data = response.json()
+        launches = data.get("docs", [])
+        if launches:
+            bulk_write(collection, normalize_spacex_data(launches), key="launch_id")
+            done = [l["date_utc"] for l in launches if not l.get("upcoming") and l.get("date_utc")]
+            if done:
+                hwm = max([hwm or ""] + done)
+                set_high_water_mark("spacex", hwm)
+        fetched += len(launches)
+        pages += 1
+        page = data.get("nextPage") if data.get("hasNextPage") else None
+
+    print(f"[SpaceX] {fetched} launches from {pages} pages, high-water mark {hwm}")
+    return {"fetched": fetched, "pages": pages, "high_water_mark": hwm, "complete": not page}
+
 
 def normalize_launch_library_data(data):
     normalized = []
     for launch in data:
         normalized.append({
+            "launch_id": f"ll2:{launch.get('id')}",
             "provider": launch.get("launch_service_provider", {}).get("name", "Unknown"),
             "mission": launch.get("name", "N/A"),
             "rocket": launch.get("rocket", {}).get("configuration", {}).get("name", "Unknown"),
@@ -39,6 +179,7 @@ def normalize_spacex_data(data):
     normalized = []
     for launch in data:
         normalized.append({
+            "launch_id": f"spacex:{launch.get('id')}",
             "provider": "SpaceX",
             "mission": launch.get("name", "N/A"),
             "rocket": launch.get("rocket", "Unknown"),  # Can resolve ID if needed
@@ -47,22 +188,53 @@ def normalize_spacex_data(data):
         })
     return normalized
 
-# ✅ Combined + Save to DB
-def get_combined_launch_history():
-    ll_data = normalize_launch_library_data(fetch_launch_library_data())
-    spacex_data = normalize_spacex_data(fetch_spacex_data())
-    all_data = ll_data + spacex_data
-    all_data.sort(key=lambda x: x.get("date", ""), reverse=True)
-
-    try:
-        mongo_uri = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
-        client = MongoClient(mongo_uri)
-        db = client["satellite_db"]
-        collection = db["launch_history"]
-        collection.delete_many({})
-        collection.insert_many(all_data)
-        print(f"[MongoDB] Inserted {len(all_data)} launch history records.")
-    except Exception as e:
-        print(f"[MongoDB] Launch history insert error: {e}")
-
-    return all_data
+# ✅ Combined + Save to DB (run by services/refresh.py)
+def refresh_launch_history():
+    """
+    Run both ingestions concurrently. One failing source doesn't stop the other;
+    if both fail, this raises, so the scheduler records an error.
+    """
+    collection = get_collection("launch_history")
+    ensure_unique_index(collection, "launch_id")
+    collection.create_index([("date", -1), ("launch_id", 1)])
+
+    jobs = {"ll2": ingest_launch_library, "spacex": ingest_spacex}
+    reports, errors = {}, {}
+    with ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+        futures = {source: pool.submit(job, collection) for source, job in jobs.items()}
+        for source, future in futures.items():
+            try:
+                reports[source] = future.result()
+            except Exception as e:
+                print(f"[{source}] Launch ingestion error: {e}")
+                errors[source] = str(e) or type(e).__name__
+
+    if not reports:
+        raise RuntimeError(f"launch ingestion failed: {errors}")
+    # documents from before launches were keyed by launch_id go once both
+    # sources have been read to the end, so their replacements are all in
+    if not errors and all(report["complete"] for report in reports.values()):
+        removed = collection.delete_many({"launch_id": {"$exists": False}}).deleted_count
+        if removed:
+            print(f"[MongoDB] launch_history: removed {removed} unkeyed documents")
+    if errors:
+        reports["errors"] = errors
+    return reports
+
+def get_combined_launch_history(limit=None, offset=0):
+    """
+    Stored launches from both providers, newest first.
+    """
+    cursor = (
+        get_collection("launch_history")
+        .find({}, {"_id": 0})
+        .sort([("date", -1), ("launch_id", 1)])
+        .skip(offset)
+    )
+    if limit:
+        cursor = cursor.limit(limit)
+    return list(cursor)
+
+
+if __name__ == "__main__":
+    print(refresh_launch_history())
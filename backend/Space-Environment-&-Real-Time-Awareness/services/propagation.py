@@ -0,0 +1,155 @@
+# services/propagation.py
+
+from datetime import datetime, timezone
+
+import numpy as np
+from sgp4.api import Satrec, SatrecArray, jday
+
+from services.tle_catalog import get_tle_records
+
+# WGS84 ellipsoid (km)
+WGS84_A = 6378.137
+WGS84_F = 1.0 / 298.257223563
+WGS84_E2 = WGS84_F * (2.0 - WGS84_F)
+
+
+def julian_date(when=None):
+    """
+    Split Julian date (jd, fr) of a UTC datetime, as sgp4 expects it.
+    """
+    when = when or datetime.now(timezone.utc)
+    if when.tzinfo is not None:
+        when = when.astimezone(timezone.utc)
+    return jday(
+        when.year, when.month, when.day,
+        when.hour, when.minute, when.second + when.microsecond / 1e6,
+    )
+
+
+def gmst(jd, fr):
+    """
+    Greenwich mean sidereal time in radians (IAU-82, as in sgp4's gstime).
+    """
+    tut1 = ((jd - 2451545.0) + fr) / 36525.0
+    seconds = (
+        -6.2e-6 * tut1 ** 3
+        + 0.093104 * tut1 ** 2
+        + (876600.0 * 3600 + 8640184.812866) * tut1
+        + 67310.54841
+    )
+    return np.mod(np.radians(seconds / 240.0), 2 * np.pi)
+
+
+def teme_to_ecef(r, jd, fr):
+    """
+    Rotate TEME positions (..., 3) into the Earth-fixed frame by GMST.
+    jd / fr may be arrays broadcasting against r[..., 0]. Polar motion is ignored.
+    """
+    theta = gmst(jd, fr)
+    cos_t, sin_t = np.cos(theta), np.sin(theta)
+    x = cos_t * r[..., 0] + sin_t * r[..., 1]
+    y = -sin_t * r[..., 0] + cos_t * r[..., 1]
+    return np.stack([x, y, r[..., 2]], axis=-1)
+
+
+def ecef_to_geodetic(xyz):
+    """
+    Earth-fixed km → WGS84 (lat_deg, lon_deg, alt_km).
+    """
+    x, y, z = xyz[..., 0], xyz[..., 1], xyz[..., 2]
+    lon = np.arctan2(y, x)
+    p = np.hypot(x, y)
+    lat = np.arctan2(z, p * (1.0 - WGS84_E2))
+    for _ in range(5):
+        sin_lat = np.sin(lat)
+        n = WGS84_A / np.sqrt(1.0 - WGS84_E2 * sin_lat ** 2)
+        lat = np.arctan2(z + WGS84_E2 * n * sin_lat, p)
+
+    sin_lat, cos_lat = np.sin(lat), np.cos(lat)
+    n = WGS84_A / np.sqrt(1.0 - WGS84_E2 * sin_lat ** 2)
+    alt = p * cos_lat + z * sin_lat - n * (1.0 - WGS84_E2 * sin_lat ** 2)
+    return np.degrees(lat), np.degrees(lon), alt
+
+
+def geodetic_to_ecef(lat_deg, lon_deg, alt_km=0.0):
+    """
+    WGS84 geodetic → Earth-fixed km, shape (..., 3).
+    """
+    lat, lon = np.radians(lat_deg), np.radians(lon_deg)
+    n = WGS84_A / np.sqrt(1.0 - WGS84_E2 * np.sin(lat) ** 2)
+    return np.stack([
+        (n + alt_km) * np.cos(lat) * np.cos(lon),
+        (n + alt_km) * np.cos(lat) * np.sin(lon),
+        (n * (1.0 - WGS84_E2) + alt_km) * np.sin(lat),
+    ], axis=-1)
+
+
+class TLEArray:
+    """
+    A TLE catalog parsed once into an sgp4 SatrecArray, so every satellite
+    is propagated in one vectorized call instead of a Python loop.
+    """
+
+    def __init__(self, names, line1, line2, satrecs):
+        self.names = np.asarray(names, dtype=object)
+        self.line1 = np.asarray(line1, dtype=object)
+        self.line2 = np.asarray(line2, dtype=object)
+        self.satrecs = list(satrecs)
+        self.array = SatrecArray(self.satrecs) if self.satrecs else None
+
+    @classmethod
+    def from_records(cls, records):
+        names, line1, line2, satrecs = [], [], [], []
+        for name, l1, l2 in records:
+            try:
+                satrecs.append(Satrec.twoline2rv(l1, l2))
+            except Exception as e:
+                print(f"[DEBUG] Skipping invalid TLE for {name}: {e}")
+                continue
+            names.append(name)
+            line1.append(l1)
+            line2.append(l2)
+        return cls(names, line1, line2, satrecs)
+
+    def __len__(self):
+        return len(self.names)
+
+    def teme(self, jd, fr):
+        """
+        Positions for every satellite at every (jd[i], fr[i]).
+        Returns (ok, r) with shapes (n_sats, n_times) and (n_sats, n_times, 3) km.
+        """
+        jd = np.atleast_1d(np.asarray(jd, dtype=float))
+        fr = np.atleast_1d(np.asarray(fr, dtype=float))
+        if self.array is None:
+            return np.zeros((0, len(jd)), dtype=bool), np.zeros((0, len(jd), 3))
+        e, r, _ = self.array.sgp4(jd, fr)
+        ok = (e == 0) & np.all(np.isfinite(r), axis=-1)
+        return ok, r
+
+    def geodetic(self, when=None):
+        """
+        (ok, lat_deg, lon_deg, alt_km) for every satellite at `when` (default now).
+        """
+        jd, fr = julian_date(when)
+        ok, r = self.teme(jd, fr)
+        lat, lon, alt = ecef_to_geodetic(teme_to_ecef(r[:, 0, :], jd, fr))
+        return ok[:, 0], lat, lon, alt
+
+
+# group → (records list the array was built from, TLEArray)
+_arrays = {}
+
+
+def get_tle_array(group="active"):
+    """
+    TLEArray for a Celestrak group, rebuilt only when the cached payload changes.
+    """
+    records = get_tle_records(group)
+    cached = _arrays.get(group)
+    if cached is not None and cached[0] is records:
+        return cached[1]
+    tle_array = TLEArray.from_records(records)
+    _arrays[group] = (records, tle_array)
+    print(f"[DEBUG] Built TLE array for '{group}': {len(tle_array)} satellites")
+    return tle_array
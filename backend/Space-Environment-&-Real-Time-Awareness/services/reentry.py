@@ -1,8 +1,7 @@
 import requests
 from bs4 import BeautifulSoup
-from pymongo import MongoClient
+from db.mongo_client import get_collection, sync_by_key
 import logging
-import os
 
 def fetch_recent_reentries():
     url = "https://celestrak.org/satcat/decayed-with-last.php"
@@ -44,19 +43,34 @@ def fetch_recent_reentries():
     logging.debug(f"Parsed {len(satellites)} decayed satellites.")
     return satellites
 
-def get_decay_data():
+def refresh_decay_data():
+    """
+    Scrape Celestrak and sync decay_data; run by services/refresh.py.
+    An empty scrape raises so the stored copy is kept.
+    """
     logging.basicConfig(level=logging.DEBUG)
     data = fetch_recent_reentries()
     
     if not data:
-        logging.debug("[MongoDB] No data to insert.")
-        return []
+        raise RuntimeError("Celestrak decay table empty or missing")
+
+    collection = get_collection("decay_data")
+    collection.create_index([("decay_date", -1), ("norad_cat_id", 1)])
 
-    client = MongoClient(os.getenv("MONGO_URI", "mongodb://mongo:27017/"))
-    db = client["satellite_db"]
-    collection = db["decay_data"]
+    report = sync_by_key(collection, data, "norad_cat_id")
+    logging.debug(f"[MongoDB] decay_data: {report}")
+    return report
 
-    collection.delete_many({})
-    collection.insert_many(data)
-    logging.debug(f"[MongoDB] Inserted {len(data)} entries.")
-    return data
+def get_decay_data(limit=None, offset=0):
+    """
+    Stored decayed satellites, most recent decay first.
+    """
+    cursor = (
+        get_collection("decay_data")
+        .find({}, {"_id": 0})
+        .sort([("decay_date", -1), ("norad_cat_id", 1)])
+        .skip(offset)
+    )
+    if limit:
+        cursor = cursor.limit(limit)
+    return list(cursor)
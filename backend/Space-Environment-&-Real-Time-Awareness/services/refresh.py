@@ -0,0 +1,197 @@
+# services/refresh.py
+#
+# Keeps the Mongo collections behind the read endpoints fresh, so requests
+# never wait on Celestrak / LL2 / SpaceX:
+#   - every source has its own interval; when it is due, one process takes a
+#     Redis lock for it, refreshes, and records the outcome in refresh_status
+#   - endpoints read Mongo only and report the refreshed_at of their source
+#
+# Meant to run on its own, off the request workers (the ms-sera-refresh
+# service in docker-compose):
+#   python -m services.refresh            # loop forever
+#   python -m services.refresh --once     # refresh every source now and exit
+#
+# REFRESH_SCHEDULER=1 runs it as a thread in the web app instead. Only for a
+# single-process setup: under gevent workers a CPU-bound refresh (Skyfield
+# loops, scraping) blocks the hub and stalls every request and SSE stream in
+# that worker.
+
+import argparse
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+from redis.exceptions import LockError
+
+from db.mongo_client import get_collection
+from db.redis_client import r
+from services.congestion import refresh_congestion_data
+from services.launch_history import refresh_launch_history
+from services.reentry import refresh_decay_data
+from services.satellite_filter import refresh_satellites
+
+# source → (refresh function, seconds between refreshes)
+SOURCES = {
+    "congestion": (refresh_congestion_data, float(os.getenv("REFRESH_CONGESTION_SEC", 300))),
+    "satellites": (refresh_satellites, float(os.getenv("REFRESH_SATELLITES_SEC", 600))),
+    "decay": (refresh_decay_data, float(os.getenv("REFRESH_DECAY_SEC", 3600))),
+    "launch_history": (refresh_launch_history, float(os.getenv("REFRESH_LAUNCHES_SEC", 3600))),
+}
+# how often the scheduler looks for due sources
+TICK_SEC = float(os.getenv("REFRESH_TICK_SEC", 15))
+# wait this long after a failed refresh before trying the source again
+RETRY_SEC = float(os.getenv("REFRESH_RETRY_SEC", 120))
+# a crashed refresher's lock expires after this; a live one renews it every
+# LOCK_RENEW_SEC, so a refresh may run longer (the first LL2 history walk)
+LOCK_TTL_SEC = int(os.getenv("REFRESH_LOCK_TTL_SEC", 900))
+LOCK_RENEW_SEC = float(os.getenv("REFRESH_LOCK_RENEW_SEC", LOCK_TTL_SEC / 3))
+
+STATUS_COLLECTION = "refresh_status"
+
+_started = False
+_start_lock = threading.Lock()
+
+
+def _utc(dt):
+    # pymongo hands back naive UTC datetimes
+    return dt.replace(tzinfo=timezone.utc) if dt is not None and dt.tzinfo is None else dt
+
+
+def get_status(source=None):
+    """
+    refresh_status documents: {_id: source, refreshed_at, attempted_at, duration_sec, report, error}.
+    """
+    docs = list(get_collection(STATUS_COLLECTION).find({} if source is None else {"_id": source}))
+    for doc in docs:
+        for key in ("refreshed_at", "attempted_at"):
+            doc[key] = _utc(doc.get(key))
+    if source is not None:
+        return docs[0] if docs else None
+    return docs
+
+
+def data_age(source):
+    """
+    (refreshed_at, age_sec) of the last successful refresh, or (None, None).
+    """
+    status = get_collection(STATUS_COLLECTION).find_one({"_id": source}, {"refreshed_at": 1})
+    refreshed_at = _utc((status or {}).get("refreshed_at"))
+    if refreshed_at is None:
+        return None, None
+    return refreshed_at, (datetime.now(timezone.utc) - refreshed_at).total_seconds()
+
+
+def _is_due(source, interval):
+    status = get_status(source) or {}
+    now = datetime.now(timezone.utc)
+    refreshed_at = _utc(status.get("refreshed_at"))
+    attempted_at = _utc(status.get("attempted_at"))
+    if refreshed_at is not None and (now - refreshed_at).total_seconds() < interval:
+        return False
+    if status.get("error") and attempted_at is not None:
+        return (now - attempted_at).total_seconds() >= RETRY_SEC
+    return True
+
+
+def _keep_lock(lock, done):
+    while not done.wait(LOCK_RENEW_SEC):
+        try:
+            lock.extend(LOCK_TTL_SEC, replace_ttl=True)
+        except LockError as e:
+            print(f"[WARN] Lost refresh lock '{lock.name}': {e}")
+            return
+
+
+def run_source(source, force=False):
+    """
+    Refresh one source if it is due (or force) and no other process holds its
+    lock. Returns the refresh report, or None when nothing ran.
+    """
+    refresh, interval = SOURCES[source]
+    if not force and not _is_due(source, interval):
+        return None
+
+    # not thread-local: _keep_lock extends it from its own thread
+    lock = r.lock(f"refresh:{source}", timeout=LOCK_TTL_SEC, thread_local=False)
+    if not lock.acquire(blocking=False):
+        return None
+    done = threading.Event()
+    threading.Thread(target=_keep_lock, args=(lock, done), name=f"refresh-lock-{source}", daemon=True).start()
+    try:
+        # another process may have finished it between the check and the lock
+        if not force and not _is_due(source, interval):
+            return None
+        started = datetime.now(timezone.utc)
+        t0 = time.perf_counter()
+        coll = get_collection(STATUS_COLLECTION)
+        try:
+            report = refresh()
+        except Exception as e:
+            print(f"[WARN] Refresh '{source}' failed: {e}")
+            coll.update_one(
+                {"_id": source},
+                {"$set": {"attempted_at": started, "error": str(e) or type(e).__name__}},
+                upsert=True,
+            )
+            return None
+        duration = round(time.perf_counter() - t0, 3)
+        coll.update_one(
+            {"_id": source},
+            {"$set": {
+                "refreshed_at": datetime.now(timezone.utc),
+                "attempted_at": started,
+                "duration_sec": duration,
+                "report": report,
+                "error": None,
+            }},
+            upsert=True,
+        )
+        print(f"[DEBUG] Refreshed '{source}' in {duration:.1f}s: {report}")
+        return report
+    finally:
+        done.set()
+        try:
+            lock.release()
+        except LockError:
+            pass
+
+
+def _loop():
+    while True:
+        for source in SOURCES:
+            try:
+                run_source(source)
+            except Exception as e:
+                # Mongo / Redis unreachable: try again next tick
+                print(f"[WARN] Refresh scheduler ({source}): {e}")
+        time.sleep(TICK_SEC)
+
+
+def start():
+    """
+    Start the scheduler thread once per process, if REFRESH_SCHEDULER=1.
+    """
+    global _started
+    if os.getenv("REFRESH_SCHEDULER", "0") != "1":
+        return
+    with _start_lock:
+        if _started:
+            return
+        _started = True
+    threading.Thread(target=_loop, name="refresh-scheduler", daemon=True).start()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--once", action="store_true", help="refresh every source now and exit")
+    parser.add_argument("sources", nargs="*", help=f"any of: {', '.join(SOURCES)} (default all)")
+    args = parser.parse_args()
+    unknown = set(args.sources) - set(SOURCES)
+    if unknown:
+        parser.error(f"unknown sources: {', '.join(sorted(unknown))}")
+    if args.once:
+        for source in args.sources or SOURCES:
+            run_source(source, force=True)
+    else:
+        _loop()
@@ -1,7 +1,9 @@
 # services/satellite_filter.py
 
-from skyfield.api import load, EarthSatellite
-from pymongo import MongoClient
+from sgp4.api import Satrec
+from db.mongo_client import get_collection, sync_by_key
+from services.propagation import TLEArray
+from services.tle_catalog import get_tle_records
 import os
 
 # Map of human types → name-fragments to look for
@@ -24,32 +26,23 @@ def get_satellite_type(name: str) -> str:
 
 def filter_satellites_by_type(target_type: str):
     """
-    Download the 'active' TLE list, filter by name-keywords,
-    compute subpoint for each sat at current time, and return a list of dicts.
+    Take the cached 'active' TLE list, filter by name-keywords and return a
+    list of dicts. Positions are left out, so a sync writes only satellites
+    with a new element set; with_positions adds them when they are read.
     """
-    tle_url = "https://celestrak.org/NORAD/elements/gp.php?GROUP=active&FORMAT=tle"
-    ts      = load.timescale()
-    now     = ts.now()
     sats    = []
 
-    # read raw TLE lines (name / l1 / l2)
-    with load.open(tle_url) as f:
-        lines = [ln.decode("utf-8").strip() for ln in f.readlines()]
-
-    for i in range(0, len(lines) - 2, 3):
-        name, l1, l2 = lines[i], lines[i+1], lines[i+2]
+    # raw TLE records (name / l1 / l2) from the shared disk cache
+    for name, l1, l2 in get_tle_records("active"):
         kind = get_satellite_type(name)
         if target_type and kind != target_type:
             continue
 
         try:
-            sat = EarthSatellite(l1, l2, name, ts)
-            sub = sat.at(now).subpoint()
+            Satrec.twoline2rv(l1, l2)
             sats.append({
+                "norad_id":    l1[2:7].strip(),
                 "name":        name,
-                "latitude":    round(sub.latitude.degrees,  2),
-                "longitude":   round(sub.longitude.degrees, 2),
-                "altitude_km": round(sub.elevation.km,      2),
                 "tle_line1":   l1,
                 "tle_line2":   l2,
                 "type":        kind,
@@ -61,36 +54,65 @@ def filter_satellites_by_type(target_type: str):
     print(f"[DEBUG][sat_filter] filter → {len(sats)} sats for type='{target_type or 'ALL'}'")
     return sats
 
-def get_satellites_by_type(target_type: str):
+# computed on read, never stored: they change every second
+POSITION_FIELDS = ("latitude", "longitude", "altitude_km")
+
+def with_positions(docs, when=None):
     """
-    Endpoint logic: refetch & refilter from CelesTrak, write into Mongo,
-    then return the fresh list.
+    Synced documents with their subpoint at `when` (default now), propagated
+    together in one vectorized sgp4 call. Satellites sgp4 can't place get None.
     """
-    # 1) fetch & filter
-    results = filter_satellites_by_type(target_type)
+    tle_array = TLEArray.from_records((d["name"], d["tle_line1"], d["tle_line2"]) for d in docs)
+    ok, lat, lon, alt = tle_array.geodetic(when)
+    results, row = [], 0
+    for doc in docs:
+        # from_records drops TLEs it can't parse; walk its rows alongside the docs
+        placed = None
+        if row < len(tle_array) and tle_array.line1[row] == doc["tle_line1"] and tle_array.names[row] == doc["name"]:
+            placed = row if ok[row] else None
+            row += 1
+        results.append({
+            "norad_id":    doc["norad_id"],
+            "name":        doc["name"],
+            "latitude":    round(float(lat[placed]), 2) if placed is not None else None,
+            "longitude":   round(float(lon[placed]), 2) if placed is not None else None,
+            "altitude_km": round(float(alt[placed]), 2) if placed is not None else None,
+            **{k: v for k, v in doc.items() if k not in POSITION_FIELDS + ("norad_id", "name")},
+        })
+    return results
 
-    # 2) open Mongo
-    mongo_uri  = os.getenv("MONGO_URI",         "mongodb://localhost:27017/")
-    mongo_db   = os.getenv("MONGO_DB",          "satellite_db")
-    mongo_coll = os.getenv("MONGO_COLLECTION",  "filtered_satellites")
-    client     = MongoClient(mongo_uri)
-    coll       = client[mongo_db][mongo_coll]
+def _collection():
+    return get_collection(os.getenv("MONGO_COLLECTION", "filtered_satellites"))
 
-    # 3) delete old docs of that type
-    if target_type:
-        coll.delete_many({"type": target_type})
-    else:
-        coll.delete_many({})
+def refresh_satellites():
+    """
+    Classify the whole cached catalog and sync it into Mongo, keyed by NORAD
+    ID; run by services/refresh.py.
+    """
+    results = filter_satellites_by_type("")
+    if not results:
+        raise RuntimeError("no satellites in the cached TLE catalog")
 
-    # 4) insert fresh
-    if results:
-        coll.insert_many(results)
-        print(f"[DEBUG][sat_filter] wrote {len(results)} docs to '{mongo_coll}'")
+    coll = _collection()
+    coll.create_index([("type", 1), ("norad_id", 1)])
+    report = sync_by_key(coll, results, "norad_id")
+    print(f"[DEBUG][sat_filter] '{coll.name}' ← {report}")
+    return report
 
-    return results
+def get_satellites_by_type(target_type: str, limit=None, offset=0):
+    """
+    Endpoint logic: one indexed query on the synced collection, propagated to
+    now. An empty type returns every satellite.
+    """
+    query = {"type": target_type} if target_type else {}
+    cursor = _collection().find(query, {"_id": 0}).sort("norad_id", 1).skip(offset)
+    if limit:
+        cursor = cursor.limit(limit)
+    return with_positions(list(cursor))
 
 # Optional helper: populate ALL types in one go
 if __name__ == "__main__":
+    report = refresh_satellites()
     for t in list(SATELLITE_TYPE_KEYWORDS) + [""]:
         count = len(get_satellites_by_type(t))
-        print(f"→ Populated '{t or 'ALL'}' → {count} docs")
+        print(f"→ '{t or 'ALL'}' → {count} docs")
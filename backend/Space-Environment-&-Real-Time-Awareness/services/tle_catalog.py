@@ -0,0 +1,161 @@
+# services/tle_catalog.py
+
+import json
+import os
+import re
+import threading
+import time
+
+import requests
+
+CELESTRAK_BASE_URL = os.getenv("CELESTRAK_BASE_URL", "https://celestrak.org").rstrip("/")
+# raw payloads + validators on disk, shared by every gunicorn worker
+CACHE_DIR = os.getenv("TLE_CACHE_DIR", "tle-cache")
+# never ask Celestrak for the same group more often than this (it updates GP data ~every 2h)
+MIN_REFRESH_SEC = float(os.getenv("TLE_MIN_REFRESH_SEC", 7200))
+FETCH_TIMEOUT = float(os.getenv("TLE_FETCH_TIMEOUT_SEC", 30))
+# after a failed refresh keep serving the stale copy this long before trying again
+FAILURE_BACKOFF_SEC = float(os.getenv("TLE_FAILURE_BACKOFF_SEC", 300))
+
+# group → {"fetched_at", "etag", "last_modified", "records"}; per process
+_memory = {}
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def group_url(group):
+    return f"{CELESTRAK_BASE_URL}/NORAD/elements/gp.php?GROUP={group}&FORMAT=tle"
+
+
+def parse_tle_text(text):
+    """
+    Split name / line1 / line2 text into (name, line1, line2) tuples.
+    """
+    lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
+    return [
+        (lines[i], lines[i + 1], lines[i + 2])
+        for i in range(0, len(lines) - 2, 3)
+    ]
+
+
+def _lock_for(group):
+    with _locks_guard:
+        return _locks.setdefault(group, threading.Lock())
+
+
+def _paths(group):
+    safe = re.sub(r"[^A-Za-z0-9_.-]", "_", group)
+    return os.path.join(CACHE_DIR, f"{safe}.tle"), os.path.join(CACHE_DIR, f"{safe}.json")
+
+
+def _write_atomic(path, data):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _load_disk(group):
+    body_path, meta_path = _paths(group)
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        with open(body_path, encoding="utf-8") as f:
+            text = f.read()
+    except (OSError, ValueError):
+        return None
+    meta["records"] = parse_tle_text(text)
+    return meta
+
+
+def _save_disk(group, entry, text=None):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    body_path, meta_path = _paths(group)
+    if text is not None:
+        _write_atomic(body_path, text)
+    meta = {k: entry.get(k) for k in ("fetched_at", "etag", "last_modified")}
+    _write_atomic(meta_path, json.dumps(meta))
+
+
+def _is_fresh(entry):
+    if entry is None:
+        return False
+    now = time.time()
+    return now - entry["fetched_at"] < MIN_REFRESH_SEC or now < entry.get("retry_at", 0)
+
+
+def _refresh(group, entry):
+    """
+    Conditional GET against Celestrak; returns the new cache entry.
+    """
+    headers = {}
+    if entry is not None:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    response = requests.get(group_url(group), headers=headers, timeout=FETCH_TIMEOUT)
+    if response.status_code == 304 and entry is not None:
+        entry = dict(entry, fetched_at=time.time())
+        entry["etag"] = response.headers.get("ETag") or entry.get("etag")
+        entry["last_modified"] = response.headers.get("Last-Modified") or entry.get("last_modified")
+        _save_disk(group, entry)
+        print(f"[DEBUG][tle_catalog] {group}: not modified")
+        return entry
+
+    response.raise_for_status()
+    entry = {
+        "fetched_at": time.time(),
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "records": parse_tle_text(response.text),
+    }
+    _save_disk(group, entry, response.text)
+    print(f"[DEBUG][tle_catalog] {group}: downloaded {len(entry['records'])} TLEs")
+    return entry
+
+
+def get_tle_records(group="active"):
+    """
+    (name, line1, line2) tuples for a Celestrak group.
+
+    Served from memory or the disk cache while younger than MIN_REFRESH_SEC,
+    otherwise revalidated with a conditional GET. If Celestrak can't be
+    reached the last cached copy is served, however old. The returned list
+    is shared between callers and stays the same object until the payload
+    changes, so callers may memoize work derived from it.
+    """
+    entry = _memory.get(group)
+    if _is_fresh(entry):
+        return entry["records"]
+
+    with _lock_for(group):
+        entry = _memory.get(group)
+        if _is_fresh(entry):
+            return entry["records"]
+
+        # another worker may have refreshed the shared disk copy already
+        disk = _load_disk(group)
+        if disk is not None and (entry is None or disk["fetched_at"] > entry["fetched_at"]):
+            if entry is not None and disk["records"] == entry["records"]:
+                # keep the same list so work memoized on it stays valid
+                disk["records"] = entry["records"]
+            entry = disk
+            _memory[group] = entry
+            if _is_fresh(entry):
+                return entry["records"]
+
+        try:
+            refreshed = _refresh(group, entry)
+        except Exception as e:
+            if entry is None:
+                raise
+            age = time.time() - entry["fetched_at"]
+            print(f"[WARN][tle_catalog] {group}: fetch failed ({e}), serving cached copy ({age:.0f}s old)")
+            entry["retry_at"] = time.time() + FAILURE_BACKOFF_SEC
+            _memory[group] = entry
+            return entry["records"]
+
+        _memory[group] = refreshed
+        return refreshed["records"]
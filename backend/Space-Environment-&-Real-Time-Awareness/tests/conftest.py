@@ -0,0 +1,32 @@
+import os
+import sys
+
+import mongomock
+import pytest
+
+# tests import the app modules the way app.py does, from the service root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import mongo_client
+
+
+@pytest.fixture
+def db(monkeypatch):
+    """An in-memory satellite_db behind db.mongo_client."""
+    fake = mongomock.MongoClient()["satellite_db"]
+    monkeypatch.setattr(mongo_client, "db", fake)
+    monkeypatch.setattr(mongo_client, "_unique_indexes", set())
+    return fake
+
+
+@pytest.fixture
+def upsert():
+    """
+    Stand-in for mongo_client.bulk_write with a key: replace-upserts one
+    document at a time, since mongomock's bulk_write doesn't accept the
+    ReplaceOne operations pymongo builds.
+    """
+    def replace_upsert(collection, docs, key=None, **_):
+        for doc in docs:
+            collection.replace_one(mongo_client._key_filter(doc, key), doc, upsert=True)
+    return replace_upsert
@@ -0,0 +1,102 @@
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import fakeredis
+import pytest
+
+from services import alert_dispatcher, alerts
+
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(alerts, "r", fake)
+    monkeypatch.setattr(alert_dispatcher, "r", fake)
+    # the script object is bound to the client it was registered on
+    monkeypatch.setattr(alert_dispatcher, "_pop_due", fake.register_script(alert_dispatcher._pop_due.script))
+    monkeypatch.setattr(alert_dispatcher, "_subscribers", {})
+    return fake
+
+
+def schedule(user_id, *offsets_sec):
+    members = [
+        (NOW + timedelta(seconds=s), alerts._alert_member(user_id, 0.0, 0.0, NOW + timedelta(seconds=s), "SAT", "pass"))
+        for s in offsets_sec
+    ]
+    alerts.add_alerts(user_id, members)
+    return [member for _, member in members]
+
+
+def published(pubsub, quiet_sec=0.2):
+    """Messages on the channel until it has been quiet for quiet_sec."""
+    messages, deadline = [], time.monotonic() + quiet_sec
+    while time.monotonic() < deadline:
+        # None also stands for a swallowed subscribe confirmation
+        message = pubsub.get_message(timeout=0.05)
+        if message is not None:
+            messages.append(message["data"])
+            deadline = time.monotonic() + quiet_sec
+    return messages
+
+
+def test_pops_and_publishes_only_due_alerts_once(redis):
+    due = schedule("u1", -120, -5) + schedule("u2", -60)
+    (later,) = schedule("u1", 300)
+    pubsub = redis.pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe(alert_dispatcher.CHANNEL)
+
+    assert alert_dispatcher.dispatch_due(now=NOW.timestamp()) == 3
+
+    assert redis.zrange(alerts.DUE_KEY, 0, -1) == [later]
+    assert redis.zrange(alerts.user_key("u1"), 0, -1) == [later]
+    assert redis.zrange(alerts.user_key("u2"), 0, -1) == []
+    assert sorted(published(pubsub)) == sorted(due)
+
+    # nothing left to pop: no second delivery
+    assert alert_dispatcher.dispatch_due(now=NOW.timestamp()) == 0
+    assert published(pubsub) == []
+
+
+def test_concurrent_dispatchers_pop_each_alert_once(redis):
+    due = [member for user in range(20) for member in schedule(f"u{user}", *range(-20, 0))]
+    pubsub = redis.pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe(alert_dispatcher.CHANNEL)
+
+    counts = []
+    def drain():
+        while sent := alert_dispatcher.dispatch_due(now=NOW.timestamp(), batch_size=7):
+            counts.append(sent)
+
+    workers = [threading.Thread(target=drain) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    messages = published(pubsub)
+    assert sum(counts) == len(due) == len(messages)
+    assert sorted(messages) == sorted(due)
+
+
+def test_stream_delivers_routed_alerts_to_that_user_only(redis, monkeypatch):
+    (pending,) = schedule("u1", 300)
+    monkeypatch.setattr(alert_dispatcher, "HEARTBEAT_SEC", 0.05)
+    mine, theirs = alert_dispatcher.stream("u1"), alert_dispatcher.stream("u2")
+
+    assert next(mine).startswith("retry:")
+    upcoming = next(mine)
+    assert upcoming.startswith("event: upcoming\n")
+    assert json.loads(upcoming.split("data: ", 1)[1]) == [json.loads(pending)]
+    next(theirs), next(theirs)
+
+    alert_dispatcher._route(pending)
+    event = next(mine)
+    assert event == f"id: {json.loads(pending)['id']}\nevent: alert\ndata: {pending}\n\n"
+    assert next(theirs) == ": keepalive\n\n"
+
+    mine.close()
+    assert "u1" not in alert_dispatcher._subscribers
@@ -0,0 +1,10 @@
+import pytest
+
+from services import congestion_grid
+
+
+@pytest.mark.parametrize("edges", [[200, 200, 600], [600, 200], [200, float("nan"), 900]])
+def test_alt_edges_must_be_strictly_increasing(edges, monkeypatch):
+    monkeypatch.setattr(congestion_grid, "get_tle_array", pytest.fail)
+    with pytest.raises(ValueError, match="strictly increasing"):
+        congestion_grid.compute_grid(alt_edges=edges)
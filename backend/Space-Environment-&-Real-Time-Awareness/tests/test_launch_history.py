@@ -0,0 +1,146 @@
+import argparse
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from scripts.launch_standin import make_handler, synthetic_ll2, synthetic_spacex
+from services import launch_history
+
+
+@pytest.fixture
+def writes(monkeypatch, upsert):
+    """bulk_write calls (launch_ids per call), applied with the conftest upsert."""
+    calls = []
+
+    def recording_upsert(collection, docs, key=None):
+        calls.append([doc[key] for doc in docs])
+        upsert(collection, docs, key=key)
+
+    monkeypatch.setattr(launch_history, "bulk_write", recording_upsert)
+    return calls
+
+
+@pytest.fixture
+def standin(monkeypatch):
+    """LL2 / SpaceX stand-in on an ephemeral port; tests edit .ll2 and .args in place."""
+    args = argparse.Namespace(latency=0, rate_limit=0, verbose=False)
+    ll2, spacex = synthetic_ll2(35), synthetic_spacex(5)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(args, ll2, spacex, threading.Lock()))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    monkeypatch.setattr(launch_history, "LL2_BASE_URL", f"{base}/2.2.0")
+    monkeypatch.setattr(launch_history, "SPACEX_BASE_URL", f"{base}/v4")
+    monkeypatch.setattr(launch_history, "LL2_PAGE_SIZE", 10)
+    monkeypatch.setattr(launch_history, "MAX_PAGES", 0)
+    server.args, server.ll2 = args, ll2
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def ingest_ll2(db):
+    return launch_history.ingest_launch_library(db["launch_history"])
+
+
+def stored_ids(db):
+    return sorted(doc["launch_id"] for doc in db["launch_history"].find())
+
+
+def test_capped_runs_get_through_launches_sharing_one_last_updated(db, writes, standin, monkeypatch):
+    for launch in standin.ll2:
+        launch["last_updated"] = "2025-06-01T00:00:00Z"
+    monkeypatch.setattr(launch_history, "MAX_PAGES", 2)
+
+    reports = [ingest_ll2(db) for _ in range(3)]
+
+    assert [r["fetched"] for r in reports] == [20, 15, 0]
+    assert [r["offset"] for r in reports] == [20, 35, 35]
+    assert len(stored_ids(db)) == 35
+
+
+def test_failed_write_keeps_the_mark_at_the_last_written_page(db, writes, standin, monkeypatch):
+    def fail_second_page(collection, docs, key=None):
+        if writes:
+            raise RuntimeError("write failed")
+        writes.append([doc[key] for doc in docs])
+
+    monkeypatch.setattr(launch_history, "bulk_write", fail_second_page)
+    with pytest.raises(RuntimeError):
+        ingest_ll2(db)
+
+    state = launch_history.get_ingest_state("ll2")
+    assert state["high_water_mark"] == standin.ll2[9]["last_updated"]
+    assert state["offset"] == 1
+
+
+def test_capped_run_resumes_where_it_stopped(db, writes, standin, monkeypatch):
+    monkeypatch.setattr(launch_history, "MAX_PAGES", 2)
+
+    first = ingest_ll2(db)
+    assert (first["fetched"], first["pages"]) == (20, 2)
+    assert first["high_water_mark"] == standin.ll2[19]["last_updated"]
+
+    second = ingest_ll2(db)
+    assert (second["fetched"], second["pages"]) == (15, 2)
+    assert stored_ids(db) == sorted(f"ll2:{launch['id']}" for launch in standin.ll2)
+
+
+def test_rate_limit_stops_the_run_and_keeps_the_mark(db, writes, standin):
+    standin.args.rate_limit = 2
+
+    limited = ingest_ll2(db)
+    assert (limited["fetched"], limited["pages"]) == (20, 2)
+    assert launch_history.get_high_water_mark("ll2") == standin.ll2[19]["last_updated"]
+
+    standin.args.rate_limit = 0
+    resumed = ingest_ll2(db)
+    assert resumed["fetched"] == 15
+    assert len(stored_ids(db)) == 35
+
+
+def test_rerun_fetches_only_touched_launches(db, writes, standin):
+    ingest_ll2(db)
+    writes.clear()
+
+    failures = [launch for launch in standin.ll2 if launch["status"]["name"] == "Launch Failure"]
+    for launch in failures:
+        launch["last_updated"] = "2030-01-01T00:00:00Z"
+        launch["status"] = {"name": "Launch Successful"}
+
+    report = ingest_ll2(db)
+
+    touched = sorted(f"ll2:{launch['id']}" for launch in failures)
+    assert report["fetched"] == len(failures)
+    assert sorted(sum(writes, [])) == touched
+    assert all(db["launch_history"].find_one({"launch_id": i})["success"] for i in touched)
+    assert ingest_ll2(db)["fetched"] == 0
+
+
+def test_upserts_by_launch_id_are_idempotent(db, writes, standin):
+    launch_history.refresh_launch_history()
+    first = list(db["launch_history"].find({}, {"_id": 0}).sort("launch_id", 1))
+
+    # forget the marks, so the second run rewrites every launch
+    db[launch_history.STATE_COLLECTION].delete_many({})
+    launch_history.refresh_launch_history()
+    second = list(db["launch_history"].find({}, {"_id": 0}).sort("launch_id", 1))
+
+    assert len(first) == 35 + 5
+    assert second == first
+    assert db["launch_history"].index_information()["launch_id_1"]["unique"]
+
+
+def test_unkeyed_launches_go_once_both_sources_are_read(db, writes, standin, monkeypatch):
+    db["launch_history"].insert_many([{"mission": "legacy 1"}, {"mission": "legacy 2"}])
+    monkeypatch.setattr(launch_history, "MAX_PAGES", 2)
+
+    partial = launch_history.refresh_launch_history()
+    assert not partial["ll2"]["complete"]
+    assert db["launch_history"].count_documents({"launch_id": {"$exists": False}}) == 2
+
+    done = launch_history.refresh_launch_history()
+    assert done["ll2"]["complete"] and done["spacex"]["complete"]
+    assert db["launch_history"].count_documents({"launch_id": {"$exists": False}}) == 0
+    assert db["launch_history"].count_documents({}) == 35 + 5
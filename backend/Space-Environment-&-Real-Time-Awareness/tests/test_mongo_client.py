@@ -0,0 +1,69 @@
+import pytest
+from pymongo.errors import BulkWriteError
+
+from db import mongo_client
+
+
+class FailingCollection:
+    """Collection whose bulk_write fails one document per batch, like a duplicate key."""
+
+    name = "failing"
+
+    def __init__(self):
+        self.batches = 0
+
+    def bulk_write(self, ops, ordered=False):
+        self.batches += 1
+        raise BulkWriteError({
+            "writeErrors": [{"index": 0, "code": 11000, "errmsg": "E11000 duplicate key"}],
+            "nInserted": len(ops) - 1,
+        })
+
+
+def test_bulk_write_raises_after_a_failed_batch():
+    collection = FailingCollection()
+    with pytest.raises(BulkWriteError):
+        mongo_client.bulk_write(collection, [{"n": i} for i in range(5)], batch_size=2)
+    # later batches aren't attempted
+    assert collection.batches == 1
+
+
+def test_swap_in_keeps_the_live_collection_when_staging_fails(db, monkeypatch):
+    db["conjunctions"].insert_one({"pair": "old"})
+
+    def failing_bulk_write(collection, docs, key=None):
+        collection.insert_one(docs[0])
+        raise BulkWriteError({"writeErrors": [{"errmsg": "boom"}]})
+
+    monkeypatch.setattr(mongo_client, "bulk_write", failing_bulk_write)
+    with pytest.raises(BulkWriteError):
+        mongo_client.swap_in("conjunctions", [{"pair": "new"}, {"pair": "newer"}])
+
+    assert db.list_collection_names() == ["conjunctions"]
+    assert [d["pair"] for d in db["conjunctions"].find()] == ["old"]
+
+
+def test_sync_by_key_fails_without_deleting(db, monkeypatch):
+    db["decay_data"].insert_many([{"norad_cat_id": "1"}, {"norad_cat_id": "2"}])
+
+    def failing_bulk_write(collection, docs, key=None):
+        raise BulkWriteError({"writeErrors": [{"errmsg": "boom"}]})
+
+    monkeypatch.setattr(mongo_client, "bulk_write", failing_bulk_write)
+    with pytest.raises(BulkWriteError):
+        mongo_client.sync_by_key("decay_data", [{"norad_cat_id": "1", "changed": True}], "norad_cat_id")
+
+    assert db["decay_data"].count_documents({}) == 2
+
+
+def test_legacy_documents_stay_until_the_sync_replaces_them(db, upsert, monkeypatch):
+    db["decay_data"].insert_many([{"name": "OLD-1"}, {"name": "OLD-2"}])
+    mongo_client.ensure_unique_index(db["decay_data"], "norad_cat_id")
+    # readers still see the unkeyed documents once the index exists
+    assert db["decay_data"].count_documents({}) == 2
+
+    monkeypatch.setattr(mongo_client, "bulk_write", upsert)
+    report = mongo_client.sync_by_key("decay_data", [{"norad_cat_id": "1"}, {"norad_cat_id": "2"}], "norad_cat_id")
+
+    assert sorted(d["norad_cat_id"] for d in db["decay_data"].find()) == ["1", "2"]
+    assert report["inserted"] == 2 and report["removed"] == 2
@@ -0,0 +1,39 @@
+import threading
+import time
+
+import fakeredis
+import pytest
+
+from services import refresh
+
+
+@pytest.fixture
+def redis(db, monkeypatch):
+    fake = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(refresh, "r", fake)
+    return fake
+
+
+def test_lock_outlives_its_ttl_while_the_refresh_runs(redis, monkeypatch):
+    monkeypatch.setattr(refresh, "LOCK_TTL_SEC", 1)
+    monkeypatch.setattr(refresh, "LOCK_RENEW_SEC", 0.2)
+    started, finish = threading.Event(), threading.Event()
+
+    def slow_refresh():
+        started.set()
+        finish.wait(5)
+        return {"ok": True}
+
+    monkeypatch.setitem(refresh.SOURCES, "slow", (slow_refresh, 0))
+    runner = threading.Thread(target=refresh.run_source, args=("slow", True))
+    runner.start()
+    assert started.wait(2)
+
+    time.sleep(2.5)   # well past the TTL
+    assert redis.exists("refresh:slow")
+    assert refresh.run_source("slow", force=True) is None
+
+    finish.set()
+    runner.join(5)
+    assert not redis.exists("refresh:slow")
+    assert refresh.get_status("slow")["report"] == {"ok": True}
@@ -0,0 +1,37 @@
+import pytest
+
+from db import mongo_client
+from scripts.bench_congestion import synthetic_records
+from services import satellite_filter
+
+
+@pytest.fixture
+def catalog(db, upsert, monkeypatch):
+    records = synthetic_records(50)
+    monkeypatch.setattr(mongo_client, "bulk_write", upsert)
+    monkeypatch.setattr(satellite_filter, "get_tle_records", lambda group: records)
+    return records
+
+
+def test_unchanged_catalog_writes_nothing(catalog):
+    first = satellite_filter.refresh_satellites()
+    second = satellite_filter.refresh_satellites()
+
+    assert first["inserted"] == 50
+    assert second == {"inserted": 0, "updated": 0, "unchanged": 50, "removed": 0}
+
+
+def test_positions_are_computed_on_read(catalog, db):
+    satellite_filter.refresh_satellites()
+    assert "latitude" not in db["filtered_satellites"].find_one()
+
+    sats = satellite_filter.get_satellites_by_type("", limit=5)
+    assert [s["norad_id"] for s in sats] == ["00000", "00001", "00002", "00003", "00004"]
+    for sat in sats:
+        assert -90 <= sat["latitude"] <= 90
+        assert -180 <= sat["longitude"] <= 180
+        assert sat["altitude_km"] > 100
+
+
+def test_with_positions_handles_an_empty_page():
+    assert satellite_filter.with_positions([]) == []
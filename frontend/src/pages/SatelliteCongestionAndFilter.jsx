@@ -10,38 +10,33 @@ export default function LivePage() {
   const [selectedType, setSelectedType] = useState('communication');
   const viewerRef = useRef(null);
 
-  // store the alert location to draw circle & start polling
+  // store the alert location to draw circle & open the alert stream
   const [alertLocation, setAlertLocation] = useState(null);
   const [alertMsg, setAlertMsg] = useState('');
 
-  // poll every 10s once we've set an alertLocation
+  // alerts are pushed over SSE once we've set an alertLocation
   useEffect(() => {
     if (!alertLocation) return;
-    const interval = setInterval(async () => {
-      try {
-        const res = await fetch(
-          `/api/alerts/check?user_id=${encodeURIComponent(alertLocation.user_id)}`
-        );
-        const { msg } = await res.json();
-        if (msg && msg !== 'No active alert') {
-          clearInterval(interval);
-          // show the popup
-          alert(msg);
-          setAlertMsg(msg);
-          // optional: zoom into the alert location
-          viewerRef.current.camera.flyTo({
-            destination: Cesium.Cartesian3.fromDegrees(
-              alertLocation.lon,
-              alertLocation.lat,
-              2_000_000
-            ),
-          });
-        }
-      } catch (e) {
-        console.error('check-alert failed', e);
-      }
-    }, 10_000);
-    return () => clearInterval(interval);
+    const source = new EventSource(
+      `/api/alerts/stream?user_id=${encodeURIComponent(alertLocation.user_id)}`
+    );
+    source.addEventListener('alert', (event) => {
+      const { msg } = JSON.parse(event.data);
+      // show the popup
+      alert(msg);
+      setAlertMsg(msg);
+      // optional: zoom into the alert location
+      viewerRef.current.camera.flyTo({
+        destination: Cesium.Cartesian3.fromDegrees(
+          alertLocation.lon,
+          alertLocation.lat,
+          2_000_000
+        ),
+      });
+    });
+    // EventSource reconnects on its own
+    source.onerror = (e) => console.error('alert stream error', e);
+    return () => source.close();
   }, [alertLocation]);
 
   useEffect(() => {
@@ -216,7 +211,7 @@ viewer.entities.add({
         );
         const json = await res.json();
         alert(json.msg);
-        // kick off our poll-effect
+        // open the alert stream
         setAlertLocation({ lat, lon, user_id: 'admin' });
       } catch (err) {
         console.error('register failed', err);